@@ -35,11 +35,46 @@ from .constants import (
     Zero,
     Delta,
 )
-from .ope_data import OPEData
+from .ope_data import OPEData, LazyOPEData
+from .linear_combination import LinearCombination
 
 # Registry 和 API 模块
-from .registry import OPERegistry, ope_registry, Bosonic, Fermionic
-from .api import OPE, NO, bracket, MakeOPE
+from .registry import (
+    OPERegistry,
+    ope_registry,
+    Bosonic,
+    Fermionic,
+    HigherDerivativesFirst,
+    LowerDerivativesFirst,
+    get_no_ordering,
+    set_no_ordering,
+    no_ordering,
+)
+from .api import (
+    OPE,
+    NO,
+    bracket,
+    MakeOPE,
+    QuantumOPEs,
+    ClassicalOPEs,
+    get_ope_method,
+    set_ope_method,
+    ope_method,
+)
+
+# 系数域模块
+from .domains import (
+    CoefficientDomain,
+    RationalField,
+    PolynomialRing,
+    PrimeField,
+    EX,
+    QQ,
+    GF,
+    get_coefficient_domain,
+    set_coefficient_domain,
+    coefficient_domain,
+)
 
 # Simplification 模块
 from .simplify import simplify, canonicalize, collect_normal_ordered_terms
@@ -49,6 +84,14 @@ from .jacobi import check_jacobi_identity, verify_jacobi_identity
 
 # 缓存模块
 from .cache import get_ope_cache
+from .normal_order import clear_normal_order_memo, resize_normal_order_memo
+from .store import OPEStore, attach_store, detach_store
+
+# 并行计算模块
+from .parallel import enable_parallel, disable_parallel, parallel_opes, compute_opes
+
+# 荷格模块
+from .charges import ChargeLattice
 
 # Null states 计算模块
 from .null_states import (
@@ -65,6 +108,8 @@ from .null_states import (
     enumerate_fock_basis,
     calculate_null_states,
 )
+from .matrix_rank import matrix_rank, modular_rank, bareiss_rank, symbolic_rank, SparseMatrix
+from .qseries import QSeries, fock_character, pbw_character
 
 __all__ = [
     # Version info
@@ -93,16 +138,39 @@ __all__ = [
     "Delta",
     # OPE Data
     "OPEData",
+    "LazyOPEData",
+    "LinearCombination",
     # Registry
     "OPERegistry",
     "ope_registry",
     "Bosonic",
     "Fermionic",
+    "HigherDerivativesFirst",
+    "LowerDerivativesFirst",
+    "get_no_ordering",
+    "set_no_ordering",
+    "no_ordering",
     # API
     "OPE",
     "NO",
     "bracket",
     "MakeOPE",
+    "QuantumOPEs",
+    "ClassicalOPEs",
+    "get_ope_method",
+    "set_ope_method",
+    "ope_method",
+    # Coefficient domains
+    "CoefficientDomain",
+    "RationalField",
+    "PolynomialRing",
+    "PrimeField",
+    "EX",
+    "QQ",
+    "GF",
+    "get_coefficient_domain",
+    "set_coefficient_domain",
+    "coefficient_domain",
     # Simplification
     "simplify",
     "canonicalize",
@@ -112,6 +180,18 @@ __all__ = [
     "verify_jacobi_identity",
     # Cache
     "get_ope_cache",
+    "clear_normal_order_memo",
+    "resize_normal_order_memo",
+    "OPEStore",
+    "attach_store",
+    "detach_store",
+    # Parallel
+    "enable_parallel",
+    "disable_parallel",
+    "parallel_opes",
+    "compute_opes",
+    # Charges
+    "ChargeLattice",
     # Null states
     "CoefficientExtractor",
     "FockSpaceBasis",
@@ -125,4 +205,13 @@ __all__ = [
     "extract_coefficients",
     "enumerate_fock_basis",
     "calculate_null_states",
+    "matrix_rank",
+    "modular_rank",
+    "bareiss_rank",
+    "symbolic_rank",
+    "SparseMatrix",
+    # Characters
+    "QSeries",
+    "fock_character",
+    "pbw_character",
 ]
@@ -6,25 +6,27 @@ OPE 计算 API 模块
 - NO(A, B): 计算正规序乘积 (AB)(z)
 - bracket(A, B, n): 计算 bracket {AB}_n(z)
 - MakeOPE: 创建 OPEData 的便捷函数
+- ope_method: 选择量子 OPE 或经典 OPE（Poisson 顶点代数）
+- coefficient_domain: 选择计算使用的系数域（见 domains 模块）
 """
 
-from typing import Any, List, Union
-
-import sympy as sp
-from sympy import Add, Integer, Mul, Number
+from contextlib import contextmanager
+from typing import Any, Dict, Generator, List, Optional, Tuple, Union
 
 from .cache import (
-    cached_binomial,
-    cached_factorial,
     cached_pochhammer,
     get_ope_cache,
+    make_ope_cache_key,
 )
 from .constants import One, Zero
-from .local_operator import (
-    extract_scalar_operator,
-    is_local_operator,
+from .domains import (
+    coefficient_domain,
+    domain_binomial,
+    domain_inverse_factorial,
+    get_coefficient_domain,
 )
-from .ope_data import OPEData
+from .linear_combination import SCALAR, LinearCombination
+from .ope_data import LazyOPEData, OPEData
 from .operators import (
     BasisOperator,
     DerivativeOperator,
@@ -34,8 +36,106 @@ from .operators import (
 from .operators import (
     d as derivative,
 )
+from .parallel import _Batch, get_parallel_engine, parallel_opes
 from .registry import OPEDefiner, ope_registry
 
+# 规则生成器的类型：yield (A, B) 请求子 OPE，接收 OPEData，最终返回结果
+OPERule = Generator[Tuple[Any, Any], OPEData, Any]
+
+# 计算方式（类似 OPEdefs.m 中的 OPEMethod）
+QuantumOPEs = "quantum"
+ClassicalOPEs = "classical"
+
+# 当前的计算方式
+_ope_method = QuantumOPEs
+
+
+def get_ope_method() -> str:
+    """返回当前的计算方式（QuantumOPEs 或 ClassicalOPEs）"""
+    return _ope_method
+
+
+def set_ope_method(method: str) -> None:
+    """
+    设置计算方式（类似 OPEdefs.m 中的 OPEMethod）
+
+    - QuantumOPEs: 顶点算子代数的 OPE（默认）
+    - ClassicalOPEs: Poisson 顶点代数的 λ-括号。没有多重缩并，
+      复合规则中的 Jacobi 修正项（第三项）消失；正规序乘积是分次交换、
+      结合的，交换顺序不产生修正项
+
+    两种方式的结果在缓存中使用不同的命名空间。
+
+    Args:
+        method: QuantumOPEs 或 ClassicalOPEs
+
+    Raises:
+        ValueError: 如果 method 不是已知的计算方式
+    """
+    global _ope_method
+    if method not in (QuantumOPEs, ClassicalOPEs):
+        raise ValueError(f"Unknown OPE method: {method!r}")
+    _ope_method = method
+    get_ope_cache().namespace = None if method == QuantumOPEs else method
+
+
+@contextmanager
+def ope_method(method: str):
+    """
+    在 with 语句内使用指定的计算方式
+
+    Examples:
+        >>> with ope_method(ClassicalOPEs):
+        ...     result = OPE(NO(T, T), NO(T, T))
+    """
+    previous = _ope_method
+    set_ope_method(method)
+    try:
+        yield
+    finally:
+        set_ope_method(previous)
+
+
+class _PoleRequest(tuple):
+    """
+    只请求子 OPE 的一阶极点: yield _PoleRequest(A, B, n)
+
+    求值引擎送回 {AB}_n（LinearCombination），而不是完整的 OPEData。
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, left: Any, right: Any, n: int):
+        return tuple.__new__(cls, (left, right, n))
+
+
+class _WindowRequest(tuple):
+    """
+    只请求子 OPE 在极点窗口 [lo, hi] 内的部分: yield _WindowRequest(A, B, lo, hi)
+
+    hi 为 None 表示没有上限。求值引擎送回截断后的 OPEData。
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, left: Any, right: Any, lo: int, hi: Optional[int]):
+        return tuple.__new__(cls, (left, right, lo, hi))
+
+
+def _sub_request(left: Any, right: Any, lo: int, hi: Optional[int]) -> Tuple:
+    """窗口不受限制时请求完整的子 OPE（可以使用全局缓存），否则请求窗口"""
+    if lo <= 0 and hi is None:
+        return (left, right)
+    return _WindowRequest(left, right, lo, hi)
+
+
+def _truncate(ope: OPEData, lo: int, hi: Optional[int]) -> OPEData:
+    """只保留极点窗口 [lo, hi] 内的极点"""
+    return OPEData._from_terms({
+        n: lc for n, lc in ope._poles.items()
+        if n >= lo and (hi is None or n <= hi)
+    })
+
 
 class OPEComputer(OPEDefiner):
     """
@@ -44,18 +144,62 @@ class OPEComputer(OPEDefiner):
     继承 OPEDefiner 并添加 OPE 计算功能。
     """
 
-    def __call__(self, left: Any, right: Any) -> OPEData:
+    def __call__(self, left: Any, right: Any, min_pole: Optional[int] = None,
+                 max_pole: Optional[int] = None, method: Optional[str] = None,
+                 domain: Any = None) -> OPEData:
         """
-        计算 OPE: OPE(A, B)
+        计算 OPE: OPE(A, B)，或只计算一个极点窗口: OPE(A, B, min_pole=3)
 
         Args:
             left: 左侧算符
             right: 右侧算符
+            min_pole: 只计算阶数 >= min_pole 的极点
+            max_pole: 只计算阶数 <= max_pole 的极点
+            method: 本次计算使用的方式（QuantumOPEs 或 ClassicalOPEs），
+                    默认为当前方式
+            domain: 本次计算使用的系数域（例如 QQ、QQ[c]、GF(p)），
+                    默认为当前的系数域；结果总是以 sympy 系数返回
 
         Returns:
             OPEData 实例
         """
-        return _compute_ope(left, right)
+        if method is not None and method != _ope_method:
+            with ope_method(method):
+                return self(left, right, min_pole=min_pole, max_pole=max_pole, domain=domain)
+        if domain is not None and domain != get_coefficient_domain():
+            with coefficient_domain(domain):
+                return self(left, right, min_pole=min_pole, max_pole=max_pole)
+        return _to_sympy(_compute_ope(left, right, min_pole=min_pole, max_pole=max_pole))
+
+    def table(self, lefts: List[Any], rights: Optional[List[Any]] = None,
+              max_workers: Optional[int] = None) -> List[List[OPEData]]:
+        """
+        计算 OPE 表: OPE.table([A1, A2, ...], [B1, B2, ...])
+
+        Args:
+            lefts: 左侧算符列表
+            rights: 右侧算符列表（默认与 lefts 相同）
+            max_workers: 如果给出，用这么多个工作进程并行计算
+
+        Returns:
+            OPEData 矩阵，table[i][j] = OPE(lefts[i], rights[j])
+        """
+        return ope_table(lefts, rights, max_workers=max_workers)
+
+    def lazy(self, left: Any, right: Any) -> LazyOPEData:
+        """
+        惰性计算 OPE: OPE.lazy(A, B)
+
+        返回的 LazyOPEData 在访问某一阶极点时才计算这一阶。
+
+        Args:
+            left: 左侧算符
+            right: 右侧算符
+
+        Returns:
+            LazyOPEData 实例
+        """
+        return LazyOPEData(left, right)
 
     @staticmethod
     def make(data: Union[List, OPEData]) -> OPEData:
@@ -121,7 +265,8 @@ def MakeOPE(data: Union[List, OPEData]) -> OPEData:
         raise TypeError(f"MakeOPE expects list or OPEData, got {type(data)}")
 
 
-def _compute_ope(left: Any, right: Any) -> OPEData:
+def _compute_ope(left: Any, right: Any, min_pole: Optional[int] = None,
+                 max_pole: Optional[int] = None) -> OPEData:
     """
     计算两个算符的 OPE（内部实现）
 
@@ -133,125 +278,639 @@ def _compute_ope(left: Any, right: Any) -> OPEData:
     5. 处理正规序算符
     6. 返回零 OPE（未定义的情况）
 
-    优化：使用 type() 代替 isinstance() 进行精确类型匹配
+    线性组合（sympy Add/Mul 或 LinearCombination）统一转换为
+    LinearCombination 后按双线性展开，不再重建 sympy 表达式。
+
+    规则实现为生成器，通过 yield (A, B) 请求子 OPE；求值引擎
+    （_evaluate）用显式的工作栈调度这些请求，因此深层嵌套的复合算符
+    不受 Python 递归深度的限制。
+
+    给出 min_pole / max_pole 时，极点窗口沿着导数规则和复合规则传递给
+    子 OPE，只计算对窗口内的极点有贡献的部分。窗口结果不放入全局缓存。
 
     Args:
         left: 左侧算符
         right: 右侧算符
+        min_pole: 只计算阶数 >= min_pole 的极点
+        max_pole: 只计算阶数 <= max_pole 的极点
 
     Returns:
         OPEData 实例
     """
+    left = _as_ope_argument(left)
+    right = _as_ope_argument(right)
+    lo = 0 if min_pole is None else min_pole
+    window = None if lo <= 0 and max_pole is None else (lo, max_pole)
+
     # 尝试从缓存获取结果
     cache = get_ope_cache()
     cached_result = cache.get(left, right)
     if cached_result is not None:
+        if window is not None:
+            return _truncate(cached_result, lo, max_pole)
         return cached_result
 
+    return _evaluate(left, right, cache, window=window)
+
+
+def _as_ope_argument(expr: Any) -> Any:
+    """
+    规范化 OPE 的参数
+
+    sympy 表达式只转换一次，之后缓存键保存在 LinearCombination 上；
+    系数为 1 的单个算符直接使用算符本身。非默认的系数域中，
+    系数转换为域元素。
+    """
+    if isinstance(expr, Operator):
+        return expr
+    if not isinstance(expr, LinearCombination):
+        expr = LinearCombination.from_expr(expr)
+    domain = get_coefficient_domain()
+    if not domain.is_default:
+        expr = domain.convert_lc(expr)
+    if expr.is_single_operator():
+        op = next(iter(expr.operators()))
+        if isinstance(op, Operator):
+            return op
+    return expr
+
+
+# 注册表 OPE 在各个系数域中的转换结果 {(域标识, id): (OPEData, 转换结果)}
+_domain_opes: Dict[Tuple[str, int], Tuple[OPEData, OPEData]] = {}
+
+
+def _registry_ope_in_domain(ope_data: OPEData) -> OPEData:
+    """把注册表中的 OPE 转换到当前的系数域（每个定义只转换一次）"""
+    domain = get_coefficient_domain()
+    if domain.is_default:
+        return ope_data
+    key = (domain.key, id(ope_data))
+    entry = _domain_opes.get(key)
+    if entry is None or entry[0] is not ope_data:
+        entry = (ope_data, domain.convert_ope(ope_data))
+        _domain_opes[key] = entry
+    return entry[1]
+
+
+def _to_sympy(result: Any) -> Any:
+    """把当前系数域中的结果（OPEData 或 LinearCombination）转换为 sympy 系数"""
+    domain = get_coefficient_domain()
+    if domain.is_default:
+        return result
+    if isinstance(result, LinearCombination):
+        return domain.lc_to_sympy(result)
+    return domain.ope_to_sympy(result)
+
+
+def _evaluate(left: Any, right: Any, cache: Any, memo: Optional[dict] = None,
+              pole: Optional[int] = None, window: Optional[Tuple] = None) -> Any:
+    """
+    用显式工作栈求值 OPE(left, right)
+
+    栈中的每一帧是一个规则生成器。生成器 yield (A, B) 请求子 OPE，
+    yield _PoleRequest 只请求子 OPE 的某一阶极点，或者 yield _WindowRequest
+    只请求一个极点窗口；引擎依次查询全局缓存和本次求值的局部记忆表，
+    都未命中才压入新的一帧。一帧结束时把结果放入缓存（单个极点和窗口
+    只放入局部记忆表，键中包含极点或窗口）并送回上一帧。
+
+    每一帧对应一次依赖收集（begin_tracking / end_tracking），
+    因此依赖跟踪与递归实现完全相同。
+
+    Args:
+        left: 左侧算符或 LinearCombination
+        right: 右侧算符或 LinearCombination
+        cache: OPE 缓存
+        memo: 局部记忆表 {key: (result, deps)}，可以在多次求值之间共享
+        pole: 如果给出，只计算第 pole 阶极点
+        window: 如果给出 (lo, hi)，只计算这个极点窗口
+
+    Returns:
+        OPEData 实例；给出 pole 时返回该极点的 LinearCombination
+
+    Raises:
+        RecursionError: 如果规则出现循环依赖
+    """
+    # 局部记忆表：缓存被禁用或条目被淘汰时，同一次求值中也不重复计算
+    if memo is None:
+        memo = {}
+    in_progress = set()
+    stack = []
+
+    def push(l, r, key, spec):
+        cache.begin_tracking()
+        in_progress.add(key)
+        if spec is None:
+            gen = _ope_rules(l, r, cache)
+        elif type(spec) is tuple:
+            gen = _ope_rules(l, r, cache, spec)
+        else:
+            gen = _pole_rules(l, r, spec)
+        stack.append((gen, l, r, key, spec))
+
+    spec = pole if pole is not None else window
+    key = make_ope_cache_key(left, right)
+    push(left, right, key if spec is None else (key, spec), spec)
+    value = None
+    try:
+        while True:
+            gen, l, r, key, spec = stack[-1]
+            try:
+                request = gen.send(value)
+            except StopIteration as stop:
+                stack.pop()
+                in_progress.discard(key)
+                deps = cache.end_tracking()
+                if spec is None:
+                    result, pin = stop.value
+                    cache.put(l, r, result, pin=pin, deps=deps)
+                elif type(spec) is tuple:
+                    result = stop.value[0]
+                else:
+                    result = stop.value
+                memo[key] = (result, deps)
+                if not stack:
+                    return result
+                value = result
+                continue
+
+            request_type = type(request)
+            if request_type is _Batch:
+                # 一组独立的子 OPE：并行模式下一次性解析，否则由规则逐个请求
+                engine = get_parallel_engine()
+                value = None
+                if engine is not None:
+                    value = engine.resolve(request.pairs, cache, memo, in_progress)
+                continue
+
+            if request_type is _PoleRequest:
+                sub_left, sub_right, sub_spec = request
+            elif request_type is _WindowRequest:
+                sub_left, sub_right = request[0], request[1]
+                sub_spec = request[2:]
+            else:
+                sub_left, sub_right = request
+                sub_spec = None
+            sub_left = _as_ope_argument(sub_left)
+            sub_right = _as_ope_argument(sub_right)
+
+            # 完整的 OPE 已经算过时，单个极点和窗口直接从中读取
+            value = cache.get(sub_left, sub_right)
+            if value is not None:
+                if sub_spec is not None:
+                    value = _restrict(value, sub_spec)
+                continue
+
+            sub_key = make_ope_cache_key(sub_left, sub_right)
+            entry = memo.get(sub_key)
+            if entry is None and sub_spec is not None:
+                entry = memo.get((sub_key, sub_spec))
+            elif entry is not None and sub_spec is not None:
+                entry = (_restrict(entry[0], sub_spec), entry[1])
+            if entry is not None:
+                cache.record_dependencies(entry[1])
+                value = entry[0]
+                continue
+
+            if sub_spec is not None:
+                sub_key = (sub_key, sub_spec)
+            if sub_key in in_progress:
+                raise RecursionError(
+                    f"Cyclic OPE dependency while computing OPE({sub_left}, {sub_right})"
+                )
+            push(sub_left, sub_right, sub_key, sub_spec)
+            value = None
+    except BaseException:
+        # 关闭未完成帧的依赖收集
+        for _ in stack:
+            cache.end_tracking()
+        raise
+
+
+def _restrict(ope: OPEData, spec: Any) -> Any:
+    """从完整的 OPE 中取出一阶极点（spec 为整数）或一个窗口（spec 为 (lo, hi)）"""
+    if type(spec) is tuple:
+        return _truncate(ope, *spec)
+    return ope.pole_terms(spec)
+
+
+def _compute_pole(left: Any, right: Any, n: int) -> LinearCombination:
+    """
+    只计算 OPE(left, right) 的第 n 阶极点（n >= 1）
+
+    如果完整的 OPE 已在缓存中，直接读取；否则只计算对这一阶极点
+    有贡献的子 OPE 和子极点。
+
+    Args:
+        left: 左侧算符
+        right: 右侧算符
+        n: 极点阶数
+
+    Returns:
+        LinearCombination
+    """
+    left = _as_ope_argument(left)
+    right = _as_ope_argument(right)
+
+    cache = get_ope_cache()
+    cached_result = cache.get(left, right)
+    if cached_result is not None:
+        return cached_result.pole_terms(n)
+
+    return _evaluate(left, right, cache, pole=n)
+
+
+def ope_table(lefts: List[Any], rights: Optional[List[Any]] = None,
+              max_workers: Optional[int] = None) -> List[List[OPEData]]:
+    """
+    计算一组算符两两之间的 OPE
+
+    与逐个调用 OPE(A, B) 相比：
+    - 相同的参数对（包括写法不同但相等的表达式）只计算一次
+    - 按算符大小从小到大计算，小的 OPE 往往是大的 OPE 的子 OPE，
+      先算出来后可以直接复用
+    - 所有求值共享同一个局部记忆表，即使全局缓存被禁用，
+      不同表项之间公共的子 OPE 也只计算一次
+    - 并行模式下（或给出 max_workers 时）未缓存的表项分发到进程池
+
+    Args:
+        lefts: 左侧算符列表
+        rights: 右侧算符列表（默认与 lefts 相同）
+        max_workers: 如果给出，在临时开启的并行模式中计算
+
+    Returns:
+        OPEData 矩阵，table[i][j] = OPE(lefts[i], rights[j])
+
+    Examples:
+        >>> ops = [NO(T, T), d(d(T)), NO(T, d(T))]
+        >>> table = OPE.table(ops)
+        >>> table[0][2] == OPE(NO(T, T), NO(T, d(T)))
+        True
+    """
+    if max_workers is not None:
+        with parallel_opes(max_workers=max_workers):
+            return ope_table(lefts, rights)
+
+    lefts = [_as_ope_argument(op) for op in lefts]
+    rights = lefts if rights is None else [_as_ope_argument(op) for op in rights]
+
+    # 去重
+    keys = [[make_ope_cache_key(l, r) for r in rights] for l in lefts]
+    pairs = {}
+    for l, row in zip(lefts, keys):
+        for r, key in zip(rights, row):
+            if key not in pairs:
+                pairs[key] = (l, r)
+
+    # 小的 OPE 先算
+    sizes = {}
+    order = sorted(pairs, key=lambda key: (_operator_size(pairs[key][0], sizes) +
+                                           _operator_size(pairs[key][1], sizes)))
+
+    cache = get_ope_cache()
+    memo = {}
+    results = {}
+
+    engine = get_parallel_engine()
+    if engine is not None:
+        resolved = engine.resolve([pairs[key] for key in order], cache, memo)
+        if resolved is not None:
+            results = dict(zip(order, resolved))
+
+    for key in order:
+        if key in results:
+            continue
+        l, r = pairs[key]
+        result = cache.get(l, r)
+        if result is None:
+            entry = memo.get(key)
+            result = entry[0] if entry is not None else _evaluate(l, r, cache, memo)
+        results[key] = result
+
+    results = {key: _to_sympy(result) for key, result in results.items()}
+    return [[results[key] for key in row] for row in keys]
+
+
+def _operator_size(expr: Any, sizes: Dict[Any, int]) -> int:
+    """
+    算符的大小（基本算符个数加导数阶数），用于安排计算顺序
+
+    Args:
+        expr: 算符或 LinearCombination
+        sizes: 已计算的大小 {算符: 大小}
+
+    Returns:
+        大小；线性组合取各项的最大值
+    """
+    if isinstance(expr, LinearCombination):
+        return max((_operator_size(op, sizes) for op in expr.operators()
+                    if isinstance(op, Operator)), default=0)
+
+    size = sizes.get(expr)
+    if size is not None:
+        return size
+    if type(expr) is DerivativeOperator:
+        size = _operator_size(expr.base, sizes) + expr.order
+    elif type(expr) is NormalOrderedOperator:
+        size = _operator_size(expr.left, sizes) + _operator_size(expr.right, sizes)
+    elif type(expr) is BasisOperator:
+        size = 1
+    else:
+        size = 0
+    sizes[expr] = size
+    return size
+
+
+def _ope_rules(left: Any, right: Any, cache: Any, window: Optional[Tuple] = None) -> OPERule:
+    """
+    按顺序应用 OPE 规则（不查询缓存）
+
+    Args:
+        left: 左侧算符或 LinearCombination
+        right: 右侧算符或 LinearCombination
+        cache: OPE 缓存（用于记录依赖）
+        window: 极点窗口 (lo, hi)，None 表示计算全部极点
+
+    Returns:
+        生成器，最终返回 (OPEData, pin) 元组，pin 表示结果是否放入缓存的固定层
+    """
     # 获取类型（只获取一次，避免重复调用 type()）
     left_type = type(left)
     right_type = type(right)
 
     # 规则 1: 处理零算符（使用 is 比较更快）
     # OPE(0, B) = 0, OPE(A, 0) = 0
-    if left == 0 or left is Zero or right == 0 or right is Zero:
-        result = OPEData({})
-        cache.put(left, right, result)
-        return result
+    if left is Zero or right is Zero or \
+            (left_type is LinearCombination and left.is_zero()) or \
+            (right_type is LinearCombination and right.is_zero()):
+        return OPEData({}), False
 
-    # 规则 2: 线性性 - 右侧加法
-    # OPE(A, B+C) = OPE(A,B) + OPE(A,C)
-    if right_type is Add:
-        result = OPEData({})
-        for term in right.args:
-            result = result + _compute_ope(left, term)
-        cache.put(left, right, result)
-        return result
-
-    # 规则 3: 线性性 - 左侧加法
-    # OPE(A+B, C) = OPE(A,C) + OPE(B,C)
-    if left_type is Add:
-        result = OPEData({})
-        for term in left.args:
-            result = result + _compute_ope(term, right)
-        cache.put(left, right, result)
-        return result
-
-    # 规则 4: 标量乘法 - 右侧
-    # OPE(A, c*B) = c*OPE(A,B)
-    if right_type is Mul:
-        coeff, op = extract_scalar_operator(right)
-        if coeff != 1:
-            result = coeff * _compute_ope(left, op)
-            cache.put(left, right, result)
-            return result
-
-    # 规则 5: 标量乘法 - 左侧
-    # OPE(c*A, B) = c*OPE(A,B)
-    if left_type is Mul:
-        coeff, op = extract_scalar_operator(left)
-        if coeff != 1:
-            result = coeff * _compute_ope(op, right)
-            cache.put(left, right, result)
-            return result
+    # 规则 2-5: 线性性和标量乘法
+    # OPE(A, B+C) = OPE(A,B) + OPE(A,C), OPE(c*A, B) = c*OPE(A,B)
+    if not isinstance(left, Operator) or not isinstance(right, Operator):
+        return (yield from _ope_bilinear(left, right, window)), False
 
     # 规则 6: 左侧导数算符
     # [∂A, B]_q = -(q-1)[A,B]_{q-1}
     if left_type is DerivativeOperator:
-        result = _ope_derivative_left(left, right)
-        cache.put(left, right, result)
-        return result
+        return (yield from _ope_derivative_left(left, right, window)), False
 
     # 规则 7: 右侧导数算符
     # [A, ∂B]_q = (q-1)[A,B]_{q-1} + ∂[A,B]_q
     if right_type is DerivativeOperator:
-        result = _ope_derivative_right(left, right)
-        cache.put(left, right, result)
-        return result
+        return (yield from _ope_derivative_right(left, right, window)), False
 
     # 规则 8: 查询注册表
     # 对于基本算符，从注册表查询 OPE
     if left_type is BasisOperator and right_type is BasisOperator:
+        if window is not None:
+            # 生成元之间的 OPE 很便宜：计算（或从固定层读取）完整结果后截断
+            return _truncate((yield (left, right)), *window), False
+
         # 首先检查算符顺序
         order = ope_registry.compare_operators(left, right)
 
         if order < 0:
             # 顺序错误，需要使用对称性公式
-            result = _ope_commute_help(left, right)
-            cache.put(left, right, result)
-            return result
+            return (yield from _ope_commute_help(left, right)), False
 
         # 顺序正确或相同，查询注册表
+        # 未定义的 OPE 也要记录依赖：之后定义它时结果会改变
+        cache.record_dependency(ope_registry._make_key(left, right))
         ope_data = ope_registry.get_ope(left, right)
         if ope_data is not None:
-            cache.put(left, right, ope_data)
-            return ope_data
+            # 生成元之间的基本 OPE 放入固定层，永不淘汰
+            return _registry_ope_in_domain(ope_data), True
         # 未定义的 OPE 返回零
-        result = OPEData({})
-        cache.put(left, right, result)
-        return result
+        return OPEData({}), False
 
     # 规则 9: 右侧正规序算符
     # OPE(A, NO(B,C)) 使用 Jacobi 恒等式
     if right_type is NormalOrderedOperator:
-        result = _ope_composite_right(left, right)
-        cache.put(left, right, result)
-        return result
+        return (yield from _ope_composite_right(left, right, window)), False
 
     # 规则 10: 左侧正规序算符
     # OPE(NO(A,B), C) 使用 Jacobi 恒等式
     if left_type is NormalOrderedOperator:
-        result = _ope_composite_left(left, right)
-        cache.put(left, right, result)
+        return (yield from _ope_composite_left(left, right, window)), False
+
+    # 默认：未定义的 OPE 返回零
+    return OPEData({}), False
+
+
+def _pole_rules(left: Any, right: Any, n: int) -> OPERule:
+    """
+    只计算第 n 阶极点的 OPE 规则（n >= 1）
+
+    与 _ope_rules 的规则一一对应，但只请求对 {AB}_n 有贡献的子极点：
+    - 导数规则只需要基础 OPE 的若干阶极点
+    - OPE(A, NO(B,C)) 的第 q 阶极点只需要 {AC}_q、{AB}_p（p <= q）
+      以及 OPE({AB}_p, C) 的第 q-p 阶极点
+    - OPE(NO(A,B), C) 需要完整的 OPE(A,C) 和 OPE(B,C)（第一、二项用到
+      所有更高阶的极点），但第三项只需要 OPE(B, {AC}_p) 的第 q-p 阶极点
+    - 生成元之间的 OPE 直接请求完整结果（注册表查询或交换公式）
+
+    Args:
+        left: 左侧算符或 LinearCombination
+        right: 右侧算符或 LinearCombination
+        n: 极点阶数
+
+    Returns:
+        生成器，最终返回 LinearCombination
+    """
+    left_type = type(left)
+    right_type = type(right)
+
+    if left is Zero or right is Zero or \
+            (left_type is LinearCombination and left.is_zero()) or \
+            (right_type is LinearCombination and right.is_zero()):
+        return LinearCombination()
+
+    # 线性性
+    if not isinstance(left, Operator) or not isinstance(right, Operator):
+        left_lc = LinearCombination.from_expr(left)
+        right_lc = LinearCombination.from_expr(right)
+        result = LinearCombination()
+        for op_l, coeff_l in left_lc.items():
+            if not isinstance(op_l, Operator):
+                continue
+            for op_r, coeff_r in right_lc.items():
+                if not isinstance(op_r, Operator):
+                    continue
+                result._iadd((yield _PoleRequest(op_l, op_r, n)), coeff_l * coeff_r)
+        return result
+
+    # [∂^k A, B]_q = (-1)^k (q-1)_k [A,B]_{q-k}
+    if left_type is DerivativeOperator:
+        order = left.order
+        if n - order < 1:
+            return LinearCombination()
+        base_pole = yield _PoleRequest(left.base, right, n - order)
+        return base_pole.scale(((-1) ** order) * cached_pochhammer(n, order))
+
+    # [A, ∂^k B]_q = Σ_j C(k,j) (q-1)_j ∂^{k-j} [A,B]_{q-j}
+    if right_type is DerivativeOperator:
+        order = right.order
+        result = LinearCombination()
+        for j in range(min(order, n - 1) + 1):
+            pochhammer = cached_pochhammer(n, j)
+            if pochhammer == 0:
+                continue
+            base_pole = yield _PoleRequest(left, right.base, n - j)
+            if base_pole:
+                term = base_pole.derivative(order - j) if order > j else base_pole
+                result._iadd(term, domain_binomial(order, j) * pochhammer)
+        return result
+
+    # 生成元之间：完整的 OPE 由注册表给出（或由交换公式得到）
+    if left_type is BasisOperator and right_type is BasisOperator:
+        return (yield (left, right)).pole_terms(n)
+
+    # OPE(A, NO(B,C))
+    if right_type is NormalOrderedOperator:
+        A = left
+        B = right.left
+        C = right.right
+        sign = (-1) ** (_get_parity(A) * _get_parity(B))
+
+        result = LinearCombination()
+        bracket_AC = yield _PoleRequest(A, C, n)
+        if bracket_AC:
+            result._iadd(_no_terms(B, bracket_AC), sign)
+        bracket_AB = yield _PoleRequest(A, B, n)
+        if bracket_AB:
+            result._iadd(_no_terms(bracket_AB, C))
+
+        # 第三项: Σ_{p=1}^{q-1} C(q-1, q-p) {{AB}_p, C}_{q-p}（经典 OPE 中没有）
+        for p in range(1, n if _ope_method == QuantumOPEs else 1):
+            bracket_AB = yield _PoleRequest(A, B, p)
+            if bracket_AB:
+                sub_pole = yield _PoleRequest(bracket_AB, C, n - p)
+                if sub_pole:
+                    result._iadd(sub_pole, domain_binomial(n - 1, n - p))
+        return result
+
+    # OPE(NO(A,B), C)
+    if left_type is NormalOrderedOperator:
+        A = left.left
+        B = left.right
+        C = right
+        sign = (-1) ** (_get_parity(A) * _get_parity(B))
+
+        ope_AC, ope_BC = yield from _request_batch([(A, C), (B, C)])
+        max_AC = ope_AC.max_pole
+        max_BC = ope_BC.max_pole
+
+        result = LinearCombination()
+
+        # 第一项: Σ_l NO[∂^l A, {BC}_{l+q}] / l!
+        for l in range(0, max_BC - n + 1):
+            bracket_BC = ope_BC.pole_terms(l + n)
+            if bracket_BC:
+                result._iadd(_no_terms(derivative(A, l) if l else A, bracket_BC),
+                             domain_inverse_factorial(l))
+
+        # 第二项: sign * Σ_l NO[∂^l B, {AC}_{l+q}] / l!
+        for l in range(0, max_AC - n + 1):
+            bracket_AC = ope_AC.pole_terms(l + n)
+            if bracket_AC:
+                result._iadd(_no_terms(derivative(B, l) if l else B, bracket_AC),
+                             sign * domain_inverse_factorial(l))
+
+        # 第三项: sign * Σ_{p=1}^{q-1} {B, {AC}_p}_{q-p}（经典 OPE 中没有）
+        p_max = min(n - 1, max_AC) if _ope_method == QuantumOPEs else 0
+        for p in range(1, p_max + 1):
+            bracket_AC = ope_AC.pole_terms(p)
+            if bracket_AC:
+                sub_pole = yield _PoleRequest(B, bracket_AC, n - p)
+                if sub_pole:
+                    result._iadd(sub_pole, sign)
         return result
 
     # 默认：未定义的 OPE 返回零
-    result = OPEData({})
-    cache.put(left, right, result)
-    return result
+    return LinearCombination()
 
 
-def _ope_derivative_left(left: DerivativeOperator, right: Any) -> OPEData:
+def _request_batch(pairs: List[Tuple[Any, Any]]) -> OPERule:
+    """
+    请求一组相互独立的子 OPE
+
+    先把整组请求交给求值引擎（并行模式下分发到进程池）；
+    引擎返回 None 时逐个请求。
+
+    Args:
+        pairs: (left, right) 或 _WindowRequest 列表
+
+    Returns:
+        生成器，最终返回 OPEData 列表
+    """
+    if any(type(pair) is _WindowRequest for pair in pairs):
+        # 窗口请求不分发到进程池
+        results = []
+        for pair in pairs:
+            results.append((yield pair))
+        return results
+
+    pairs = [(_as_ope_argument(left), _as_ope_argument(right)) for left, right in pairs]
+    results = yield _Batch(pairs)
+    if results is None:
+        results = []
+        for pair in pairs:
+            results.append((yield pair))
+    return results
+
+
+def _accumulate_ope(poles: Dict[int, LinearCombination], ope: OPEData, scale: Any = 1) -> None:
+    """
+    把 scale * ope 原地累加到极点字典中
+
+    不会修改 ope 自身持有的 LinearCombination（它们可能来自缓存）。
+
+    Args:
+        poles: 目标字典 {阶数: LinearCombination}
+        ope: 要累加的 OPEData
+        scale: 标量因子
+    """
+    for n, lc in ope._poles.items():
+        if n in poles:
+            poles[n]._iadd(lc, scale)
+        else:
+            poles[n] = lc.scale(scale)
+
+
+def _ope_bilinear(left: Any, right: Any, window: Optional[Tuple] = None) -> OPERule:
+    """
+    按双线性展开计算线性组合之间的 OPE
+
+    OPE(Σ a_i A_i, Σ b_j B_j) = Σ a_i b_j OPE(A_i, B_j)
+
+    纯标量项（单位算符的倍数）的奇异部分为零，直接跳过。
+
+    Args:
+        left: 左侧表达式
+        right: 右侧表达式
+        window: 极点窗口 (lo, hi)，原样传给每个子 OPE
+
+    Returns:
+        OPEData 实例
+    """
+    left_lc = LinearCombination.from_expr(left)
+    right_lc = LinearCombination.from_expr(right)
+
+    poles: Dict[int, LinearCombination] = {}
+    for op_l, coeff_l in left_lc.items():
+        if not isinstance(op_l, Operator):
+            continue
+        for op_r, coeff_r in right_lc.items():
+            if not isinstance(op_r, Operator):
+                continue
+            request = (op_l, op_r) if window is None else _WindowRequest(op_l, op_r, *window)
+            _accumulate_ope(poles, (yield request), coeff_l * coeff_r)
+
+    return OPEData._from_terms(poles)
+
+
+def _ope_derivative_left(left: DerivativeOperator, right: Any,
+                         window: Optional[Tuple] = None) -> OPERule:
     """
     计算左侧导数算符的 OPE
 
@@ -261,22 +920,29 @@ def _ope_derivative_left(left: DerivativeOperator, right: Any) -> OPEData:
     对于 base_ope 中的 pole(p)，它对 derivative_ope 中的 pole(q) 有贡献，
     其中 q = p + n（极点阶数增加）
 
+    极点窗口 [lo, hi] 对应基础 OPE 的窗口 [lo-n, hi-n]。
+
     Args:
         left: 导数算符 ∂^n A
         right: 右侧算符 B
+        window: 极点窗口 (lo, hi)，None 表示计算全部极点
 
     Returns:
         OPEData 实例
     """
     base = left.base
     order = left.order
+    lo, hi = window or (0, None)
+    if hi is not None and hi - order < 1:
+        return OPEData({})
 
     # 计算基础算符的 OPE
-    base_ope = _compute_ope(base, right)
+    base_ope = (yield _sub_request(base, right, max(lo - order, 0),
+                                   None if hi is None else hi - order))
 
     # 应用导数规则
     new_poles = {}
-    for p, coeff in base_ope.poles.items():
+    for p, coeff in base_ope._poles.items():
         # 对于 base_ope 的 pole(p)，它贡献到 derivative_ope 的 pole(q)
         # 其中 q = p + order
         q = p + order
@@ -284,13 +950,15 @@ def _ope_derivative_left(left: DerivativeOperator, right: Any) -> OPEData:
         # 使用缓存的 Pochhammer 符号: (q-1)_n = (q-1)(q-2)...(q-n)
         pochhammer = cached_pochhammer(q, order)
 
-        new_coeff = ((-1) ** order) * pochhammer * coeff
-        new_poles[q] = new_coeff
+        new_poles[q] = coeff.scale(((-1) ** order) * pochhammer)
 
-    return OPEData(new_poles)
+    if window is not None:
+        return _truncate(OPEData._from_terms(new_poles), lo, hi)
+    return OPEData._from_terms(new_poles)
 
 
-def _ope_derivative_right(left: Any, right: DerivativeOperator) -> OPEData:
+def _ope_derivative_right(left: Any, right: DerivativeOperator,
+                          window: Optional[Tuple] = None) -> OPERule:
     """
     计算右侧导数算符的 OPE
 
@@ -298,51 +966,60 @@ def _ope_derivative_right(left: Any, right: DerivativeOperator) -> OPEData:
 
     简化版本（n=1）：[A, ∂B]_q = (q-1)[A,B]_{q-1} + ∂[A,B]_q
 
+    极点窗口 [lo, hi] 对应基础 OPE 的窗口 [lo-n, hi]。
+
     Args:
         left: 左侧算符 A
         right: 导数算符 ∂^n B
+        window: 极点窗口 (lo, hi)，None 表示计算全部极点
 
     Returns:
         OPEData 实例
     """
     base = right.base
     order = right.order
+    lo, hi = window or (0, None)
 
     # 计算基础算符的 OPE
-    base_ope = _compute_ope(left, base)
+    base_ope = (yield _sub_request(left, base, max(lo - order, 0), hi))
 
     # 应用导数规则
-    new_poles = {}
+    new_poles: Dict[int, LinearCombination] = {}
 
     # 对于 base_ope 中的每个极点 p，它对 derivative_ope 中的极点 p+k 有贡献
-    for p, coeff in base_ope.poles.items():
+    for p, coeff in base_ope._poles.items():
         # 对于每个 k，计算 [A,B]_p 对 [A,∂^n B]_{p+k} 的贡献
         for k in range(order + 1):
             # 新的极点阶数：q = p + k
             new_q = p + k
+            if new_q < lo or (hi is not None and new_q > hi):
+                continue
 
             # 使用缓存的 Pochhammer 符号 (q-1)_k = (p+k-1)_k
             pochhammer = cached_pochhammer(new_q, k)
+            if pochhammer == 0:
+                continue
 
             # 使用缓存的二项式系数 C(n, k)
-            binom_coeff = cached_binomial(order, k)
+            binom_coeff = domain_binomial(order, k)
 
             # 新的系数：对原系数求 (n-k) 阶导数
             if order - k > 0:
-                new_coeff = binom_coeff * pochhammer * derivative(coeff, order - k)
+                term = coeff.derivative(order - k)
             else:
-                new_coeff = binom_coeff * pochhammer * coeff
+                term = coeff
 
             # 累加到结果中
             if new_q in new_poles:
-                new_poles[new_q] = new_poles[new_q] + new_coeff
+                new_poles[new_q]._iadd(term, binom_coeff * pochhammer)
             else:
-                new_poles[new_q] = new_coeff
+                new_poles[new_q] = term.scale(binom_coeff * pochhammer)
 
-    return OPEData(new_poles)
+    return OPEData._from_terms(new_poles)
 
 
-def _ope_composite_right(left: Any, right: NormalOrderedOperator) -> OPEData:
+def _ope_composite_right(left: Any, right: NormalOrderedOperator,
+                         window: Optional[Tuple] = None) -> OPERule:
     """
     计算 OPE(A, NO(B,C)) 的奇异部分（singular part, q >= 1）
 
@@ -358,12 +1035,19 @@ def _ope_composite_right(left: Any, right: NormalOrderedOperator) -> OPEData:
     - ABC[q] = OPE[{AB}_q, C]
     - maxq = Max[maxABC[i] + (i+1), maxAC]
 
+    经典 OPE（ClassicalOPEs）只有前两项。
+
     **重要**: 此公式仅适用于 q >= 1（VOA-manual 公式 3.3.4）。
     对于 q = 0 的情况（正规序乘积重排），应使用专门的算法（公式 3.3.9 和 3.3.10）。
 
+    给出极点窗口 [lo, hi] 时：{AC} 只需要窗口内的极点，{AB} 只需要
+    阶数 <= hi 的极点，ABC[p] 只需要窗口 [lo-p, hi-p] 内的极点，
+    p >= hi 的 ABC[p] 不计算。
+
     Args:
         left: 左侧算符 A
         right: 正规序算符 NO(B,C)
+        window: 极点窗口 (lo, hi)，None 表示计算全部极点
 
     Returns:
         OPEData 实例，仅包含 q >= 1 的极点（奇异部分）
@@ -377,23 +1061,34 @@ def _ope_composite_right(left: Any, right: NormalOrderedOperator) -> OPEData:
     parity_B = _get_parity(B)
     sign = (-1) ** (parity_A * parity_B)
 
-    # 计算 OPE(A, B) 和 OPE(A, C)
-    ope_AB = _compute_ope(A, B)
-    ope_AC = _compute_ope(A, C)
+    lo, hi = window or (0, None)
+
+    # 计算 OPE(A, B) 和 OPE(A, C)（相互独立）
+    ope_AB, ope_AC = yield from _request_batch([_sub_request(A, B, 0, hi),
+                                                _sub_request(A, C, lo, hi)])
 
     max_AB = ope_AB.max_pole
     max_AC = ope_AC.max_pole
 
-    # 计算 ABC[q] = OPE[{AB}_q, C] 对于所有 q
+    # 计算 ABC[q] = OPE[{AB}_q, C] 对于所有 q（各项相互独立，可以并行）
+    # 窗口内只有 l = q' - q 落在 [lo-q, hi-q] 的极点有贡献
+    # 经典 OPE 没有第三项，不需要 ABC
+    orders = [q for q in range(1, max_AB + 1) if ope_AB.pole_terms(q) and
+              (hi is None or q < hi)] if _ope_method == QuantumOPEs else []
+    sub_opes = yield from _request_batch([
+        _sub_request(ope_AB.pole_terms(q), C, max(lo - q, 0),
+                     None if hi is None else hi - q)
+        for q in orders])
+    sub_opes = dict(zip(orders, sub_opes))
+
     # 同时计算 max_ABC 和 maxq，避免重复遍历
     ABC = []
     max_ABC = 0
     maxq = max_AC
 
     for q in range(1, max_AB + 1):
-        bracket_AB_q = ope_AB.pole(q)
-        if bracket_AB_q != 0:
-            ope_AB_q_C = _compute_ope(bracket_AB_q, C)
+        ope_AB_q_C = sub_opes.get(q)
+        if ope_AB_q_C is not None:
             ABC.append(ope_AB_q_C)
 
             # 更新 max_ABC 和 maxq
@@ -408,23 +1103,24 @@ def _ope_composite_right(left: Any, right: NormalOrderedOperator) -> OPEData:
         else:
             ABC.append(OPEData({}))
 
-    result = OPEData({})
+    new_poles = {}
 
-    # 主循环：对每个极点 q
-    for q in range(1, maxq + 1):
-        pole_sum = 0
+    # 主循环：对窗口内的每个极点 q
+    # 跳过的 ABC[q]（窗口外或经典 OPE）不参与 maxq，第二项仍然需要 q <= max_AB
+    maxq = max(maxq, max_AB)
+    q_max = maxq if hi is None else min(maxq, hi)
+    for q in range(max(lo, 1), q_max + 1):
+        pole_sum = LinearCombination()
 
         # 第一项: sign * NO[B, {AC}_q]
-        bracket_AC_q = ope_AC.pole(q)
-        if bracket_AC_q != 0:
-            no_B_AC = NO(B, bracket_AC_q)
-            pole_sum = pole_sum + sign * no_B_AC
+        bracket_AC_q = ope_AC.pole_terms(q)
+        if bracket_AC_q:
+            pole_sum._iadd(_no_terms(B, bracket_AC_q), sign)
 
         # 第二项: NO[{AB}_q, C]
-        bracket_AB_q = ope_AB.pole(q)
-        if bracket_AB_q != 0:
-            no_AB_C = NO(bracket_AB_q, C)
-            pole_sum = pole_sum + no_AB_C
+        bracket_AB_q = ope_AB.pole_terms(q)
+        if bracket_AB_q:
+            pole_sum._iadd(_no_terms(bracket_AB_q, C))
 
         # 第三项: Σ_{l=Max[1,q-maxAB]}^{Min[q-1, maxABC]} C(q-1, l) {{AB}_{q-l}, C}_l
         l_min = max(1, q - max_AB)
@@ -433,19 +1129,18 @@ def _ope_composite_right(left: Any, right: NormalOrderedOperator) -> OPEData:
         for l in range(l_min, l_max + 1):
             # 检查 q-l 是否在有效范围内
             if 1 <= q - l <= len(ABC):
-                binom_coeff = cached_binomial(q - 1, l)
                 # 获取 ABC[q-l] 的第 l 极点
-                abc_pole = ABC[q - l - 1].pole(l)  # -1 因为数组从 0 开始
-                if abc_pole != 0:
-                    pole_sum = pole_sum + binom_coeff * abc_pole
+                abc_pole = ABC[q - l - 1].pole_terms(l)  # -1 因为数组从 0 开始
+                if abc_pole:
+                    pole_sum._iadd(abc_pole, domain_binomial(q - 1, l))
 
-        if pole_sum != 0:
-            result._poles[q] = pole_sum
+        if pole_sum:
+            new_poles[q] = pole_sum
 
-    return result
+    return OPEData._from_terms(new_poles)
 
 
-def _ope_commute(B: Any, A: Any) -> OPEData:
+def _ope_commute(B: Any, A: Any) -> OPERule:
     """
     使用公式 3.3.3 计算 OPE(B, A) 从已知的 OPE(A, B)
 
@@ -462,11 +1157,10 @@ def _ope_commute(B: Any, A: Any) -> OPEData:
     Returns:
         OPEData 实例，表示 OPE(B, A)
 
-    注意：这个函数会递归调用 _compute_ope(A, B)，所以不会导致无限递归，
-    因为 _compute_ope 有缓存和终止条件。
+    注意：子 OPE(A, B) 通过 yield 交给求值引擎计算，不会产生递归调用。
     """
     # 计算 OPE(A, B)
-    ope_AB = _compute_ope(A, B)
+    ope_AB = (yield (A, B))
     max_pole = ope_AB.max_pole
 
     if max_pole == 0:
@@ -477,35 +1171,50 @@ def _ope_commute(B: Any, A: Any) -> OPEData:
     parity_B = _get_parity(B)
     swap_sign = (-1) ** (parity_A * parity_B)
 
-    result = OPEData({})
+    return OPEData._from_terms(_commute_poles(ope_AB, swap_sign))
+
+
+def _commute_poles(ope_AB: OPEData, swap_sign: int) -> Dict[int, LinearCombination]:
+    """
+    由 OPE(A, B) 的极点计算 OPE(B, A) 的极点（公式 3.3.3）
+
+    Args:
+        ope_AB: OPE(A, B)
+        swap_sign: (-1)^{|A||B|}
+
+    Returns:
+        字典 {阶数: LinearCombination}
+    """
+    max_pole = ope_AB.max_pole
+    new_poles = {}
 
     # 对每个极点 q 从 max_pole 到 1 进行计算
     for q in range(max_pole, 0, -1):
-        pole_sum = 0
-
         # term[q] = (-1)^q * [A B]_q
-        bracket_AB_q = ope_AB.pole(q)
-        pole_sum = (-1) ** q * bracket_AB_q
+        pole_sum = ope_AB.pole_terms(q).scale(swap_sign * (-1) ** q)
 
         # 加上求和项: Σ_{l=q+1}^{max} ((-1)^l / (l-q)!) ∂^{(l-q)} [A B]_l
         for l in range(q + 1, max_pole + 1):
-            bracket_AB_l = ope_AB.pole(l)
-            if bracket_AB_l != 0:
+            bracket_AB_l = ope_AB.pole_terms(l)
+            if bracket_AB_l:
                 # 计算 ∂^{(l-q)} [A B]_l
                 deriv_order = l - q
-                deriv_bracket = derivative(bracket_AB_l, deriv_order)
+                deriv_bracket = bracket_AB_l.derivative(deriv_order)
 
                 # 加上 ((-1)^l / (l-q)!) ∂^{(l-q)} [A B]_l
-                pole_sum = pole_sum + \
-                    ((-1) ** l / cached_factorial(deriv_order)) * deriv_bracket
+                pole_sum._iadd(
+                    deriv_bracket,
+                    swap_sign * (-1) ** l * domain_inverse_factorial(deriv_order)
+                )
 
-        if pole_sum != 0:
-            result._poles[q] = swap_sign * pole_sum
+        if pole_sum:
+            new_poles[q] = pole_sum
 
-    return result
+    return new_poles
 
 
-def _ope_composite_left(left: NormalOrderedOperator, right: Any) -> OPEData:
+def _ope_composite_left(left: NormalOrderedOperator, right: Any,
+                        window: Optional[Tuple] = None) -> OPERule:
     """
     计算 OPE(NO(A,B), C)
 
@@ -519,6 +1228,7 @@ def _ope_composite_left(left: NormalOrderedOperator, right: Any) -> OPEData:
     其中:
     - sign = (-1)^(|A||B|)
     - 第三项来自 Jacobi 恒等式中的 Σ_l binom(q-1, l-1) [[AB]_l C]_{p+q-l}
+    - 经典 OPE（ClassicalOPEs）只有前两项
 
     **注意**: 虽然 VOA-manual 算法描述中提到"如果 A 是复合算符，使用公式 3.3.3"，
     但 Mathematica 的实际实现 (OPECompositeHelpLQ) 是直接计算，而不是通过
@@ -527,9 +1237,13 @@ def _ope_composite_left(left: NormalOrderedOperator, right: Any) -> OPEData:
     **重要**: 此公式计算 q >= 1 的极点（奇异部分）。
     特殊情况：当 max_AC = max_BC = 0 时，返回 q=0 的正规序乘积 NO(NO(A,B), C)。
 
+    给出极点窗口 [lo, hi] 时：第一、二项用到 {BC}、{AC} 中所有阶数 >= lo
+    的极点，BAC[p] 只需要窗口 [lo-p, hi-p] 内的极点，p >= hi 的 BAC[p] 不计算。
+
     Args:
         left: 正规序算符 NO(A,B)
         right: 右侧算符 C
+        window: 极点窗口 (lo, hi)，None 表示计算全部极点
 
     Returns:
         OPEData 实例
@@ -543,18 +1257,30 @@ def _ope_composite_left(left: NormalOrderedOperator, right: Any) -> OPEData:
     parity_B = _get_parity(B)
     sign = (-1) ** (parity_A * parity_B)
 
-    # 计算 OPE(A, C) 和 OPE(B, C)
-    ope_AC = _compute_ope(A, C)
-    ope_BC = _compute_ope(B, C)
+    lo, hi = window or (0, None)
+
+    # 计算 OPE(A, C) 和 OPE(B, C)（相互独立）
+    # 第三项需要 {AC} 的所有低阶极点，因此 OPE(A, C) 总是完整计算
+    ope_AC, ope_BC = yield from _request_batch([(A, C), _sub_request(B, C, lo, None)])
 
     max_AC = ope_AC.max_pole
     max_BC = ope_BC.max_pole
 
     # 如果两个 OPE 都是零，直接返回零
     if max_AC == 0 and max_BC == 0:
-        return OPEData({0: NormalOrderedOperator(left, right)})
+        zero_ope = OPEData({0: NormalOrderedOperator(left, right)})
+        return zero_ope if window is None else _truncate(zero_ope, lo, hi)
+
+    # 窗口内的极点范围
+    q_min = max(lo, 1)
 
-    result = OPEData({})
+    new_poles: Dict[int, LinearCombination] = {}
+
+    def add_to_pole(q, lc, scale=1):
+        if q in new_poles:
+            new_poles[q]._iadd(lc, scale)
+        else:
+            new_poles[q] = lc.scale(scale)
 
     # 第一项: Σ_{q=1}^{maxBC} Σ_{l=0}^{maxBC-q} NO[∂^l A, {BC}_{l+q}] / l!
     # 预计算 A 的导数（最多需要 max_BC-1 阶）
@@ -562,21 +1288,18 @@ def _ope_composite_left(left: NormalOrderedOperator, right: Any) -> OPEData:
     for l in range(1, max_BC):
         deriv_A_cache[l] = derivative(A, l)
 
-    for q in range(1, max_BC + 1):
-        pole_sum = 0
+    for q in range(q_min, (max_BC if hi is None else min(max_BC, hi)) + 1):
+        pole_sum = LinearCombination()
         for l in range(0, max_BC - q + 1):
-            # 从缓存获取 ∂^l A
-            deriv_A = deriv_A_cache.get(l, A if l == 0 else derivative(A, l))
-
             # 获取 {BC}_{l+q}
-            bracket_BC = ope_BC.pole(l + q)
-            if bracket_BC != 0:
+            bracket_BC = ope_BC.pole_terms(l + q)
+            if bracket_BC:
                 # 计算 NO[∂^l A, {BC}_{l+q}] / l!
-                no_term = NO(deriv_A, bracket_BC)
-                pole_sum = pole_sum + no_term / cached_factorial(l)
+                pole_sum._iadd(_no_terms(deriv_A_cache[l], bracket_BC),
+                               domain_inverse_factorial(l))
 
-        if pole_sum != 0:
-            result._poles[q] = pole_sum
+        if pole_sum:
+            new_poles[q] = pole_sum
 
     # 第二项: sign * Σ_{q=1}^{maxAC} Σ_{l=0}^{maxAC-q} NO[∂^l B, {AC}_{l+q}] / l!
     # 预计算 B 的导数（最多需要 max_AC-1 阶）
@@ -584,39 +1307,42 @@ def _ope_composite_left(left: NormalOrderedOperator, right: Any) -> OPEData:
     for l in range(1, max_AC):
         deriv_B_cache[l] = derivative(B, l)
 
-    for q in range(1, max_AC + 1):
-        pole_sum = 0
+    for q in range(q_min, (max_AC if hi is None else min(max_AC, hi)) + 1):
+        pole_sum = LinearCombination()
         for l in range(0, max_AC - q + 1):
-            # 从缓存获取 ∂^l B
-            deriv_B = deriv_B_cache.get(l, B if l == 0 else derivative(B, l))
-
             # 获取 {AC}_{l+q}
-            bracket_AC = ope_AC.pole(l + q)
-            if bracket_AC != 0:
+            bracket_AC = ope_AC.pole_terms(l + q)
+            if bracket_AC:
                 # 计算 NO[∂^l B, {AC}_{l+q}] / l!
-                no_term = NO(deriv_B, bracket_AC)
-                pole_sum = pole_sum + no_term / cached_factorial(l)
+                pole_sum._iadd(_no_terms(deriv_B_cache[l], bracket_AC),
+                               domain_inverse_factorial(l))
 
-        if pole_sum != 0:
+        if pole_sum:
             # 累加到结果中
-            if q in result._poles:
-                result._poles[q] = result._poles[q] + sign * pole_sum
-            else:
-                result._poles[q] = sign * pole_sum
+            add_to_pole(q, pole_sum, sign)
 
     # 第三项（关键！）: sign * Σ_{q} Σ_{l} {B, {AC}_q}_{l}
     # 这一项来自 Jacobi 恒等式，对于产生高阶极点至关重要
 
-    # 首先计算 BAC[q] = OPE[B, {AC}_q] 对于所有 q
+    # 首先计算 BAC[q] = OPE[B, {AC}_q] 对于所有 q（各项相互独立，可以并行）
+    # 窗口内只有 l = q' - q 落在 [lo-q, hi-q] 的极点有贡献
+    # 经典 OPE 没有第三项，不需要 BAC
+    orders = [q for q in range(1, max_AC + 1) if ope_AC.pole_terms(q) and
+              (hi is None or q < hi)] if _ope_method == QuantumOPEs else []
+    sub_opes = yield from _request_batch([
+        _sub_request(B, ope_AC.pole_terms(q), max(lo - q, 0),
+                     None if hi is None else hi - q)
+        for q in orders])
+    sub_opes = dict(zip(orders, sub_opes))
+
     # 同时计算 max_BAC 和 maxq，避免重复遍历
     BAC = []
     max_BAC = 0
     maxq = 0
 
     for q in range(1, max_AC + 1):
-        bracket_AC_q = ope_AC.pole(q)
-        if bracket_AC_q != 0:
-            ope_B_AC_q = _compute_ope(B, bracket_AC_q)
+        ope_B_AC_q = sub_opes.get(q)
+        if ope_B_AC_q is not None:
             BAC.append(ope_B_AC_q)
 
             # 更新 max_BAC 和 maxq
@@ -633,8 +1359,8 @@ def _ope_composite_left(left: NormalOrderedOperator, right: Any) -> OPEData:
 
     if len(BAC) > 0:
         # 第三项的主循环
-        for q in range(1, maxq + 1):
-            pole_sum = 0
+        for q in range(q_min, (maxq if hi is None else min(maxq, hi)) + 1):
+            pole_sum = LinearCombination()
 
             # l 的范围: Max[1, q-maxAC] <= l <= Min[q-1, maxBAC]
             l_min = max(1, q - max_AC)
@@ -644,18 +1370,15 @@ def _ope_composite_left(left: NormalOrderedOperator, right: Any) -> OPEData:
                 # 检查 q-l 是否在有效范围内
                 if 1 <= q - l <= len(BAC):
                     # 获取 BAC[q-l] 的第 l 极点
-                    bac_pole = BAC[q - l - 1].pole(l)  # -1 因为数组从 0 开始
-                    if bac_pole != 0:
-                        pole_sum = pole_sum + bac_pole
+                    bac_pole = BAC[q - l - 1].pole_terms(l)  # -1 因为数组从 0 开始
+                    if bac_pole:
+                        pole_sum._iadd(bac_pole)
 
-            if pole_sum != 0:
+            if pole_sum:
                 # 累加到结果中
-                if q in result._poles:
-                    result._poles[q] = result._poles[q] + sign * pole_sum
-                else:
-                    result._poles[q] = sign * pole_sum
+                add_to_pole(q, pole_sum, sign)
 
-    return result
+    return OPEData._from_terms(new_poles)
 
 
 def _get_parity(operator: Any) -> int:
@@ -691,7 +1414,7 @@ def bracket(left: Any, right: Any, n: int = None, anticommutator: bool = None) -
 
     **重要**:
     - n = 0: 定义为 NO(A, B)（正规序乘积），不从 OPE 中提取
-    - n >= 1: 从 OPE(A, B) 中提取第 n 阶极点（奇异部分）
+    - n >= 1: 第 n 阶极点（奇异部分），只计算对这一阶有贡献的子 OPE
     - n < 0: 从 OPE 的正则部分提取（很少使用）
 
     Args:
@@ -724,20 +1447,76 @@ def bracket(left: Any, right: Any, n: int = None, anticommutator: bool = None) -
             # 特殊情况：n=0 直接返回正规序乘积
             # 根据 OPEdefs.m: OPEPole[0][A,B] := NO[A,B]
             return NO(left, right)
+        elif n > 0:
+            # n >= 1: 只计算这一阶极点
+            lc = _to_sympy(_compute_pole(left, right, n))
+            return lc.to_expr() if lc else 0
         else:
-            # n >= 1 或 n < 0: 从 OPE 中提取极点
-            ope_result = _compute_ope(left, right)
+            # n < 0: 从 OPE 中提取极点
+            ope_result = _to_sympy(_compute_ope(left, right))
             return ope_result.pole(n)
     else:
         raise ValueError("Either 'n' or 'anticommutator' must be specified")
 
 
+def _is_identity(operator: Any) -> bool:
+    """判断线性组合中的键是否代表单位算符（纯标量项或 One）"""
+    return operator is SCALAR or operator is One
+
+
+def _no_terms(left: Any, right: Any) -> LinearCombination:
+    """
+    计算线性组合的正规序乘积（内部实现）
+
+    NO 对两个参数都是线性的：
+    NO(Σ a_i A_i, Σ b_j B_j) = Σ a_i b_j NO(A_i, B_j)
+
+    纯标量项和 One 作为单位元处理：NO(One, B) = B, NO(A, One) = A。
+
+    Args:
+        left: 左侧算符或 LinearCombination
+        right: 右侧算符或 LinearCombination
+
+    Returns:
+        LinearCombination 实例
+
+    Raises:
+        TypeError: 如果某一项不是算符（例如算符的普通乘积）
+    """
+    left_lc = LinearCombination.from_expr(left)
+    right_lc = LinearCombination.from_expr(right)
+
+    result = LinearCombination()
+    for op_l, coeff_l in left_lc.items():
+        if not isinstance(op_l, Operator) and op_l is not SCALAR:
+            raise TypeError(
+                f"NO requires Operator instances for left operand, got {type(op_l)}"
+            )
+        for op_r, coeff_r in right_lc.items():
+            if not isinstance(op_r, Operator) and op_r is not SCALAR:
+                raise TypeError(
+                    f"NO requires Operator instances for right operand, got {type(op_r)}"
+                )
+            if _is_identity(op_l):
+                term = op_r
+            elif _is_identity(op_r):
+                term = op_l
+            else:
+                term = NormalOrderedOperator(op_l, op_r)
+            result._add_term(term, coeff_l * coeff_r)
+
+    return result
+
+
 def NO(left: Any, right: Any) -> Any:
     """
     计算正规序乘积 (AB)
 
     正规序乘积定义为 OPE 的 0 阶极点：NO(A, B) = {AB}_0
 
+    参数为 LinearCombination 时返回 LinearCombination，否则返回
+    sympy 表达式。
+
     Args:
         left: 左侧算符 A
         right: 右侧算符 B
@@ -751,9 +1530,7 @@ def NO(left: Any, right: Any) -> Any:
         >>> NO(T, J)  # 返回 NormalOrderedOperator(T, J)
     """
     # 处理零算符
-    if left == 0 or left == Zero:
-        return 0
-    if right == 0 or right == Zero:
+    if left is Zero or right is Zero or left == 0 or right == 0:
         return 0
 
     # 处理单位算符
@@ -762,37 +1539,18 @@ def NO(left: Any, right: Any) -> Any:
     if right == One:
         return left
 
-    # 处理线性性
-    if isinstance(left, Add):
-        return sp.Add(*[NO(term, right) for term in left.args])
-    if isinstance(right, Add):
-        return sp.Add(*[NO(left, term) for term in right.args])
-
-    # 处理标量乘法
-    if isinstance(left, Mul):
-        coeff, op = extract_scalar_operator(left)
-        if coeff != 1:
-            return coeff * NO(op, right)
-    if isinstance(right, Mul):
-        coeff, op = extract_scalar_operator(right)
-        if coeff != 1:
-            return coeff * NO(left, op)
-
-    # 确保 left 和 right 都是 Operator 实例
-    if not isinstance(left, Operator):
-        raise TypeError(
-            f"NO requires Operator instances for left operand, got {type(left)}"
-        )
-    if not isinstance(right, Operator):
-        raise TypeError(
-            f"NO requires Operator instances for right operand, got {type(right)}"
-        )
-
-    # 创建正规序算符
-    return NormalOrderedOperator(left, right)
-
-
-def _ope_commute_help(left: Any, right: Any) -> OPEData:
+    # 快速路径：两个算符
+    if isinstance(left, Operator) and isinstance(right, Operator):
+        return NormalOrderedOperator(left, right)
+
+    # 线性组合：在 LinearCombination 上展开
+    result = _no_terms(left, right)
+    if isinstance(left, LinearCombination) or isinstance(right, LinearCombination):
+        return result
+    return result.to_expr()
+
+
+def _ope_commute_help(left: Any, right: Any) -> OPERule:
     """
     计算 OPE(B,A) from OPE(A,B) 使用对称性公式
 
@@ -813,7 +1571,7 @@ def _ope_commute_help(left: Any, right: Any) -> OPEData:
         OPEData 实例表示 OPE[B, A]
     """
     # 计算正确顺序的 OPE: OPE[A, B]
-    ope_AB = _compute_ope(right, left)  # 注意：right 是 A，left 是 B
+    ope_AB = (yield (right, left))  # 注意：right 是 A，left 是 B
 
     if ope_AB.max_pole == 0:
         return OPEData({})
@@ -826,27 +1584,4 @@ def _ope_commute_help(left: Any, right: Any) -> OPEData:
     swap_sign = (-1) ** (parity_A * parity_B)
 
     # 应用公式
-    max_pole = ope_AB.max_pole
-    new_poles = {}
-
-    for q in range(max_pole, 0, -1):
-        # term[q] 累积 pole q 的系数
-        term_q = swap_sign * ((-1) ** q) * ope_AB.pole(q)
-
-        # 添加导数项的贡献
-        for l in range(q + 1, max_pole + 1):
-            # pole(l) 对 pole(q) 的贡献通过 (l-q) 阶导数
-            pole_l = ope_AB.pole(l)
-            if pole_l != 0:
-                # 计算 D^(l-q) [pole_l] / (l-q)!
-                deriv_order = l - q
-                deriv_pole = derivative(pole_l, deriv_order)
-
-                # 系数: swap_sign * (-1)^l / (l-q)!
-                coeff = swap_sign * ((-1) ** l) / sp.factorial(deriv_order)
-                term_q = term_q + coeff * deriv_pole
-
-        if term_q != 0:
-            new_poles[q] = term_q
-
-    return OPEData(new_poles)
+    return OPEData._from_terms(_commute_poles(ope_AB, swap_sign))
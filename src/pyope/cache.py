@@ -5,118 +5,76 @@
 
 优化策略：
 1. 使用延迟导入避免函数内部重复导入开销
-2. 使用唯一的元组键避免哈希冲突
-3. 缓存数学函数计算结果
+2. 使用结构化的键（驻留节点、frozenset），只计算一次并保存在对象上
+3. O(1) 的 LRU 淘汰，按近似字节数限制内存，基本 OPE 固定不淘汰
+4. 缓存数学函数计算结果
 """
 
+from collections import OrderedDict
 from functools import lru_cache
 from typing import Any, Tuple, Hashable, Optional
-import sympy as sp
-from sympy import Add, Mul
 
 # 延迟导入的类型引用（避免循环导入，只导入一次）
 _types_loaded = False
-_BasisOperator = None
-_DerivativeOperator = None
-_NormalOrderedOperator = None
-_ConstantOperator = None
-_extract_scalar_operator = None
+_Operator = None
+_LinearCombination = None
 
 
 def _ensure_types_loaded():
     """确保类型引用已加载（延迟导入，只执行一次）"""
-    global _types_loaded, _BasisOperator, _DerivativeOperator, _NormalOrderedOperator
-    global _ConstantOperator, _extract_scalar_operator
+    global _types_loaded, _Operator, _LinearCombination
     if not _types_loaded:
-        from .operators import BasisOperator, DerivativeOperator, NormalOrderedOperator
-        from .constants import ConstantOperator
-        from .local_operator import extract_scalar_operator
-        _BasisOperator = BasisOperator
-        _DerivativeOperator = DerivativeOperator
-        _NormalOrderedOperator = NormalOrderedOperator
-        _ConstantOperator = ConstantOperator
-        _extract_scalar_operator = extract_scalar_operator
+        from .operators import Operator
+        from .linear_combination import LinearCombination
+        _Operator = Operator
+        _LinearCombination = LinearCombination
         _types_loaded = True
 
 
+# 零表达式的键（空的线性组合）
+_ZERO_KEY = frozenset()
+
+
 def make_operator_key(expr: Any) -> Hashable:
     """
     为算符表达式创建可哈希的键
 
-    将算符表达式转换为可用于缓存键的元组形式。
-    优化版本：使用延迟导入避免每次调用时的导入开销。
+    键是结构化的，并保存在对象上，只计算一次：
+    - 算符：驻留节点本身（哈希值已缓存）
+    - LinearCombination：其 cache_key（frozenset{(算符, 规范化系数)}）
+    - sympy 表达式：先转换为 LinearCombination 再取键
+
+    相等但写法不同的表达式（例如 2*c/2*T 与 c*T）得到相同的键。
 
     Args:
         expr: 算符或表达式
 
     Returns:
-        可哈希的元组键
+        可哈希的键
 
     Examples:
         >>> from pyope import BasisOperator
         >>> T = BasisOperator("T", bosonic=True)
-        >>> key = make_operator_key(T)
-        >>> isinstance(key, tuple)
+        >>> make_operator_key(T) is T
         True
     """
     # 确保类型已加载
     _ensure_types_loaded()
 
-    # 处理 None 和零
-    if expr is None or expr == 0:
-        return ('zero',)
-
-    # BasisOperator
-    if isinstance(expr, _BasisOperator):
-        return ('basis', expr.name, expr.is_bosonic, expr._conformal_weight)
-
-    # DerivativeOperator
-    if isinstance(expr, _DerivativeOperator):
-        base_key = make_operator_key(expr.base)
-        return ('deriv', base_key, expr.order)
-
-    # NormalOrderedOperator
-    if isinstance(expr, _NormalOrderedOperator):
-        left_key = make_operator_key(expr.left)
-        right_key = make_operator_key(expr.right)
-        return ('no', left_key, right_key)
-
-    # ConstantOperator
-    if isinstance(expr, _ConstantOperator):
-        return ('const', expr.name)
-
-    # Sympy Add (加法)
-    if isinstance(expr, Add):
-        # 对项进行排序以确保相同表达式有相同的键
-        term_keys = tuple(sorted(
-            [make_operator_key(arg) for arg in expr.args],
-            key=str
-        ))
-        return ('add', term_keys)
-
-    # Sympy Mul (乘法)
-    if isinstance(expr, Mul):
-        # 提取标量和算符
-        coeff, op = _extract_scalar_operator(expr)
-
-        # 如果是纯标量
-        if coeff == expr:
-            return ('scalar', str(expr))
-
-        # 标量 * 算符
-        op_key = make_operator_key(op)
-        return ('mul', str(coeff), op_key)
-
-    # Sympy Symbol 或其他表达式
-    if isinstance(expr, sp.Expr):
-        return ('expr', str(expr))
-
-    # 其他类型：尝试使用字符串表示
-    try:
-        return ('other', str(expr), type(expr).__name__)
-    except Exception:
-        # 最后的兜底：使用 id
-        return ('id', id(expr))
+    # 算符：节点本身就是键
+    if isinstance(expr, _Operator):
+        return expr
+
+    # LinearCombination：使用保存在对象上的键
+    if isinstance(expr, _LinearCombination):
+        return expr.cache_key
+
+    # 处理 None
+    if expr is None:
+        return _ZERO_KEY
+
+    # sympy 表达式或数字
+    return _LinearCombination.from_expr(expr).cache_key
 
 
 def make_ope_cache_key(left: Any, right: Any) -> Tuple[Hashable, Hashable]:
@@ -135,26 +93,94 @@ def make_ope_cache_key(left: Any, right: Any) -> Tuple[Hashable, Hashable]:
     return (left_key, right_key)
 
 
+def _count_nodes(expr: Any) -> int:
+    """统计 sympy 表达式树的节点数"""
+    args = getattr(expr, 'args', ())
+    if not args:
+        return 1
+    return 1 + sum(_count_nodes(arg) for arg in args)
+
+
+# 近似字节数估计使用的常数
+_OPE_DATA_BYTES = 200       # OPEData 对象和极点字典本身
+_POLE_BYTES = 120           # 每个极点：字典项 + LinearCombination 对象
+_TERM_BYTES = 100           # 每一项：字典项（算符节点是共享的驻留对象，不计入）
+_COEFF_NODE_BYTES = 64      # 系数表达式树的每个节点
+_KEY_BYTES = 150            # 缓存键和 OrderedDict 链表节点
+
+
+def estimate_nbytes(result: Any) -> int:
+    """
+    估计一个缓存项占用的近似字节数
+
+    只统计缓存项独占的部分：极点字典、线性组合的项和系数表达式。
+    算符节点是驻留的共享对象，不计入。
+
+    Args:
+        result: OPEData 实例
+
+    Returns:
+        近似字节数
+    """
+    poles = getattr(result, '_poles', None)
+    if poles is None:
+        return _KEY_BYTES + _OPE_DATA_BYTES
+
+    nbytes = _KEY_BYTES + _OPE_DATA_BYTES
+    for lc in poles.values():
+        nbytes += _POLE_BYTES
+        for _, coeff in lc.items():
+            nbytes += _TERM_BYTES
+            if type(coeff) is not int:
+                nbytes += _COEFF_NODE_BYTES * _count_nodes(coeff)
+    return nbytes
+
+
 class OPECache:
     """
     OPE 计算结果的缓存
 
-    使用字典存储已计算的 OPE 结果，避免重复计算。
+    分为两层：
+    - LRU 层：OrderedDict 实现的 O(1) LRU，受条目数 maxsize 和
+      近似字节数 max_bytes 两个上限约束
+    - 固定层：不会被淘汰的条目（例如生成元之间的基本 OPE），
+      不计入 LRU 层的上限
+
+    每个条目记录计算时用到的注册表 OPE 键（依赖）。重新定义某个
+    OPE 时，只有依赖它的条目会失效（见 invalidate）。
+
+    namespace 区分不同的计算方式（例如经典 OPE）：不为 None 时，
+    它会加入缓存键，不同方式的结果互不干扰。no_ordering 和 domain 同理
+    区分非默认的导数排列方式（由注册表设置）和系数域（见 domains 模块）。
     """
 
-    def __init__(self, maxsize: int = 1024):
+    def __init__(self, maxsize: int = 1024, max_bytes: Optional[int] = None):
         """
         初始化缓存
 
         Args:
-            maxsize: 最大缓存条目数
+            maxsize: LRU 层的最大条目数
+            max_bytes: LRU 层的近似内存上限（字节），None 表示不限制
         """
         self.maxsize = maxsize
-        self._cache = {}
-        self._access_count = {}
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()   # key -> (result, nbytes, deps)
+        self._pinned = {}             # key -> (result, nbytes, deps)
+        self._bytes = 0
+        self._pinned_bytes = 0
+        self._dependents = {}         # 注册表键 -> 依赖它的缓存键集合
+        self._deps_stack = []         # 正在进行的计算所收集的依赖
+        self._journal = None          # 记录写入的条目（并行工作进程使用）
         self.hits = 0
         self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.store_hits = 0
         self.enabled = True  # 缓存启用标志
+        self._store = None    # 可选的持久化存储（OPEStore）
+        self.namespace = None  # 计算方式的命名空间（None 表示默认的量子 OPE）
+        self.no_ordering = None  # 导数排列方式（None 表示默认的低阶导数在左）
+        self.domain = None  # 系数域的标识（None 表示默认的 sympy 表达式）
 
     def disable(self):
         """禁用缓存（用于测试）"""
@@ -164,10 +190,136 @@ class OPECache:
         """启用缓存"""
         self.enabled = True
 
+    def attach_store(self, store):
+        """
+        挂接持久化存储
+
+        挂接后，未命中时从存储中惰性加载，复合 OPE 的结果会写入存储。
+
+        Args:
+            store: OPEStore 实例
+        """
+        self._store = store
+
+    def detach_store(self):
+        """
+        卸下持久化存储（提交缓冲的写入）
+
+        Returns:
+            卸下的存储，如果没有挂接则返回 None
+        """
+        store = self._store
+        self._store = None
+        if store is not None:
+            store.flush()
+        return store
+
+    @property
+    def store(self):
+        """当前挂接的持久化存储"""
+        return self._store
+
+    # ------------------------------------------------------------------
+    # 依赖跟踪
+    # ------------------------------------------------------------------
+
+    def begin_tracking(self):
+        """开始收集一次计算的依赖（与 end_tracking 成对调用）"""
+        self._deps_stack.append(set())
+
+    def end_tracking(self) -> frozenset:
+        """
+        结束收集依赖
+
+        收集到的依赖同时合并到外层计算中。
+
+        Returns:
+            本次计算的依赖（注册表键的集合）
+        """
+        deps = self._deps_stack.pop()
+        if self._deps_stack:
+            self._deps_stack[-1] |= deps
+        return frozenset(deps)
+
+    def reset_tracking(self):
+        """丢弃所有未结束的依赖收集（例如在 fork 出的工作进程中）"""
+        self._deps_stack = []
+
+    def record_dependency(self, registry_key):
+        """记录当前计算用到了注册表中的某个 OPE（包括未定义的）"""
+        if self._deps_stack:
+            self._deps_stack[-1].add(registry_key)
+
+    def record_dependencies(self, registry_keys):
+        """记录当前计算用到了多个注册表 OPE"""
+        if self._deps_stack and registry_keys:
+            self._deps_stack[-1] |= registry_keys
+
+    def invalidate(self, registry_keys) -> int:
+        """
+        使依赖于给定注册表 OPE 的条目失效
+
+        Args:
+            registry_keys: 注册表键 (left_name, right_name) 的可迭代对象
+
+        Returns:
+            失效的条目数
+        """
+        count = 0
+        for registry_key in registry_keys:
+            for key in self._dependents.pop(registry_key, ()):
+                if self._remove(key):
+                    count += 1
+        self.invalidations += count
+        return count
+
+    def invalidate_operator(self, name: str) -> int:
+        """
+        使依赖于某个算符的任何注册表 OPE 的条目失效
+
+        用于算符新注册（排序位置改变）的情况。
+
+        Args:
+            name: 算符名称
+
+        Returns:
+            失效的条目数
+        """
+        keys = [k for k in self._dependents if name in k]
+        return self.invalidate(keys)
+
+    def _unlink(self, key, deps):
+        """从依赖索引中移除一个缓存键"""
+        for registry_key in deps:
+            dependents = self._dependents.get(registry_key)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[registry_key]
+
+    def _remove(self, key) -> bool:
+        """从任意一层移除一个键，返回是否存在"""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+        else:
+            entry = self._pinned.pop(key, None)
+            if entry is None:
+                return False
+            self._pinned_bytes -= entry[1]
+        self._unlink(key, entry[2])
+        return True
+
+    # ------------------------------------------------------------------
+    # 查询与写入
+    # ------------------------------------------------------------------
+
     def get(self, left: Any, right: Any):
         """
         从缓存获取 OPE 结果
 
+        命中时条目的依赖会合并到正在进行的计算中。
+
         Args:
             left: 左侧算符
             right: 右侧算符
@@ -180,20 +332,31 @@ class OPECache:
             return None
 
         try:
-            key = make_ope_cache_key(left, right)
-            if key in self._cache:
-                self.hits += 1
-                self._access_count[key] = self._access_count.get(key, 0) + 1
-                return self._cache[key]
-            else:
-                self.misses += 1
-                return None
+            key = self._make_key(left, right)
         except Exception:
             # 如果无法创建键，跳过缓存
             self.misses += 1
             return None
 
-    def put(self, left: Any, right: Any, result):
+        entry = self._pinned.get(key)
+        if entry is None:
+            entry = self._cache.get(key)
+            if entry is None:
+                entry = self._load_from_store(left, right, key)
+                if entry is None:
+                    self.misses += 1
+                    return None
+            else:
+                # 标记为最近使用
+                self._cache.move_to_end(key)
+
+        self.hits += 1
+        if self._deps_stack and entry[2]:
+            self._deps_stack[-1] |= entry[2]
+        return entry[0]
+
+    def put(self, left: Any, right: Any, result, pin: bool = False,
+            deps: frozenset = frozenset()):
         """
         将 OPE 结果放入缓存
 
@@ -201,45 +364,178 @@ class OPECache:
             left: 左侧算符
             right: 右侧算符
             result: OPEData 结果
+            pin: 是否放入固定层（永不淘汰）
+            deps: 结果依赖的注册表键
         """
         if not self.enabled:
             return
 
         try:
-            # 检查缓存大小
-            if len(self._cache) >= self.maxsize:
-                self._evict_lru()
-
-            key = make_ope_cache_key(left, right)
-            self._cache[key] = result
-            self._access_count[key] = 1
+            key = self._make_key(left, right)
         except Exception:
             # 如果无法创建键，跳过缓存
-            pass
+            return
+
+        if self._journal is not None:
+            self._journal.append((left, right, result, pin, deps))
+
+        nbytes = estimate_nbytes(result)
 
-    def _evict_lru(self):
-        """移除最少使用的缓存项"""
-        if not self._cache:
+        if pin:
+            self._remove(key)
+            self._pinned[key] = (result, nbytes, deps)
+            self._pinned_bytes += nbytes
+            self._link(key, deps)
             return
 
-        # 找到访问次数最少的键
-        lru_key = min(self._access_count.items(), key=lambda x: x[1])[0]
-        del self._cache[lru_key]
-        del self._access_count[lru_key]
+        if key in self._pinned:
+            return
+
+        self._insert(key, result, nbytes, deps)
+
+        store = self._store
+        if store is not None and store.accepts(left, right):
+            store.save(left, right, result, deps, namespace=self._store_namespace())
+
+    def _make_key(self, left: Any, right: Any) -> Tuple:
+        """缓存键：OPE 键加上命名空间和导数排列方式"""
+        key = make_ope_cache_key(left, right)
+        if self.namespace is not None:
+            key = key + (self.namespace,)
+        if self.no_ordering is not None:
+            key = key + (('no_ordering', self.no_ordering),)
+        if self.domain is not None:
+            key = key + (('domain', self.domain),)
+        return key
+
+    def _store_namespace(self) -> Optional[str]:
+        """持久化存储的命名空间：计算方式和系数域（导数排列方式在指纹中）"""
+        if self.domain is None:
+            return self.namespace
+        if self.namespace is None:
+            return self.domain
+        return f"{self.namespace}/{self.domain}"
+
+    def start_journal(self):
+        """开始记录之后写入的条目"""
+        self._journal = []
+
+    def stop_journal(self) -> list:
+        """
+        停止记录
 
-    def clear(self):
-        """清空缓存"""
+        Returns:
+            记录的 (left, right, result, pin, deps) 列表，可用 merge 合并到另一个缓存
+        """
+        journal = self._journal or []
+        self._journal = None
+        return journal
+
+    def merge(self, entries):
+        """
+        合并其他缓存（例如工作进程）记录的条目
+
+        Args:
+            entries: (left, right, result, pin, deps) 的可迭代对象
+        """
+        for left, right, result, pin, deps in entries:
+            self.put(left, right, result, pin=pin, deps=deps)
+
+    def _link(self, key, deps):
+        """把缓存键加入依赖索引"""
+        for registry_key in deps:
+            dependents = self._dependents.get(registry_key)
+            if dependents is None:
+                self._dependents[registry_key] = {key}
+            else:
+                dependents.add(key)
+
+    def _insert(self, key, result, nbytes: Optional[int] = None, deps: frozenset = frozenset()):
+        """放入 LRU 层并按需淘汰，返回新条目"""
+        if nbytes is None:
+            nbytes = estimate_nbytes(result)
+        self._remove(key)
+        entry = (result, nbytes, deps)
+        self._cache[key] = entry
+        self._bytes += nbytes
+        self._link(key, deps)
+        self._evict()
+        return entry
+
+    def _load_from_store(self, left: Any, right: Any, key):
+        """从持久化存储加载并放入 LRU 层，未找到时返回 None"""
+        store = self._store
+        if store is None or not store.accepts(left, right):
+            return None
+        try:
+            loaded = store.load_entry(left, right, namespace=self._store_namespace())
+        except Exception:
+            return None
+        if loaded is None:
+            return None
+        result, deps = loaded
+        self.store_hits += 1
+        return self._insert(key, result, deps=deps)
+
+    def pin(self, left: Any, right: Any, result):
+        """将 OPE 结果放入固定层（等价于 put(..., pin=True)）"""
+        self.put(left, right, result, pin=True)
+
+    def _evict(self):
+        """按 LRU 顺序淘汰，直到满足条目数和字节数上限（每次淘汰 O(1)）"""
+        cache = self._cache
+        while cache and (len(cache) > self.maxsize or
+                         (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            key, (_, nbytes, deps) = cache.popitem(last=False)
+            self._bytes -= nbytes
+            self._unlink(key, deps)
+            self.evictions += 1
+
+    def resize(self, maxsize: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        修改 LRU 层的上限，必要时立即淘汰
+
+        Args:
+            maxsize: 新的最大条目数（None 表示不变）
+            max_bytes: 新的近似内存上限（None 表示不变）
+        """
+        if maxsize is not None:
+            self.maxsize = maxsize
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self, keep_pinned: bool = False):
+        """
+        清空缓存
+
+        Args:
+            keep_pinned: 是否保留固定层
+        """
         self._cache.clear()
-        self._access_count.clear()
+        self._bytes = 0
+        self._dependents.clear()
+        if keep_pinned:
+            for key, entry in self._pinned.items():
+                self._link(key, entry[2])
+        else:
+            self._pinned.clear()
+            self._pinned_bytes = 0
         self.hits = 0
         self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.store_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._cache) + len(self._pinned)
 
     def stats(self):
         """
         返回缓存统计信息
 
         Returns:
-            包含命中率等信息的字典
+            包含命中率、条目数和近似字节数等信息的字典
         """
         total = self.hits + self.misses
         hit_rate = self.hits / total if total > 0 else 0
@@ -250,12 +546,19 @@ class OPECache:
             'total_requests': total,
             'hit_rate': hit_rate,
             'cache_size': len(self._cache),
-            'max_size': self.maxsize
+            'max_size': self.maxsize,
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'pinned_size': len(self._pinned),
+            'pinned_bytes': self._pinned_bytes,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'store_hits': self.store_hits,
         }
 
 
 # 全局缓存实例
-_global_ope_cache = OPECache(maxsize=2048)
+_global_ope_cache = OPECache(maxsize=2048, max_bytes=256 * 1024 * 1024)
 
 
 def get_ope_cache() -> OPECache:
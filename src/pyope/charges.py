@@ -0,0 +1,219 @@
+"""
+荷格模块
+
+任意多个加性 U(1) 荷（如量子数 (m, r)）在生成元上声明，
+复合算符的荷由结构递归得到：
+
+- 导数不改变荷：Q(∂A) = Q(A)
+- 正规序乘积的荷相加：Q(NO(A, B)) = Q(A) + Q(B)
+- 线性组合的各项必须有相同的荷（homogeneous=False 时取第一项的荷）
+
+荷只声明在驻留的算符节点上：在线性组合（如 2 NO(b, c) + 3 NO(β, γ)）上声明时，
+荷声明在它的每个算符项上，因此线性组合的导数（求导后分配到各项）也有相同的荷。
+每个驻留的算符节点只计算一次，结果保存在节点上；声明新的荷之后，
+节点上保存的旧结果自动失效。按荷分组只需要对算符列表做一次字典遍历。
+
+Examples:
+    >>> lattice = ChargeLattice({b: (1, Fraction(1, 2)), c: (-1, Fraction(-1, 2))},
+    ...                         names=('m', 'r'))
+    >>> lattice.charge(NO(d(b), c))
+    (Fraction(0, 1), Fraction(0, 1))
+    >>> lattice.group([b, NO(b, c), d(b)])
+    {(Fraction(1, 1), Fraction(1, 2)): [b, ∂b], (Fraction(0, 1), Fraction(0, 1)): [NO(b,c)]}
+"""
+
+from collections import defaultdict
+from fractions import Fraction
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import sympy as sp
+
+from .operators import DerivativeOperator, NormalOrderedOperator, Operator
+
+
+Charge = Tuple[Fraction, ...]
+
+
+class ChargeLattice:
+    """
+    加性荷格
+
+    Attributes:
+        names: 各个荷的名称（如 ('m', 'r')）
+        rank: 荷的个数
+        homogeneous: 是否要求线性组合的各项有相同的荷
+    """
+
+    def __init__(self, charges: Optional[Mapping[Any, Any]] = None,
+                 names: Optional[Sequence[str]] = None, homogeneous: bool = True):
+        """
+        Args:
+            charges: 可选的荷 {生成元: 荷}，荷是一个数或一个元组
+            names: 荷的名称（默认为 q0, q1, ...，个数由第一个声明的荷确定）
+            homogeneous: 为 True 时荷不同的线性组合报错，否则取第一项的荷
+        """
+        self.names = tuple(names) if names is not None else None
+        self.rank = len(self.names) if self.names is not None else None
+        self.homogeneous = homogeneous
+        self._declared: Dict[Any, Charge] = {}
+        # 非算符表达式（如 sympy 线性组合）不能在节点上保存结果，记在这里
+        self._memo: Dict[Any, Charge] = {}
+        # 节点上保存的结果带有这个标记，声明改变时换一个新的标记
+        self._token = object()
+        for op, charge in (charges or {}).items():
+            self.declare(op, charge)
+
+    def declare(self, op: Any, charge: Any) -> None:
+        """
+        声明算符的荷
+
+        通常在生成元（自由场）上声明；也可以在复合算符上声明，此时直接使用声明的值。
+        在算符的线性组合上声明时，荷声明在它的每个算符项上。
+
+        Args:
+            op: 算符或算符的线性组合
+            charge: 荷（一个数或一个元组）
+
+        Raises:
+            ValueError: 如果荷的个数与荷格不一致，线性组合的某一项不是算符，
+                        或某个算符项已经声明了不同的荷
+        """
+        from .linear_combination import LinearCombination, SCALAR
+
+        charge = _as_charge(charge)
+        if self.rank is None:
+            self.rank = len(charge)
+            self.names = tuple(f"q{i}" for i in range(self.rank))
+        if len(charge) != self.rank:
+            raise ValueError(f"Charge {charge} of {op} does not have {self.rank} components")
+
+        if isinstance(op, Operator):
+            terms = [op]
+        else:
+            terms = [term for term, _ in LinearCombination.from_expr(op).items()
+                     if term is not SCALAR]
+            for term in terms:
+                if not isinstance(term, Operator):
+                    raise ValueError(f"Cannot declare a charge on the term {term} of {op}")
+                if self._declared.get(term, charge) != charge:
+                    raise ValueError(f"{term} in {op} already has charge {self._declared[term]}")
+        for term in terms:
+            self._declared[term] = charge
+        self._memo.clear()
+        self._token = object()
+
+    def declared(self) -> Dict[Any, Charge]:
+        """声明过的荷 {算符: 荷}"""
+        return dict(self._declared)
+
+    def zero(self) -> Charge:
+        """零荷"""
+        return tuple(Fraction(0) for _ in range(self.rank or 0))
+
+    def charge(self, expr: Any) -> Charge:
+        """
+        表达式的荷
+
+        没有声明荷的基本算符的荷为零。
+
+        Args:
+            expr: 算符、sympy 表达式或 LinearCombination
+
+        Returns:
+            荷的元组
+
+        Raises:
+            ValueError: 如果线性组合中各项的荷不同（homogeneous=True 时）
+        """
+        if isinstance(expr, Operator):
+            entry = getattr(expr, '_charge_entry', None)
+            if entry is not None and entry[0] is self._token:
+                return entry[1]
+            value = self._operator_charge(expr)
+            expr._charge_entry = (self._token, value)
+            return value
+
+        try:
+            value = self._memo.get(expr)
+        except TypeError:
+            # 不可哈希的输入（如 LinearCombination）不记忆
+            return self._expression_charge(expr)
+        if value is None:
+            value = self._expression_charge(expr)
+            self._memo[expr] = value
+        return value
+
+    def _operator_charge(self, op: Operator) -> Charge:
+        """单个算符节点的荷（子节点的结果保存在子节点上）"""
+        declared = self._declared.get(op)
+        if declared is not None:
+            return declared
+        if isinstance(op, DerivativeOperator):
+            return self.charge(op.base)
+        if isinstance(op, NormalOrderedOperator):
+            return _add(self.charge(op.left), self.charge(op.right))
+        return self.zero()
+
+    def _expression_charge(self, expr: Any) -> Charge:
+        """非算符表达式的荷"""
+        from .linear_combination import LinearCombination, SCALAR
+
+        if isinstance(expr, LinearCombination):
+            terms = [op for op, _ in expr.items() if op is not SCALAR]
+        elif isinstance(expr, sp.Add):
+            terms = list(expr.args)
+        else:
+            terms = [expr]
+
+        charges = []
+        for term in terms:
+            if isinstance(term, (Operator, sp.Add)):
+                charges.append(self.charge(term))
+            elif isinstance(term, sp.Mul):
+                # 系数乘算符：只有算符因子带荷
+                value = self.zero()
+                for factor in term.args:
+                    if isinstance(factor, (Operator, sp.Add)):
+                        value = _add(value, self.charge(factor))
+                charges.append(value)
+        # 纯标量的项（单位算符）不带荷
+        if not charges:
+            return self.zero()
+        if self.homogeneous and len(set(charges)) > 1:
+            raise ValueError(f"Expression {expr} mixes charges {sorted(set(charges))}")
+        return charges[0]
+
+    def group(self, operators: Sequence[Any],
+              components: Optional[Sequence[int]] = None) -> Dict[Charge, List[Any]]:
+        """
+        按荷对算符分组（一次字典遍历，保持算符的原有顺序）
+
+        Args:
+            operators: 算符列表
+            components: 只按这些荷分组（下标列表，默认为全部荷）
+
+        Returns:
+            字典 {荷: [算符列表]}，按荷第一次出现的顺序排列
+        """
+        groups = defaultdict(list)
+        for op in operators:
+            charge = self.charge(op)
+            if components is not None:
+                charge = tuple(charge[i] for i in components)
+            groups[charge].append(op)
+        return dict(groups)
+
+    def __repr__(self) -> str:
+        return f"ChargeLattice(names={self.names}, generators={len(self._declared)})"
+
+
+def _as_charge(value: Any) -> Charge:
+    """把一个数或元组转换为荷的元组"""
+    if isinstance(value, (tuple, list)):
+        return tuple(Fraction(x) for x in value)
+    return (Fraction(value),)
+
+
+def _add(a: Charge, b: Charge) -> Charge:
+    """荷相加"""
+    return tuple(x + y for x, y in zip(a, b))
@@ -66,6 +66,10 @@ class ConstantOperator(Operator):
         """字符串表示"""
         return f"ConstantOperator('{self._name}')"
 
+    def __reduce_ex__(self, protocol):
+        """序列化：反序列化时恢复为同一个常数算符实例（One、Zero）"""
+        return (_rebuild_constant, (self._name,))
+
     def _latex(self, printer=None):
         """
         LaTeX 渲染
@@ -111,6 +115,15 @@ Zero = ConstantOperator("Zero")
 """
 
 
+def _rebuild_constant(name: str) -> ConstantOperator:
+    """反序列化辅助函数：预定义的常数算符返回同一个实例"""
+    if name == "One":
+        return One
+    if name == "Zero":
+        return Zero
+    return ConstantOperator(name)
+
+
 # Delta 函数
 
 class DeltaFunction(Function):
@@ -0,0 +1,587 @@
+"""
+系数域模块
+
+OPE 计算中的系数默认是任意的 sympy 表达式，每一次极点累加都经过
+sympy 的算术。本模块提供可选的系数域，计算在域中进行，结果在返回给
+用户时再转换为 sympy 表达式：
+
+- EX: sympy 表达式（默认）
+- QQ: 有理数（fractions.Fraction）；可以给出参数的数值，例如固定中心荷
+  QQ.with_values({c: -2})
+- QQ[c, ...]: 以声明的参数为变量、有理数为系数的稀疏多项式
+- GF(p): 素数域，用于快速的随机化检查（参数取给定的数值）
+
+同一个计算中的系数都属于同一个域：注册表中的 OPE 和 OPE 的参数在
+进入计算时转换，二项式系数和阶乘的倒数由域给出。不同域的结果在缓存中
+使用不同的命名空间。
+
+Examples:
+    >>> with coefficient_domain(QQ.with_values({c: Rational(1, 2)})):
+    ...     result = OPE(NO(T, T), NO(T, T))
+    >>> OPE(NO(T, T), NO(T, T), domain=GF(32003, values={c: 17}))
+"""
+
+import math
+from contextlib import contextmanager
+from fractions import Fraction
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import sympy as sp
+
+from .cache import cached_binomial, cached_factorial
+
+
+class CoefficientDomain:
+    """
+    系数域的基类，同时也是默认的 sympy 表达式域（EX）
+
+    子类给出域元素与 sympy 表达式之间的转换，以及计算引擎使用的常数。
+
+    Attributes:
+        key: 域的字符串标识，用作缓存和持久化存储的命名空间
+    """
+
+    key = "EX"
+
+    @property
+    def is_default(self) -> bool:
+        """是否为默认的 sympy 表达式域"""
+        return self.key == EX.key
+
+    def convert(self, coeff: Any) -> Any:
+        """把 sympy 表达式或 Python 数字转换为域元素"""
+        return coeff
+
+    def contains(self, coeff: Any) -> bool:
+        """系数是否已经是域元素"""
+        return True
+
+    def to_sympy(self, coeff: Any) -> Any:
+        """把域元素转换为 sympy 表达式"""
+        return coeff
+
+    def binomial(self, n: int, k: int) -> Any:
+        """二项式系数 C(n, k)"""
+        return cached_binomial(n, k)
+
+    def inverse_factorial(self, n: int) -> Any:
+        """1 / n!"""
+        return 1 / cached_factorial(n)
+
+    def convert_lc(self, lc: Any) -> Any:
+        """
+        把 LinearCombination 的系数转换到域中
+
+        所有系数都已经是域元素时原样返回（保留缓存键）。
+        """
+        from .linear_combination import LinearCombination
+
+        if all(self.contains(coeff) for coeff in lc._terms.values()):
+            return lc
+        result = LinearCombination()
+        for op, coeff in lc.items():
+            result._add_term(op, self.convert(coeff))
+        return result
+
+    def lc_to_sympy(self, lc: Any) -> Any:
+        """把 LinearCombination 的系数转换为 sympy 表达式"""
+        from .linear_combination import LinearCombination
+
+        if self.is_default:
+            return lc
+        result = LinearCombination()
+        for op, coeff in lc.items():
+            result._add_term(op, self.to_sympy(coeff))
+        return result
+
+    def convert_ope(self, ope: Any) -> Any:
+        """把 OPEData 的系数转换到域中"""
+        from .ope_data import OPEData
+
+        if self.is_default:
+            return ope
+        return OPEData._from_terms({n: self.convert_lc(lc) for n, lc in ope._poles.items()})
+
+    def ope_to_sympy(self, ope: Any) -> Any:
+        """把 OPEData 的系数转换为 sympy 表达式"""
+        from .ope_data import OPEData
+
+        if self.is_default:
+            return ope
+        return OPEData._from_terms({n: self.lc_to_sympy(lc) for n, lc in ope._poles.items()})
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, CoefficientDomain) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return self.key
+
+
+def _format_values(values: Dict[Any, Any]) -> str:
+    """参数数值的规范字符串（用于域的标识）"""
+    return ", ".join(f"{symbol}={value}" for symbol, value in
+                     sorted(values.items(), key=lambda item: str(item[0])))
+
+
+def _sympify_values(values: Optional[Dict[Any, Any]]) -> Dict[Any, Any]:
+    """参数数值：键转换为 sympy 符号，值转换为 sympy 有理数"""
+    if not values:
+        return {}
+    result = {}
+    for symbol, value in values.items():
+        if isinstance(symbol, str):
+            symbol = sp.Symbol(symbol)
+        value = sp.sympify(value)
+        if not value.is_Rational:
+            raise ValueError(f"Parameter value {symbol}={value} is not rational")
+        result[symbol] = value
+    return result
+
+
+def _as_rational(coeff: Any, values: Dict[Any, Any], domain: Any) -> Fraction:
+    """把系数代入参数数值后转换为 Fraction"""
+    if type(coeff) is int or isinstance(coeff, Fraction):
+        return Fraction(coeff)
+    coeff = sp.sympify(coeff)
+    if values:
+        coeff = coeff.xreplace(values)
+    if not coeff.is_Rational:
+        raise ValueError(f"Coefficient {coeff} is not in {domain}; "
+                         f"declare its parameters or give their values")
+    return Fraction(int(coeff.p), int(coeff.q))
+
+
+class RationalField(CoefficientDomain):
+    """
+    有理数域 QQ，元素为 int 或 fractions.Fraction
+
+    QQ[c, ...] 给出以 c, ... 为变量的多项式环；QQ.with_values({c: v})
+    给出把参数代入数值后的有理数域。
+    """
+
+    def __init__(self, values: Optional[Dict[Any, Any]] = None):
+        """
+        Args:
+            values: 参数的数值 {符号: 有理数}
+        """
+        self.values = _sympify_values(values)
+        self.key = f"QQ({_format_values(self.values)})" if self.values else "QQ"
+
+    def with_values(self, values: Dict[Any, Any]) -> 'RationalField':
+        """代入参数数值后的有理数域"""
+        return RationalField({**self.values, **_sympify_values(values)})
+
+    def __getitem__(self, params: Any) -> 'PolynomialRing':
+        """QQ[c] 或 QQ[c, k]: 多项式环"""
+        if not isinstance(params, tuple):
+            params = (params,)
+        return PolynomialRing(params)
+
+    def convert(self, coeff: Any) -> Any:
+        if type(coeff) is int:
+            return coeff
+        return _as_rational(coeff, self.values, self)
+
+    def contains(self, coeff: Any) -> bool:
+        return type(coeff) is int or isinstance(coeff, Fraction)
+
+    def to_sympy(self, coeff: Any) -> Any:
+        if type(coeff) is int:
+            return sp.Integer(coeff)
+        return sp.Rational(coeff.numerator, coeff.denominator)
+
+    def binomial(self, n: int, k: int) -> int:
+        return math.comb(n, k)
+
+    def inverse_factorial(self, n: int) -> Fraction:
+        return Fraction(1, math.factorial(n))
+
+
+class SparsePolynomial:
+    """
+    多项式环 QQ[c, ...] 的元素
+
+    以字典 {指数元组: 有理系数} 稀疏存储，不含零系数。可以与 int 和
+    Fraction 混合运算。
+    """
+
+    __slots__ = ('ring', 'terms')
+
+    def __init__(self, ring: 'PolynomialRing', terms: Dict[Tuple[int, ...], Any]):
+        """
+        Args:
+            ring: 所属的多项式环
+            terms: {指数元组: 系数}，调用者保证没有零系数
+        """
+        self.ring = ring
+        self.terms = terms
+
+    def _coerce(self, other: Any) -> Optional[Dict[Tuple[int, ...], Any]]:
+        """另一个运算数的项字典（不支持的类型返回 None）"""
+        if isinstance(other, SparsePolynomial):
+            return other.terms
+        if type(other) is int or isinstance(other, Fraction):
+            return {self.ring.constant_monomial: other} if other else {}
+        return None
+
+    def __add__(self, other: Any) -> Any:
+        other_terms = self._coerce(other)
+        if other_terms is None:
+            return NotImplemented
+        terms = dict(self.terms)
+        for monomial, coeff in other_terms.items():
+            value = terms.get(monomial, 0) + coeff
+            if value:
+                terms[monomial] = value
+            else:
+                terms.pop(monomial, None)
+        return SparsePolynomial(self.ring, terms)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> 'SparsePolynomial':
+        return SparsePolynomial(self.ring, {m: -coeff for m, coeff in self.terms.items()})
+
+    def __sub__(self, other: Any) -> Any:
+        if self._coerce(other) is None:
+            return NotImplemented
+        return self + (-other)
+
+    def __rsub__(self, other: Any) -> Any:
+        if self._coerce(other) is None:
+            return NotImplemented
+        return (-self) + other
+
+    def __mul__(self, other: Any) -> Any:
+        if type(other) is int or isinstance(other, Fraction):
+            if not other:
+                return SparsePolynomial(self.ring, {})
+            return SparsePolynomial(self.ring, {m: coeff * other for m, coeff in self.terms.items()})
+        if not isinstance(other, SparsePolynomial):
+            return NotImplemented
+        terms = {}
+        for m1, c1 in self.terms.items():
+            for m2, c2 in other.terms.items():
+                monomial = tuple(a + b for a, b in zip(m1, m2))
+                value = terms.get(monomial, 0) + c1 * c2
+                if value:
+                    terms[monomial] = value
+                else:
+                    terms.pop(monomial, None)
+        return SparsePolynomial(self.ring, terms)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> Any:
+        if type(other) is int or isinstance(other, Fraction):
+            return self * Fraction(1, other)
+        return NotImplemented
+
+    def __eq__(self, other: Any) -> bool:
+        other_terms = self._coerce(other)
+        if other_terms is None:
+            return NotImplemented
+        return self.terms == other_terms
+
+    def __hash__(self) -> int:
+        if not self.terms:
+            return hash(0)
+        if len(self.terms) == 1 and self.ring.constant_monomial in self.terms:
+            return hash(self.terms[self.ring.constant_monomial])
+        return hash(frozenset(self.terms.items()))
+
+    def __bool__(self) -> bool:
+        return bool(self.terms)
+
+    def __getstate__(self):
+        return (self.ring, self.terms)
+
+    def __setstate__(self, state):
+        self.ring, self.terms = state
+
+    def _sympy_(self):
+        return self.ring.to_sympy(self)
+
+    def __repr__(self) -> str:
+        return str(self.ring.to_sympy(self))
+
+
+class PolynomialRing(CoefficientDomain):
+    """
+    多项式环 QQ[c, ...]，元素为 SparsePolynomial（常数也可以是 int 或 Fraction）
+
+    系数必须是声明的参数的多项式；出现其他符号或参数在分母中时报错。
+    """
+
+    def __init__(self, params: Sequence[Any]):
+        """
+        Args:
+            params: 参数（sympy 符号或名字）
+        """
+        if not params:
+            raise ValueError("A polynomial ring needs at least one parameter")
+        self.params = tuple(sp.Symbol(p) if isinstance(p, str) else p for p in params)
+        self.constant_monomial = (0,) * len(self.params)
+        self.key = f"QQ[{', '.join(str(p) for p in self.params)}]"
+
+    def convert(self, coeff: Any) -> Any:
+        if isinstance(coeff, SparsePolynomial):
+            return coeff
+        if type(coeff) is int or isinstance(coeff, Fraction):
+            return SparsePolynomial(self, {self.constant_monomial: coeff} if coeff else {})
+        try:
+            poly = sp.Poly(sp.sympify(coeff), *self.params, domain=sp.QQ)
+        except (sp.PolynomialError, sp.polys.polyerrors.CoercionFailed):
+            raise ValueError(f"Coefficient {coeff} is not in {self}") from None
+        terms = {}
+        for monomial, value in poly.terms():
+            value = sp.Rational(value)
+            terms[monomial] = Fraction(int(value.p), int(value.q))
+        return SparsePolynomial(self, terms)
+
+    def contains(self, coeff: Any) -> bool:
+        return (isinstance(coeff, SparsePolynomial) or type(coeff) is int or
+                isinstance(coeff, Fraction))
+
+    def to_sympy(self, coeff: Any) -> Any:
+        if not isinstance(coeff, SparsePolynomial):
+            return sp.Rational(coeff.numerator, coeff.denominator) \
+                if isinstance(coeff, Fraction) else sp.Integer(coeff)
+        terms = []
+        for monomial, value in coeff.terms.items():
+            factors = [p ** e for p, e in zip(self.params, monomial) if e]
+            terms.append(sp.Rational(value.numerator, value.denominator) * sp.Mul(*factors))
+        return sp.Add(*terms)
+
+    def binomial(self, n: int, k: int) -> int:
+        return math.comb(n, k)
+
+    def inverse_factorial(self, n: int) -> Fraction:
+        return Fraction(1, math.factorial(n))
+
+
+class GFElement:
+    """
+    素数域 GF(p) 的元素
+
+    可以与 int 和 Fraction 混合运算（它们先约化到 GF(p) 中）。
+    """
+
+    __slots__ = ('value', 'p')
+
+    def __init__(self, value: int, p: int):
+        """
+        Args:
+            value: 代表元，0 <= value < p
+            p: 素数
+        """
+        self.value = value
+        self.p = p
+
+    def _coerce(self, other: Any) -> Optional[int]:
+        """另一个运算数在 GF(p) 中的代表元（不支持的类型返回 None）"""
+        if isinstance(other, GFElement):
+            if other.p != self.p:
+                raise ValueError(f"Cannot mix GF({self.p}) and GF({other.p})")
+            return other.value
+        if type(other) is int:
+            return other % self.p
+        if isinstance(other, Fraction):
+            return other.numerator * pow(other.denominator, -1, self.p) % self.p
+        return None
+
+    def __add__(self, other: Any) -> Any:
+        value = self._coerce(other)
+        if value is None:
+            return NotImplemented
+        return GFElement((self.value + value) % self.p, self.p)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> 'GFElement':
+        return GFElement(-self.value % self.p, self.p)
+
+    def __sub__(self, other: Any) -> Any:
+        value = self._coerce(other)
+        if value is None:
+            return NotImplemented
+        return GFElement((self.value - value) % self.p, self.p)
+
+    def __rsub__(self, other: Any) -> Any:
+        value = self._coerce(other)
+        if value is None:
+            return NotImplemented
+        return GFElement((value - self.value) % self.p, self.p)
+
+    def __mul__(self, other: Any) -> Any:
+        value = self._coerce(other)
+        if value is None:
+            return NotImplemented
+        return GFElement(self.value * value % self.p, self.p)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> Any:
+        value = self._coerce(other)
+        if value is None:
+            return NotImplemented
+        return GFElement(self.value * pow(value, -1, self.p) % self.p, self.p)
+
+    def __rtruediv__(self, other: Any) -> Any:
+        value = self._coerce(other)
+        if value is None:
+            return NotImplemented
+        return GFElement(value * pow(self.value, -1, self.p) % self.p, self.p)
+
+    def __eq__(self, other: Any) -> bool:
+        value = self._coerce(other)
+        if value is None:
+            return NotImplemented
+        return self.value == value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __bool__(self) -> bool:
+        return self.value != 0
+
+    def __getstate__(self):
+        return (self.value, self.p)
+
+    def __setstate__(self, state):
+        self.value, self.p = state
+
+    def _sympy_(self):
+        return sp.Integer(self.value)
+
+    def __repr__(self) -> str:
+        return f"{self.value} mod {self.p}"
+
+
+class PrimeField(CoefficientDomain):
+    """
+    素数域 GF(p)，元素为 GFElement（常数也可以是 int）
+
+    系数中的参数必须给出数值。阶数不小于 p 的阶乘在 GF(p) 中为零，
+    此时 1/n! 无法计算，需要更大的 p。
+    """
+
+    def __init__(self, p: int, values: Optional[Dict[Any, Any]] = None):
+        """
+        Args:
+            p: 素数
+            values: 参数的数值 {符号: 有理数}
+
+        Raises:
+            ValueError: 如果 p 不是素数
+        """
+        if not sp.isprime(p):
+            raise ValueError(f"GF(p) needs a prime modulus, got {p}")
+        self.p = p
+        self.values = _sympify_values(values)
+        suffix = f", {_format_values(self.values)}" if self.values else ""
+        self.key = f"GF({p}{suffix})"
+
+    def convert(self, coeff: Any) -> Any:
+        if isinstance(coeff, GFElement):
+            return coeff
+        if type(coeff) is int:
+            return GFElement(coeff % self.p, self.p)
+        value = _as_rational(coeff, self.values, self)
+        if value.denominator % self.p == 0:
+            raise ValueError(f"Coefficient {coeff} has no image in {self}")
+        return GFElement(value.numerator * pow(value.denominator, -1, self.p) % self.p, self.p)
+
+    def contains(self, coeff: Any) -> bool:
+        return isinstance(coeff, GFElement) or type(coeff) is int
+
+    def to_sympy(self, coeff: Any) -> Any:
+        if isinstance(coeff, GFElement):
+            return sp.Integer(coeff.value)
+        return sp.Integer(coeff % self.p)
+
+    def binomial(self, n: int, k: int) -> int:
+        return math.comb(n, k)
+
+    def inverse_factorial(self, n: int) -> GFElement:
+        if n >= self.p:
+            raise ValueError(f"{n}! vanishes in {self}; use a larger prime")
+        return GFElement(pow(math.factorial(n) % self.p, -1, self.p), self.p)
+
+
+def GF(p: int, values: Optional[Dict[Any, Any]] = None) -> PrimeField:
+    """
+    素数域 GF(p)
+
+    Args:
+        p: 素数
+        values: 参数的数值 {符号: 有理数}
+
+    Returns:
+        PrimeField 实例
+    """
+    return PrimeField(p, values)
+
+
+# 默认的 sympy 表达式域和有理数域
+EX = CoefficientDomain()
+QQ = RationalField()
+
+# 当前的系数域
+_domain: CoefficientDomain = EX
+
+
+def get_coefficient_domain() -> CoefficientDomain:
+    """返回当前的系数域"""
+    return _domain
+
+
+def set_coefficient_domain(domain: CoefficientDomain) -> None:
+    """
+    设置系数域
+
+    不同域的结果在缓存中使用不同的命名空间。
+
+    Args:
+        domain: EX、QQ、QQ[c]、GF(p) 等
+
+    Raises:
+        TypeError: 如果 domain 不是 CoefficientDomain
+    """
+    global _domain
+    if not isinstance(domain, CoefficientDomain):
+        raise TypeError(f"Expected a CoefficientDomain, got {type(domain)}")
+    _domain = domain
+
+    from .cache import get_ope_cache
+    get_ope_cache().domain = None if domain.is_default else domain.key
+
+
+@contextmanager
+def coefficient_domain(domain: CoefficientDomain):
+    """
+    在 with 语句内使用指定的系数域
+
+    Examples:
+        >>> with coefficient_domain(GF(32003, values={c: 17})):
+        ...     result = OPE(NO(T, T), NO(T, T))
+    """
+    previous = _domain
+    set_coefficient_domain(domain)
+    try:
+        yield
+    finally:
+        set_coefficient_domain(previous)
+
+
+def domain_binomial(n: int, k: int) -> Any:
+    """当前系数域中的二项式系数 C(n, k)"""
+    return _domain.binomial(n, k)
+
+
+def domain_inverse_factorial(n: int) -> Any:
+    """当前系数域中的 1 / n!"""
+    return _domain.inverse_factorial(n)
@@ -19,8 +19,7 @@ from typing import Any, List
 import sympy as sp
 from sympy import binomial
 
-from .api import OPE, bracket
-from .operators import Operator
+from .parallel import compute_opes
 from .ope_data import OPEData
 from .local_operator import get_operator_parity
 
@@ -66,47 +65,45 @@ def check_jacobi_identity(A: Any, B: Any, C: Any, simplify_func=None) -> List[Li
     parity_B = get_operator_parity(B)
     sign = (-1) ** (parity_A * parity_B)
 
-    # 计算基本 OPE
-    ope_AB = OPE(A, B)
-    ope_BC = OPE(B, C)
+    # 计算基本 OPE（相互独立，并行模式下一起分发）
+    if A == B:
+        ope_AB, ope_BC = compute_opes([(A, B), (B, C)])
+        ope_AC = ope_BC
+    else:
+        ope_AB, ope_BC, ope_AC = compute_opes([(A, B), (B, C), (A, C)])
 
     max_AB = ope_AB.max_pole
     max_BC = ope_BC.max_pole
+    max_AC = ope_AC.max_pole
 
-    # 计算 AnBC[n] = OPE[A, {BC}_n]
-    AnBC = {}
+    # 收集三张表需要的 OPE，一次性批量计算：
+    # AnBC[n] = OPE[A, {BC}_n], ABnC[n] = OPE[{AB}_n, C], BnAC[n] = OPE[B, {AC}_n]
+    # 如果 A == B，则 BnAC = AnBC
+    requests = []
     for n in range(1, max_BC + 1):
-        bracket_BC_n = bracket(B, C, n)
-        if bracket_BC_n != 0:
-            AnBC[n] = OPE(A, bracket_BC_n)
-        else:
-            AnBC[n] = OPEData({})
-
-    # 计算 ABnC[n] = OPE[{AB}_n, C]
-    ABnC = {}
+        bracket_BC_n = ope_BC.pole_terms(n)
+        if bracket_BC_n:
+            requests.append(('AnBC', n, A, bracket_BC_n))
     for n in range(1, max_AB + 1):
-        bracket_AB_n = bracket(A, B, n)
-        if bracket_AB_n != 0:
-            ABnC[n] = OPE(bracket_AB_n, C)
-        else:
-            ABnC[n] = OPEData({})
-
-    # 计算 BnAC[n] = OPE[B, {AC}_n]
-    # 如果 A == B，则 BnAC = AnBC, AC = BC
+        bracket_AB_n = ope_AB.pole_terms(n)
+        if bracket_AB_n:
+            requests.append(('ABnC', n, bracket_AB_n, C))
+    if A != B:
+        for n in range(1, max_AC + 1):
+            bracket_AC_n = ope_AC.pole_terms(n)
+            if bracket_AC_n:
+                requests.append(('BnAC', n, B, bracket_AC_n))
+
+    results = compute_opes([(left, right) for _, _, left, right in requests])
+
+    AnBC = {n: OPEData({}) for n in range(1, max_BC + 1)}
+    ABnC = {n: OPEData({}) for n in range(1, max_AB + 1)}
+    BnAC = {n: OPEData({}) for n in range(1, max_AC + 1)}
+    tables = {'AnBC': AnBC, 'ABnC': ABnC, 'BnAC': BnAC}
+    for (table, n, _, _), ope_result in zip(requests, results):
+        tables[table][n] = ope_result
     if A == B:
         BnAC = AnBC
-        ope_AC = ope_BC
-        max_AC = max_BC
-    else:
-        ope_AC = OPE(A, C)
-        max_AC = ope_AC.max_pole
-        BnAC = {}
-        for n in range(1, max_AC + 1):
-            bracket_AC_n = bracket(A, C, n)
-            if bracket_AC_n != 0:
-                BnAC[n] = OPE(B, bracket_AC_n)
-            else:
-                BnAC[n] = OPEData({})
 
     # 计算最大极点
     max_AnBC = max([AnBC[n].max_pole for n in range(1, max_BC + 1)] + [0])
@@ -0,0 +1,460 @@
+"""
+线性组合模块
+
+本模块定义了算符表达式的内部表示：
+- LinearCombination: 稀疏线性组合 {算符: 系数}
+
+OPE 计算、NO、d 和 simplify 在内部都使用 LinearCombination，
+只有在需要显示或返回给用户时才转换为 sympy 表达式。这避免了 sympy
+Add/Mul 在每次构造时的展平和排序开销。
+
+纯标量项（不含算符）存储在键 sympy.S.One 之下。
+"""
+
+from typing import Any, Dict, Iterator, Tuple
+import sympy as sp
+from sympy import Add, Mul
+
+from .operators import Operator
+from .constants import Zero
+
+
+# 纯标量项使用的键
+SCALAR = sp.S.One
+
+
+def _is_zero_coeff(coeff: Any) -> bool:
+    """判断系数是否为零（不触发 sympy 化简）"""
+    return coeff == 0
+
+
+def _normalize_coeff(coeff: Any) -> Any:
+    """
+    将系数化为规范形式（用于缓存键）
+
+    展开后的 sympy 表达式是规范的，写法不同但相等的系数
+    （例如 2*c/2 与 c，c*(c+1) 与 c**2 + c）会得到同一个对象。
+    """
+    if type(coeff) is int:
+        return coeff
+    return sp.expand(sp.sympify(coeff))
+
+
+class LinearCombination:
+    """
+    算符的稀疏线性组合
+
+    以字典 {算符: 系数} 存储局域算符的线性组合。键是驻留的算符节点
+    （哈希和相等性都是 O(1)），系数是标量（数字或 sympy 表达式）。
+
+    对外表现为不可变对象；以下划线开头的原地操作只供计算引擎内部
+    在累加结果时使用。
+
+    Examples:
+        >>> T = BasisOperator("T", bosonic=True)
+        >>> lc = LinearCombination.from_expr(2*T + d(T))
+        >>> lc.coeff(T)
+        2
+        >>> lc.to_expr()
+        2*T + ∂T
+    """
+
+    __slots__ = ('_terms', '_expr', '_key')
+
+    def __init__(self, terms: Dict[Any, Any] = None):
+        """
+        创建线性组合
+
+        Args:
+            terms: 字典 {算符: 系数}，零系数会被丢弃
+        """
+        if terms:
+            self._terms = {op: coeff for op, coeff in terms.items()
+                           if not _is_zero_coeff(coeff)}
+        else:
+            self._terms = {}
+        self._expr = None
+        self._key = None
+
+    # ------------------------------------------------------------------
+    # 构造
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_operator(cls, operator: Any, coeff: Any = 1) -> 'LinearCombination':
+        """由单个算符创建线性组合 coeff * operator"""
+        lc = cls()
+        if not _is_zero_coeff(coeff):
+            lc._terms[operator] = coeff
+        return lc
+
+    @classmethod
+    def from_expr(cls, expr: Any) -> 'LinearCombination':
+        """
+        将表达式转换为线性组合
+
+        支持 LinearCombination（原样返回）、Operator、sympy 表达式和 Python 数字。
+
+        Args:
+            expr: 要转换的表达式
+
+        Returns:
+            LinearCombination 实例
+        """
+        if isinstance(expr, LinearCombination):
+            return expr
+
+        lc = cls()
+        lc._add_expr(expr, 1)
+        return lc
+
+    def _add_expr(self, expr: Any, scale: Any) -> None:
+        """把 scale * expr 原地累加到线性组合中（内部使用）"""
+        if isinstance(expr, Operator):
+            # 常数算符 Zero 对应零
+            if expr == Zero:
+                return
+            self._add_term(expr, scale)
+            return
+
+        if isinstance(expr, LinearCombination):
+            self._iadd(expr, scale)
+            return
+
+        if not isinstance(expr, sp.Basic):
+            # Python 数字（int、Fraction 等）
+            self._add_term(SCALAR, scale * expr)
+            return
+
+        if isinstance(expr, Add):
+            for term in expr.args:
+                self._add_expr(term, scale)
+            return
+
+        if isinstance(expr, Mul):
+            scalar_parts = []
+            operator_parts = []
+            for factor in expr.args:
+                if isinstance(factor, Operator):
+                    operator_parts.append(factor)
+                elif factor.is_Add and _contains_operator(factor):
+                    # 形如 c*(A + B) 的乘积，展开后再分解
+                    self._add_expr(sp.expand(expr), scale)
+                    return
+                else:
+                    scalar_parts.append(factor)
+
+            coeff = Mul(*scalar_parts) if scalar_parts else sp.S.One
+            if not operator_parts:
+                self._add_term(SCALAR, scale * coeff)
+            elif len(operator_parts) == 1:
+                self._add_term(operator_parts[0], scale * coeff)
+            else:
+                # 多个算符的普通乘积（不是局域算符），作为不透明的键保留
+                self._add_term(Mul(*operator_parts), scale * coeff)
+            return
+
+        if _contains_operator(expr):
+            # 其他含算符的表达式，作为不透明的键保留
+            self._add_term(expr, scale)
+            return
+
+        # 纯标量
+        self._add_term(SCALAR, scale * expr)
+
+    # ------------------------------------------------------------------
+    # 原地累加（内部使用）
+    # ------------------------------------------------------------------
+
+    def _add_term(self, operator: Any, coeff: Any) -> None:
+        """原地累加 coeff * operator"""
+        terms = self._terms
+        if operator in terms:
+            new_coeff = terms[operator] + coeff
+            if _is_zero_coeff(new_coeff):
+                del terms[operator]
+            else:
+                terms[operator] = new_coeff
+        elif not _is_zero_coeff(coeff):
+            terms[operator] = coeff
+        self._expr = None
+        self._key = None
+
+    def _iadd(self, other: 'LinearCombination', scale: Any = 1) -> None:
+        """原地累加 scale * other"""
+        if scale == 1:
+            for op, coeff in other._terms.items():
+                self._add_term(op, coeff)
+        else:
+            for op, coeff in other._terms.items():
+                self._add_term(op, scale * coeff)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    @property
+    def terms(self) -> Dict[Any, Any]:
+        """返回 {算符: 系数} 字典的副本"""
+        return self._terms.copy()
+
+    def items(self):
+        """遍历 (算符, 系数) 对"""
+        return self._terms.items()
+
+    def operators(self):
+        """遍历出现的算符"""
+        return self._terms.keys()
+
+    def coeff(self, operator: Any) -> Any:
+        """返回算符的系数（不存在时为 0）"""
+        return self._terms.get(operator, 0)
+
+    def is_zero(self) -> bool:
+        """是否为零"""
+        return not self._terms
+
+    def is_single_operator(self) -> bool:
+        """是否为系数为 1 的单个算符"""
+        if len(self._terms) != 1:
+            return False
+        op, coeff = next(iter(self._terms.items()))
+        return coeff == 1 and op is not SCALAR
+
+    @property
+    def cache_key(self) -> Any:
+        """
+        结构化的缓存键（只计算一次，保存在对象上）
+
+        系数为 1 的单个算符使用该算符节点本身作为键，
+        因此与直接使用算符时命中同一缓存项；其他情况使用
+        frozenset{(算符, 规范化系数)}，与项的顺序和系数写法无关。
+
+        Returns:
+            可哈希的键
+        """
+        if self._key is None:
+            if self.is_single_operator():
+                self._key = next(iter(self._terms))
+            else:
+                self._key = frozenset(
+                    (op, _normalize_coeff(coeff)) for op, coeff in self._terms.items()
+                )
+        return self._key
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __iter__(self) -> Iterator[Tuple[Any, Any]]:
+        return iter(self._terms.items())
+
+    def __bool__(self) -> bool:
+        return bool(self._terms)
+
+    @property
+    def parity(self) -> int:
+        """
+        线性组合的 parity
+
+        所有算符项必须具有相同的 parity，纯标量项视为玻色子。
+
+        Raises:
+            ValueError: 如果各项的 parity 不一致
+        """
+        parities = set()
+        for op in self._terms:
+            parities.add(op.parity if isinstance(op, Operator) else 0)
+        if len(parities) > 1:
+            raise ValueError("Operators in sum have inconsistent parities")
+        return parities.pop() if parities else 0
+
+    # ------------------------------------------------------------------
+    # 算术
+    # ------------------------------------------------------------------
+
+    def copy(self) -> 'LinearCombination':
+        """返回副本"""
+        result = LinearCombination()
+        result._terms = self._terms.copy()
+        return result
+
+    def scale(self, scalar: Any) -> 'LinearCombination':
+        """返回 scalar * self"""
+        result = LinearCombination()
+        if _is_zero_coeff(scalar):
+            return result
+        for op, coeff in self._terms.items():
+            new_coeff = scalar * coeff
+            if not _is_zero_coeff(new_coeff):
+                result._terms[op] = new_coeff
+        return result
+
+    def map_operators(self, func) -> 'LinearCombination':
+        """
+        线性地把函数作用到每个算符上
+
+        Args:
+            func: 算符 -> 表达式（LinearCombination、算符或 sympy 表达式）
+
+        Returns:
+            Σ coeff * func(op)
+        """
+        result = LinearCombination()
+        for op, coeff in self._terms.items():
+            result._add_expr(func(op), coeff)
+        return result
+
+    def derivative(self, order: int = 1) -> 'LinearCombination':
+        """
+        线性地求 order 阶导数
+
+        纯标量项和常数算符的导数为零。
+
+        Args:
+            order: 导数阶数
+
+        Returns:
+            Σ coeff * ∂^order(op)
+        """
+        from .operators import DerivativeOperator
+        from .constants import ConstantOperator
+
+        result = LinearCombination()
+        for op, coeff in self._terms.items():
+            if op is SCALAR or isinstance(op, ConstantOperator):
+                continue
+            if isinstance(op, DerivativeOperator):
+                result._add_term(DerivativeOperator(op.base, op.order + order), coeff)
+            elif isinstance(op, Operator):
+                result._add_term(DerivativeOperator(op, order), coeff)
+            else:
+                from .operators import d
+                result._add_expr(d(op, order), coeff)
+        return result
+
+    def __add__(self, other: Any) -> 'LinearCombination':
+        result = self.copy()
+        result._add_expr(other, 1)
+        return result
+
+    def __radd__(self, other: Any) -> 'LinearCombination':
+        return self.__add__(other)
+
+    def __sub__(self, other: Any) -> 'LinearCombination':
+        result = self.copy()
+        result._add_expr(other, -1)
+        return result
+
+    def __rsub__(self, other: Any) -> 'LinearCombination':
+        result = self.scale(-1)
+        result._add_expr(other, 1)
+        return result
+
+    def __neg__(self) -> 'LinearCombination':
+        return self.scale(-1)
+
+    def __mul__(self, scalar: Any) -> 'LinearCombination':
+        if isinstance(scalar, (LinearCombination, Operator)):
+            return NotImplemented
+        return self.scale(scalar)
+
+    def __rmul__(self, scalar: Any) -> 'LinearCombination':
+        return self.__mul__(scalar)
+
+    def __truediv__(self, scalar: Any) -> 'LinearCombination':
+        if isinstance(scalar, int):
+            scalar = sp.Integer(scalar)
+        return self.scale(1 / scalar)
+
+    # ------------------------------------------------------------------
+    # 比较与转换
+    # ------------------------------------------------------------------
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        相等性比较
+
+        可以与另一个 LinearCombination、算符或 sympy 表达式比较。
+        系数不完全相同时，用展开后的差是否为零来判断。
+        """
+        if not isinstance(other, LinearCombination):
+            if other is None:
+                return False
+            try:
+                other = LinearCombination.from_expr(other)
+            except (TypeError, sp.SympifyError):
+                return False
+
+        if self._terms.keys() != other._terms.keys():
+            return False
+        for op, coeff in self._terms.items():
+            other_coeff = other._terms[op]
+            if coeff != other_coeff and sp.expand(coeff - other_coeff) != 0:
+                return False
+        return True
+
+    def __ne__(self, other: Any) -> bool:
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def to_expr(self) -> Any:
+        """
+        转换为 sympy 表达式（结果会被缓存）
+
+        Returns:
+            sympy 表达式；零组合返回 sympy.S.Zero
+        """
+        if self._expr is None:
+            terms = []
+            for op, coeff in self._terms.items():
+                if op is SCALAR:
+                    terms.append(coeff)
+                elif coeff == 1:
+                    terms.append(op)
+                else:
+                    terms.append(coeff * op)
+            if not terms:
+                self._expr = sp.S.Zero
+            elif len(terms) == 1:
+                self._expr = terms[0]
+            else:
+                self._expr = Add(*terms)
+        return self._expr
+
+    def __getstate__(self):
+        """序列化：只保存项，缓存的表达式和键在需要时重新计算"""
+        return self._terms
+
+    def __setstate__(self, state):
+        self._terms = state
+        self._expr = None
+        self._key = None
+
+    def _sympy_(self):
+        """sympify 协议：允许与 sympy 表达式混合运算"""
+        return sp.sympify(self.to_expr())
+
+    def __repr__(self) -> str:
+        return f"LinearCombination({self.to_expr()})"
+
+    def __str__(self) -> str:
+        return str(self.to_expr())
+
+    def _latex(self, printer=None) -> str:
+        from sympy import latex
+        return latex(self.to_expr())
+
+
+def _contains_operator(expr: Any) -> bool:
+    """判断 sympy 表达式中是否含有算符"""
+    if isinstance(expr, Operator):
+        return True
+    if isinstance(expr, sp.Basic):
+        return any(isinstance(atom, Operator) for atom in expr.atoms(sp.Symbol))
+    return False
+
+
+def as_linear_combination(expr: Any) -> LinearCombination:
+    """便捷函数：将表达式转换为 LinearCombination"""
+    return LinearCombination.from_expr(expr)
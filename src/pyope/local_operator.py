@@ -81,6 +81,11 @@ def is_local_operator(expr: Any) -> bool:
     if isinstance(expr, Operator):
         return True
 
+    # 线性组合：所有键都必须是算符
+    from .linear_combination import LinearCombination
+    if isinstance(expr, LinearCombination):
+        return bool(expr) and all(isinstance(op, Operator) for op in expr.operators())
+
     # 是 sympy 表达式
     if isinstance(expr, sp.Expr):
         # 检查是否所有的原子符号都是 Operator
@@ -175,6 +180,11 @@ def get_operator_parity(expr: LocalOperatorType) -> int:
     if isinstance(expr, Operator):
         return expr.parity
 
+    # 线性组合
+    from .linear_combination import LinearCombination
+    if isinstance(expr, LinearCombination):
+        return expr.parity
+
     # 是 sympy 表达式
     if isinstance(expr, sp.Expr):
         # 对于加法，所有项必须有相同的 parity
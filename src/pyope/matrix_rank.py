@@ -0,0 +1,822 @@
+"""
+精确矩阵秩模块
+
+null states 计算中的系数矩阵是有理数矩阵。浮点数秩（numpy.linalg.matrix_rank）
+在矩阵较大、元素是大有理数时既慢又可能算错，本模块提供精确的秩：
+
+- SparseMatrix: 按行索引非零元素的稀疏矩阵，秩的计算直接使用非零元素
+- modular_rank: 每一行乘以分母的最小公倍数化为整数矩阵后，在几个大素数
+  下用向量化的 NumPy int64 Gauss 消元（每行非零元素很少的稀疏矩阵用按行的稀疏消元）求秩。
+  模 p 的秩不超过有理数域上的秩，只有当 p 整除所有极大非零子式时才会偏小，
+  取几个素数的最大值即可
+- IncrementalEchelon: 逐个加入向量、判断线性独立性的模 p 行阶梯形
+- bareiss_rank: 整数矩阵上无除法误差的 Bareiss 消元，结果是确定的
+- symbolic_rank: 元素含有符号参数（如中心荷 c）时，在几个随机点上模 p
+  求一般的秩，再对主元子式做无分数消元求出行列式，由它的因子找出秩下降的
+  特殊参数值
+- matrix_rank: 按 method 选择上述方法（或旧的浮点数方法）
+
+Examples:
+    >>> matrix_rank([[1, Fraction(1, 2)], [2, 1]])
+    1
+"""
+
+import random
+from fractions import Fraction
+from math import gcd
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+
+# 默认使用的素数（都小于 2^31，乘积不会溢出 int64）
+DEFAULT_PRIMES = (2147483647, 2147483629, 2147483587)
+
+# matrix_rank 支持的方法
+RANK_METHODS = ('modular', 'bareiss', 'symbolic', 'float')
+
+# SparseMatrix 较短一边的每行平均非零元素不少于这个数时，按行的稀疏消元
+# 填充严重，改用向量化的 NumPy 消元（见 modular_rank）
+DENSE_ROW_FILL = 4
+
+# NumPy 消元展开的 int64 数组最多这么多个元素（约 80MB），更大的矩阵总是稀疏消元
+DENSE_LIMIT = 10 ** 7
+
+
+def _to_fraction(value: Any) -> Fraction:
+    """
+    把矩阵元素转换为 Fraction
+
+    支持 int、Fraction、sympy 有理数和数值表达式；浮点数按其最短十进制
+    表示转换（1.5 -> 3/2）。
+
+    Raises:
+        ValueError: 如果元素含有符号参数
+    """
+    if type(value) is int or isinstance(value, Fraction):
+        return Fraction(value)
+    if isinstance(value, float):
+        return Fraction(repr(value))
+
+    import sympy as sp
+
+    value = sp.sympify(value)
+    if value.is_Rational:
+        return Fraction(int(value.p), int(value.q))
+    if value.free_symbols:
+        raise ValueError(f"Matrix entry {value} contains symbols {value.free_symbols}")
+    if value.is_Float:
+        return Fraction(repr(float(value)))
+    value = sp.nsimplify(value, rational=True)
+    if not value.is_Rational:
+        raise ValueError(f"Matrix entry {value} is not rational")
+    return Fraction(int(value.p), int(value.q))
+
+
+class SparseMatrix:
+    """
+    按行索引的稀疏矩阵
+
+    非零元素按行保存为 {行下标: {列下标: 值}}，内存和非零元素个数成正比，
+    取出一行只需要访问这一行的非零元素。秩的计算（matrix_rank 等）直接使用
+    非零元素；为了兼容列表的列表，也支持 len()、按下标取出一行和逐行迭代，
+    取出的行是稠密的列表（每次只展开一行）。
+
+    Examples:
+        >>> m = SparseMatrix((2, 3))
+        >>> m.append(0, 2, 5)
+        >>> m.to_dense()
+        [[0, 0, 5], [0, 0, 0]]
+    """
+
+    def __init__(self, shape: Tuple[int, int]):
+        """
+        Args:
+            shape: (行数, 列数)
+        """
+        self.shape = (int(shape[0]), int(shape[1]))
+        self._rows: Dict[int, Dict[int, Any]] = {}
+        self._nnz = 0
+
+    @classmethod
+    def from_dense(cls, matrix: Sequence[Sequence[Any]]) -> 'SparseMatrix':
+        """由列表的列表构造"""
+        n_rows = len(matrix)
+        result = cls((n_rows, len(matrix[0]) if n_rows else 0))
+        for i, row in enumerate(matrix):
+            for j, value in enumerate(row):
+                result.append(i, j, value)
+        return result
+
+    @property
+    def nnz(self) -> int:
+        """非零元素个数"""
+        return self._nnz
+
+    def append(self, row: int, col: int, value: Any) -> None:
+        """加入一个元素（为零时忽略；同一位置不能重复加入）"""
+        if value != 0:
+            self._rows.setdefault(row, {})[col] = value
+            self._nnz += 1
+
+    def items(self) -> Iterator[Tuple[int, int, Any]]:
+        """按行遍历非零元素 (行下标, 列下标, 值)"""
+        for i in sorted(self._rows):
+            for j, value in self._rows[i].items():
+                yield i, j, value
+
+    def row_dicts(self) -> List[Dict[int, Any]]:
+        """按行分组的非零元素 [{列下标: 值}]"""
+        return [dict(self._rows.get(i, {})) for i in range(self.shape[0])]
+
+    def transpose(self) -> 'SparseMatrix':
+        result = SparseMatrix((self.shape[1], self.shape[0]))
+        for i, j, value in self.items():
+            result.append(j, i, value)
+        return result
+
+    def to_dense(self) -> List[List[Any]]:
+        """转换为列表的列表"""
+        return [self[i] for i in range(self.shape[0])]
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, index: int) -> List[Any]:
+        """第 index 行（稠密的列表）"""
+        if index < 0:
+            index += self.shape[0]
+        if not 0 <= index < self.shape[0]:
+            raise IndexError(index)
+        row = [0] * self.shape[1]
+        for j, value in self._rows.get(index, {}).items():
+            row[j] = value
+        return row
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        """逐行迭代稠密的行（兼容列表的列表；秩的计算不使用）"""
+        for i in range(self.shape[0]):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"SparseMatrix(shape={self.shape}, nnz={self.nnz})"
+
+
+def _shape(matrix: Any) -> Tuple[int, int]:
+    """矩阵（列表的列表或 SparseMatrix）的形状"""
+    if isinstance(matrix, SparseMatrix):
+        return matrix.shape
+    return (len(matrix), len(matrix[0]) if len(matrix) else 0)
+
+
+def _sparse_rows(matrix: Any) -> List[Dict[int, Any]]:
+    """按行分组的非零元素 [{列下标: 值}]"""
+    if isinstance(matrix, SparseMatrix):
+        return matrix.row_dicts()
+    return [{j: value for j, value in enumerate(row) if value != 0} for row in matrix]
+
+
+def _integer_row(fractions: List[Fraction]) -> List[int]:
+    """一行有理数乘以分母的最小公倍数，再除以分子的最大公约数"""
+    lcm = 1
+    for value in fractions:
+        lcm = lcm * value.denominator // gcd(lcm, value.denominator)
+    ints = [int(value * lcm) for value in fractions]
+    common = 0
+    for value in ints:
+        common = gcd(common, value)
+    if common > 1:
+        ints = [value // common for value in ints]
+    return ints
+
+
+def integer_rows(matrix: Sequence[Sequence[Any]]) -> List[List[int]]:
+    """
+    把有理数矩阵化为秩相同的整数矩阵
+
+    每一行乘以该行分母的最小公倍数，再除以分子的最大公约数。
+
+    Args:
+        matrix: 列表的列表（元素为 int、Fraction 或 sympy 数）
+
+    Returns:
+        整数矩阵（列表的列表）
+    """
+    return [_integer_row([_to_fraction(value) for value in row]) for row in matrix]
+
+
+def sparse_integer_rows(matrix: Any) -> List[Dict[int, int]]:
+    """
+    integer_rows 的稀疏版本
+
+    Args:
+        matrix: SparseMatrix 或列表的列表
+
+    Returns:
+        按行分组的非零整数元素 [{列下标: 整数}]
+    """
+    rows = []
+    for row in _sparse_rows(matrix):
+        cols = list(row)
+        ints = _integer_row([_to_fraction(row[j]) for j in cols])
+        rows.append(dict(zip(cols, ints)))
+    return rows
+
+
+def rank_mod_p(matrix: np.ndarray, p: int) -> int:
+    """
+    整数矩阵模素数 p 的秩（向量化 Gauss 消元）
+
+    Args:
+        matrix: int64 数组，元素在 [0, p) 内
+        p: 小于 2^31 的素数
+
+    Returns:
+        模 p 的秩
+    """
+    return len(pivot_columns_mod_p(matrix, p))
+
+
+def pivot_columns_mod_p(matrix: np.ndarray, p: int) -> List[int]:
+    """
+    整数矩阵模素数 p 的行阶梯形中主元所在的列
+
+    Args:
+        matrix: int64 数组，元素在 [0, p) 内
+        p: 小于 2^31 的素数
+
+    Returns:
+        主元列的下标（升序），个数等于模 p 的秩
+    """
+    m = matrix.copy()
+    n_rows, n_cols = m.shape
+    pivots = []
+    rank = 0
+    for col in range(n_cols):
+        if rank == n_rows:
+            break
+        nonzero = np.flatnonzero(m[rank:, col])
+        if nonzero.size == 0:
+            continue
+        pivot = rank + nonzero[0]
+        if pivot != rank:
+            m[[rank, pivot], col:] = m[[pivot, rank], col:]
+
+        # 主元行归一化
+        inverse = pow(int(m[rank, col]), -1, p)
+        m[rank, col:] = m[rank, col:] * inverse % p
+
+        # 消去下方各行
+        below = rank + 1 + np.flatnonzero(m[rank + 1:, col])
+        if below.size:
+            factors = m[below, col][:, None]
+            m[below, col:] = (m[below, col:] - factors * m[rank, col:] % p) % p
+        pivots.append(col)
+        rank += 1
+    return pivots
+
+
+def sparse_pivots_mod_p(rows: List[Dict[int, int]], p: int) -> List[Tuple[int, int]]:
+    """
+    稀疏整数矩阵模素数 p 的消元
+
+    逐行对已有的主元行（按加入顺序）约化，约化后不为零的行成为新的主元行，
+    主元取其中最小的列。主元所在的行和列构成一个模 p 非奇异的子式。
+
+    Args:
+        rows: 按行分组的非零元素 [{列下标: 整数}]
+        p: 素数
+
+    Returns:
+        主元位置 [(行下标, 列下标)]，个数等于模 p 的秩
+    """
+    pivot_rows: List[Tuple[int, Dict[int, int]]] = []
+    pivots = []
+    for index, row in enumerate(rows):
+        v = {j: value % p for j, value in row.items() if value % p}
+        for col, pivot_row in pivot_rows:
+            factor = v.get(col)
+            if not factor:
+                continue
+            for j, value in pivot_row.items():
+                new = (v.get(j, 0) - factor * value) % p
+                if new:
+                    v[j] = new
+                else:
+                    v.pop(j, None)
+        if v:
+            col = min(v)
+            inverse = pow(v[col], -1, p)
+            pivot_rows.append((col, {j: value * inverse % p for j, value in v.items()}))
+            pivots.append((index, col))
+    return pivots
+
+
+def _dense_mod_p(rows: List[Dict[int, int]], n_cols: int, p: int) -> np.ndarray:
+    """稀疏整数行展开为模 p 的 int64 数组"""
+    result = np.zeros((len(rows), n_cols), dtype=np.int64)
+    for i, row in enumerate(rows):
+        if row:
+            result[i, list(row)] = [value % p for value in row.values()]
+    return result
+
+
+def modular_rank(matrix: Any, primes: Sequence[int] = DEFAULT_PRIMES) -> int:
+    """
+    有理数矩阵在几个大素数下的秩（取最大值）
+
+    模 p 的秩只会比真实的秩小，几个 31 位素数同时出错的概率可以忽略。
+    SparseMatrix 的每行平均非零元素很少时使用按行的稀疏消元，不展开为稠密矩阵；
+    不少于 DENSE_ROW_FILL 个时稀疏消元的填充很快使各行变稠密，
+    此时（数组不超过 DENSE_LIMIT 个元素）把整数行展开后用 NumPy 消元。
+
+    Args:
+        matrix: 列表的列表或 SparseMatrix
+        primes: 使用的素数（都小于 2^31）
+
+    Returns:
+        秩
+    """
+    if isinstance(matrix, SparseMatrix):
+        n_rows, n_cols = matrix.shape
+        if n_rows > n_cols:
+            # 消元沿较短的一边进行
+            matrix = matrix.transpose()
+        full = min(n_rows, n_cols)
+        rows = sparse_integer_rows(matrix)
+        dense = (matrix.nnz >= DENSE_ROW_FILL * full
+                 and matrix.shape[0] * matrix.shape[1] <= DENSE_LIMIT)
+        best = 0
+        for p in primes:
+            if dense:
+                rank = rank_mod_p(_dense_mod_p(rows, matrix.shape[1], p), p)
+            else:
+                rank = len(sparse_pivots_mod_p(rows, p))
+            best = max(best, rank)
+            if best == full:
+                break
+        return best
+
+    rows = integer_rows(matrix)
+    if not rows or not rows[0]:
+        return 0
+    full = min(len(rows), len(rows[0]))
+
+    # 消元沿较短的一边进行
+    array_rows = rows if len(rows) <= len(rows[0]) else [list(col) for col in zip(*rows)]
+
+    best = 0
+    for p in primes:
+        reduced = np.array([[value % p for value in row] for row in array_rows], dtype=np.int64)
+        best = max(best, rank_mod_p(reduced, p))
+        if best == full:
+            break
+    return best
+
+
+class IncrementalEchelon:
+    """
+    逐个加入向量的行阶梯形（模大素数）
+
+    每个新向量对已有的主元行约化一次，约化后不为零即线性独立。
+    所有素数下的阶梯形都由同一组已接受的向量构成；某个素数下已接受的向量
+    本身线性相关时（例如向量之差是 p 的倍数），这个素数不再可信，换成新的素数。
+    只有在可信的素数下约化不为零，向量才一定在有理数上独立；约化为零时
+    再用下一个可信的素数复查，len(primes) 个素数都为零才判为线性相关
+    （和 modular_rank 一样，只可能把独立的向量误判为相关，概率可以忽略）。
+    元素含有符号参数时，参数取（每个素数下固定的）随机值，
+    得到的是参数一般取值时的线性独立性。
+
+    Examples:
+        >>> echelon = IncrementalEchelon(2)
+        >>> echelon.add([1, 2]), echelon.add([Fraction(1, 2), 1]), echelon.rank
+        (True, False, 1)
+    """
+
+    def __init__(self, size: int, primes: Sequence[int] = DEFAULT_PRIMES, seed: int = 0):
+        """
+        Args:
+            size: 向量的长度
+            primes: 使用的素数（都小于 2^31）；不可信时依次换成更小的素数
+            seed: 符号参数随机取值的种子
+        """
+        self.size = size
+        self.primes = tuple(primes)
+        self.rank = 0
+        # 已接受的向量（非零元素 [(下标, 值)]），换素数时用来重建阶梯形
+        self._vectors: List[List[Tuple[int, Any]]] = []
+        # 可信素数下的主元行 [(主元列, 主元为 1 的行)]，按需建立
+        self._rows: Dict[int, List[Tuple[int, np.ndarray]]] = {}
+        self._candidates = _next_primes(10 ** 6, self.primes)
+        self._valid: List[int] = []
+        self._points: Dict[Any, Dict[int, int]] = {}
+        self._rng = random.Random(seed)
+
+    def _residue(self, value: Any, p: int) -> int:
+        """元素模 p 的值（符号参数取随机值）"""
+        try:
+            fraction = _to_fraction(value)
+        except ValueError:
+            import sympy as sp
+
+            value = sp.sympify(value)
+            for symbol in value.free_symbols:
+                points = self._points.setdefault(symbol, {})
+                if p not in points:
+                    points[p] = self._rng.randrange(1, p)
+            value = sp.cancel(value.xreplace({symbol: sp.Integer(self._points[symbol][p])
+                                              for symbol in value.free_symbols}))
+            fraction = _to_fraction(value)
+        return fraction.numerator * pow(fraction.denominator, -1, p) % p
+
+    def _reduce(self, items: List[Tuple[int, Any]], p: int) -> np.ndarray:
+        """向量模 p 对主元行约化后的结果"""
+        v = np.zeros(self.size, dtype=np.int64)
+        for j, value in items:
+            v[j] = self._residue(value, p)
+        for col, row in self._rows[p]:
+            if v[col]:
+                v = (v - v[col] * row % p) % p
+        return v
+
+    def _push(self, v: np.ndarray, p: int) -> bool:
+        """把约化后的向量加入 p 的阶梯形，为零时返回 False"""
+        nonzero = np.flatnonzero(v)
+        if not nonzero.size:
+            return False
+        col = int(nonzero[0])
+        self._rows[p].append((col, v * pow(int(v[col]), -1, p) % p))
+        return True
+
+    def _prime(self, k: int) -> int:
+        """第 k 个可信的素数（需要时用新的素数重建阶梯形）"""
+        while len(self._valid) <= k:
+            p = next(self._candidates)
+            self._rows[p] = []
+            if all(self._push(self._reduce(items, p), p) for items in self._vectors):
+                self._valid.append(p)
+            else:
+                del self._rows[p]
+        return self._valid[k]
+
+    def add(self, vector: Any) -> bool:
+        """
+        加入一个向量
+
+        Args:
+            vector: 长度为 size 的列表，或非零元素的字典 {下标: 值}
+                    （元素为数或 sympy 表达式）
+
+        Returns:
+            向量是否和已加入的向量线性独立（独立时加入阶梯形）
+        """
+        items = vector.items() if isinstance(vector, dict) else enumerate(vector)
+        items = [(j, value) for j, value in items if value != 0]
+        if not items:
+            return False
+
+        for k in range(len(self.primes)):
+            p = self._prime(k)
+            if self._push(self._reduce(items, p), p):
+                break
+        else:
+            return False
+
+        # 独立：加入所有可信素数的阶梯形，在某个素数下相关的，这个素数不再可信
+        self._vectors.append(items)
+        self.rank += 1
+        for q in list(self._valid):
+            if q != p and not self._push(self._reduce(items, q), q):
+                self._valid.remove(q)
+                del self._rows[q]
+        return True
+
+
+def bareiss_rank(matrix: Any) -> int:
+    """
+    有理数矩阵的精确秩（整数矩阵上的 Bareiss 无分数消元）
+
+    Bareiss 消元会填满矩阵，SparseMatrix 先转换为稠密矩阵。
+
+    Args:
+        matrix: 列表的列表或 SparseMatrix
+
+    Returns:
+        秩
+    """
+    if isinstance(matrix, SparseMatrix):
+        matrix = matrix.to_dense()
+    a = integer_rows(matrix)
+    if not a or not a[0]:
+        return 0
+    n_rows = len(a)
+    n_cols = len(a[0])
+
+    rank = 0
+    previous = 1
+    for col in range(n_cols):
+        if rank == n_rows:
+            break
+        pivot = next((i for i in range(rank, n_rows) if a[i][col] != 0), None)
+        if pivot is None:
+            continue
+        a[rank], a[pivot] = a[pivot], a[rank]
+        pivot_row = a[rank]
+        pivot_value = pivot_row[col]
+        for i in range(rank + 1, n_rows):
+            row = a[i]
+            factor = row[col]
+            for j in range(col + 1, n_cols):
+                row[j] = (pivot_value * row[j] - factor * pivot_row[j]) // previous
+            row[col] = 0
+        previous = pivot_value
+        rank += 1
+    return rank
+
+
+def _parameters_of(rows: List[Dict[int, Any]]) -> List[Any]:
+    """矩阵非零元素中出现的所有符号参数（按名字排序）"""
+    import sympy as sp
+
+    symbols = set()
+    for row in rows:
+        for value in row.values():
+            if isinstance(value, sp.Basic):
+                symbols |= value.free_symbols
+    return sorted(symbols, key=lambda symbol: symbol.name)
+
+
+def polynomial_rows(matrix: Any, params: Sequence[Any]) -> List[Dict[int, Dict[tuple, int]]]:
+    """
+    把元素是参数有理函数的矩阵化为整系数多项式矩阵
+
+    每一行乘以该行所有分母的最小公倍数（对参数是多项式，对系数是整数），
+    在分母不为零的参数值上秩不变。
+
+    Args:
+        matrix: 列表的列表或 SparseMatrix（元素为数或 sympy 表达式）
+        params: 参数符号列表
+
+    Returns:
+        按行分组的非零元素 [{列下标: 多项式}]，多项式是字典 {指数元组: 整数系数}
+
+    Raises:
+        ValueError: 如果元素含有 params 以外的符号，或不是参数的有理函数
+    """
+    import sympy as sp
+
+    rows = []
+    for row in _sparse_rows(matrix):
+        cols = list(row)
+        fractions = [sp.fraction(sp.cancel(sp.together(sp.sympify(row[j])))) for j in cols]
+        common = sp.lcm_list([den for _, den in fractions]) if fractions else sp.Integer(1)
+        try:
+            polys = [sp.Poly(sp.cancel(num * common / den), *params, domain=sp.QQ)
+                     for num, den in fractions]
+        except (sp.PolynomialError, sp.CoercionFailed) as error:
+            raise ValueError(f"Matrix row is not rational in {list(params)}: {error}")
+
+        denominator = 1
+        numerator = 0
+        for poly in polys:
+            for coeff in poly.coeffs():
+                coeff = Fraction(int(coeff.numerator), int(coeff.denominator))
+                denominator = denominator * coeff.denominator // gcd(denominator, coeff.denominator)
+                numerator = gcd(numerator, coeff.numerator)
+        scale = Fraction(denominator, numerator or 1)
+
+        rows.append({j: {monom: int(Fraction(int(coeff.numerator), int(coeff.denominator)) * scale)
+                         for monom, coeff in poly.terms() if coeff}
+                     for j, poly in zip(cols, polys)})
+    return rows
+
+
+def _evaluate_mod_p(entry: Dict[tuple, int], point: Sequence[int], p: int) -> int:
+    """多项式在一点上模 p 的值"""
+    total = 0
+    for monom, coeff in entry.items():
+        term = coeff
+        for value, exponent in zip(point, monom):
+            if exponent:
+                term = term * pow(value, exponent, p)
+        total += term
+    return total % p
+
+
+def _evaluate_rows_mod_p(rows: List[Dict[int, Dict[tuple, int]]],
+                         point: Sequence[int], p: int) -> List[Dict[int, int]]:
+    return [{j: _evaluate_mod_p(entry, point, p) for j, entry in row.items()} for row in rows]
+
+
+def _next_primes(count: int, primes: Sequence[int] = DEFAULT_PRIMES):
+    """依次给出 primes 以及更小的素数（共 count 个）"""
+    from sympy import prevprime
+
+    p = None
+    for i in range(count):
+        p = primes[i] if i < len(primes) else prevprime(p)
+        yield p
+
+
+def _bareiss_determinant(rows: List[List[Dict[tuple, int]]], param: Any):
+    """
+    单参数整系数多项式方阵的行列式（Bareiss 无分数消元，每一步整除）
+
+    Returns:
+        sympy Poly（整数系数）
+    """
+    import sympy as sp
+
+    a = [[sp.Poly.from_dict(entry, param, domain=sp.ZZ) if entry else sp.Poly(0, param, domain=sp.ZZ)
+          for entry in row] for row in rows]
+    n = len(a)
+    sign = 1
+    previous = sp.Poly(1, param, domain=sp.ZZ)
+    for k in range(n):
+        pivot = next((i for i in range(k, n) if not a[i][k].is_zero), None)
+        if pivot is None:
+            return sp.Poly(0, param, domain=sp.ZZ)
+        if pivot != k:
+            a[k], a[pivot] = a[pivot], a[k]
+            sign = -sign
+        pivot_row = a[k]
+        for i in range(k + 1, n):
+            row = a[i]
+            factor = row[k]
+            for j in range(k + 1, n):
+                row[j] = (pivot_row[k] * row[j] - factor * pivot_row[j]).exquo(previous)
+        previous = pivot_row[k]
+    return previous * sign
+
+
+def _rank_at_value(rows: List[Dict[int, Dict[tuple, int]]], n_cols: int, value: Fraction) -> int:
+    """单参数多项式矩阵在有理数参数值上的精确秩"""
+    numeric = SparseMatrix((len(rows), n_cols))
+    for i, row in enumerate(rows):
+        for j, entry in row.items():
+            numeric.append(i, j, sum(coeff * value ** monom[0] for monom, coeff in entry.items()))
+    return matrix_rank(numeric, method='bareiss')
+
+
+def _rank_at_roots(rows: List[Dict[int, Dict[tuple, int]]], factor: Any, param: Any,
+                   primes: Sequence[int], n_checks: int = 2, max_primes: int = 200) -> Any:
+    """
+    单参数多项式矩阵在不可约因子 factor 的根上的秩
+
+    在 factor 模 p 有根的素数 p 下，把参数换成这个根求模 p 的秩；
+    取 n_checks 个这样的素数的最大值。
+
+    Returns:
+        秩；找不到合适的素数时为 None
+    """
+    import sympy as sp
+
+    best = None
+    found = 0
+    for p in _next_primes(max_primes, primes):
+        _, factors = sp.Poly(factor, param, modulus=p).factor_list()
+        roots = [int(-f.TC() * pow(int(f.LC()), -1, p)) % p for f, _ in factors if f.degree() == 1]
+        if not roots:
+            continue
+        rank = len(sparse_pivots_mod_p(_evaluate_rows_mod_p(rows, (roots[0],), p), p))
+        best = rank if best is None else max(best, rank)
+        found += 1
+        if found == n_checks:
+            break
+    return best
+
+
+def symbolic_rank(matrix: Any, params: Sequence[Any] = None,
+                  primes: Sequence[int] = DEFAULT_PRIMES, trials: int = 2,
+                  seed: int = 0) -> Dict[str, Any]:
+    """
+    元素含有符号参数的矩阵在有理函数域 Q(params) 上的秩及秩下降的特殊值
+
+    一般的秩是在 trials 个随机点上模 p 的秩的最大值。只有一个参数时，
+    在一般点上选出非零的主元子式，用 Bareiss 消元求出它的行列式 D(c)：
+    秩下降的参数值一定是 D 的根。D 的每个有理根上精确计算秩，
+    其余不可约因子在它们模 p 的根上计算秩；只记录秩确实下降的值。
+
+    有分母的元素先逐行乘以分母（见 polynomial_rows），在分母的零点上
+    得到的是约去分母之后的矩阵的秩。
+
+    Args:
+        matrix: 列表的列表或 SparseMatrix（元素为数或 sympy 表达式）
+        params: 参数符号列表（默认为矩阵中出现的所有符号）
+        primes: 使用的素数（都小于 2^31）
+        trials: 每个素数下的随机点个数
+        seed: 随机数种子（结果可重复）
+
+    Returns:
+        字典包含：
+        - 'rank': 一般的秩
+        - 'parameters': 参数列表
+        - 'special_values': {有理数参数值: 秩}，只记录秩下降的值
+        - 'special_factors': {不可约多项式: 秩}，在多项式的（无理）根上秩下降；
+          秩无法确定时为 None
+        多个参数时只计算一般的秩，'special_values' 和 'special_factors' 为 None
+
+    Raises:
+        ValueError: 如果元素不是参数的有理函数
+    """
+    import sympy as sp
+
+    n_rows, n_cols = _shape(matrix)
+    if params is None:
+        params = _parameters_of(_sparse_rows(matrix))
+    params = list(params)
+    result = {'rank': 0, 'parameters': params, 'special_values': {}, 'special_factors': {}}
+    if n_rows == 0 or n_cols == 0:
+        return result
+    if not params:
+        result['rank'] = modular_rank(matrix, primes)
+        return result
+
+    rows = polynomial_rows(matrix, params)
+    full = min(n_rows, n_cols)
+
+    # 一般的秩：随机点上模 p 的秩
+    rng = random.Random(seed)
+    rank = -1
+    pivot_cols = pivot_rows = None
+    for p in primes:
+        for _ in range(trials):
+            point = [rng.randrange(1, p) for _ in params]
+            pivots = sparse_pivots_mod_p(_evaluate_rows_mod_p(rows, point, p), p)
+            if len(pivots) > rank:
+                rank = len(pivots)
+                pivot_rows = [i for i, _ in pivots]
+                pivot_cols = [j for _, j in pivots]
+            if rank == full:
+                break
+        if rank == full:
+            break
+    result['rank'] = rank
+
+    if len(params) > 1:
+        result['special_values'] = None
+        result['special_factors'] = None
+        return result
+    if rank == 0:
+        return result
+
+    # 主元子式的行列式：秩下降的参数值都是它的根
+    param = params[0]
+    minor = [[rows[i].get(j, {}) for j in pivot_cols] for i in pivot_rows]
+    determinant = _bareiss_determinant(minor, param)
+
+    _, factors = sp.factor_list(determinant.as_expr(), param)
+    for factor, _ in factors:
+        poly = sp.Poly(factor, param)
+        if poly.degree() == 1:
+            a, b = poly.all_coeffs()
+            value = Fraction(-int(b), int(a))
+            special = _rank_at_value(rows, n_cols, value)
+            if special < rank:
+                result['special_values'][sp.Rational(value.numerator, value.denominator)] = special
+        else:
+            special = _rank_at_roots(rows, factor, param, primes)
+            if special is None or special < rank:
+                result['special_factors'][factor] = special
+    return result
+
+
+def float_rank(matrix: Any) -> int:
+    """浮点数秩（numpy.linalg.matrix_rank），只用于快速的近似检查"""
+    if isinstance(matrix, SparseMatrix):
+        matrix = matrix.to_dense()
+    numeric = [[float(_to_fraction(value)) for value in row] for row in matrix]
+    return int(np.linalg.matrix_rank(np.array(numeric)))
+
+
+def matrix_rank(matrix: Any, method: str = 'modular') -> int:
+    """
+    计算有理数矩阵的秩
+
+    Args:
+        matrix: 列表的列表或 SparseMatrix
+        method: 'modular'（默认，几个大素数下的秩）、'bareiss'（确定的精确秩；
+                模素数的秩已经满秩时直接返回）、'symbolic'（含符号参数时
+                Q(params) 上一般的秩，见 symbolic_rank）或 'float'（浮点数秩）
+
+    Returns:
+        秩
+
+    Raises:
+        ValueError: 如果 method 未知，或矩阵元素含有符号参数
+    """
+    if method not in RANK_METHODS:
+        raise ValueError(f"Unknown rank method: {method!r}")
+    n_rows, n_cols = _shape(matrix)
+    if n_rows == 0 or n_cols == 0:
+        return 0
+    if method == 'float':
+        return float_rank(matrix)
+    if method == 'symbolic':
+        return symbolic_rank(matrix)['rank']
+
+    rank = modular_rank(matrix)
+    if method == 'bareiss' and rank < min(n_rows, n_cols):
+        # 模素数的秩可能偏小，用 Bareiss 消元确认
+        rank = bareiss_rank(matrix)
+    return rank
@@ -0,0 +1,380 @@
+"""
+正规序重排模块
+
+本模块把正规序乘积重排为唯一的 PBW 规范形式（类似 OPEdefs.m 中的
+NOCommuteHelp 以及 NO 的重组公式）：
+
+- 规范单项式是右结合的正规序乘积 NO(A1, NO(A2, ..., NO(A_{k-1}, A_k)))，
+  其中每个 Ai 是生成元或其导数，按注册表的算符顺序排列；
+  同一个费米子不会出现两次
+- 嵌套的 NO 用重组公式展开，导数用 Leibniz 规则展开
+- 所有重排结果都记在有上限的 LRU 记忆表中，注册表或计算方式改变时清空；
+  clear_normal_order_memo 在两次计算之间释放记忆表占用的内存
+- 系数在存入记忆表时展开，相互抵消的项被删除，相等的输入得到相同的结果
+
+使用的公式（p = (-1)^{|A||B|}）：
+
+    NO(A, NO(B, C)) = p NO(B, NO(A, C))
+                      + Σ_{j≥0} (-1)^j/(j+1)! NO(∂^{j+1} {AB}_{j+1}, C)
+
+    NO(NO(A, B), C) = NO(A, NO(B, C))
+                      + Σ_{j≥0} 1/(j+1)! [NO(∂^{j+1} A, {BC}_{j+1})
+                                          + p NO(∂^{j+1} B, {AC}_{j+1})]
+
+C 为单位算符时第一个公式就是交换公式
+NO(A, B) = p NO(B, A) + Σ_{n≥1} (-1)^{n+1}/n! ∂^n {AB}_n。
+A = B 是费米子时由第一个公式得到 NO(A, NO(A, C)) = 修正项 / 2。
+经典 OPE 中所有修正项都为零。
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import sympy as sp
+
+from .cache import cached_binomial, cached_factorial
+from .constants import One, Zero
+from .domains import EX, coefficient_domain
+from .linear_combination import SCALAR, LinearCombination, _normalize_coeff
+from .operators import (
+    DerivativeOperator,
+    NormalOrderedOperator,
+    Operator,
+)
+from .operators import d as derivative
+from .registry import ope_registry
+
+
+# 每张记忆表默认最多保存的条目数
+MEMO_MAXSIZE = 1 << 16
+
+
+class _Memo:
+    """
+    有上限的 LRU 记忆表（与 cache.OPECache 一样用 OrderedDict 实现）
+
+    记忆表对键中的算符节点是强引用，不设上限时长时间的 null states 计算中
+    驻留表无法回收这些节点。
+    """
+
+    def __init__(self, maxsize: int = MEMO_MAXSIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Any, LinearCombination]" = OrderedDict()
+
+    def get(self, key: Any) -> Optional[LinearCombination]:
+        result = self._data.get(key)
+        if result is not None:
+            self._data.move_to_end(key)
+        return result
+
+    def __setitem__(self, key: Any, value: LinearCombination) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def resize(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+# 记忆表，键为驻留的算符节点
+_canonical_memo = _Memo()
+_product_memo = _Memo()
+_insert_memo = _Memo()
+_swap_memo = _Memo()
+_memos = (_canonical_memo, _product_memo, _insert_memo, _swap_memo)
+
+# 记忆表对应的 (注册表版本号, 计算方式)
+_memo_state = None
+
+
+def clear_normal_order_memo() -> None:
+    """清空重排记忆表（释放其中算符节点和结果占用的内存）"""
+    global _memo_state
+    for memo in _memos:
+        memo.clear()
+    _memo_state = None
+
+
+def resize_normal_order_memo(maxsize: int) -> None:
+    """
+    设置每张重排记忆表的条目上限
+
+    Args:
+        maxsize: 新的上限（超出的最久未使用条目立即删除）
+
+    Raises:
+        ValueError: 如果 maxsize 不为正
+    """
+    if maxsize < 1:
+        raise ValueError(f"Memo size must be positive, got {maxsize}")
+    for memo in _memos:
+        memo.resize(maxsize)
+
+
+def normal_order_memo_size() -> int:
+    """重排记忆表中的条目总数"""
+    return sum(len(memo) for memo in _memos)
+
+
+def _check_memo() -> None:
+    """注册表或计算方式改变后，旧的重排结果不再有效"""
+    global _memo_state
+    from .api import get_ope_method
+
+    state = (ope_registry.version, get_ope_method())
+    if state != _memo_state:
+        clear_normal_order_memo()
+        _memo_state = state
+
+
+def _is_quantum() -> bool:
+    from .api import QuantumOPEs, get_ope_method
+    return get_ope_method() == QuantumOPEs
+
+
+def _is_letter(op: Any) -> bool:
+    """是否为 PBW 单项式中的一个因子（生成元或其导数）"""
+    if isinstance(op, NormalOrderedOperator):
+        return False
+    if isinstance(op, DerivativeOperator):
+        return not isinstance(op.base, NormalOrderedOperator)
+    return isinstance(op, Operator)
+
+
+def _bracket_terms(left: Any, right: Any) -> Dict[int, LinearCombination]:
+    """OPE(left, right) 的极点 {n: {left right}_n}（重排总是使用 sympy 系数）"""
+    from .api import _compute_ope
+    with coefficient_domain(EX):
+        return _compute_ope(left, right)._poles
+
+
+def normal_order(expr: Any) -> LinearCombination:
+    """
+    把表达式重排为 PBW 规范形式
+
+    Args:
+        expr: 算符、sympy 表达式或 LinearCombination
+
+    Returns:
+        LinearCombination，每一项是规范单项式（或纯标量项）
+    """
+    _check_memo()
+    return _normalized(_canonical_lc(LinearCombination.from_expr(expr)))
+
+
+def _normalized(lc: LinearCombination) -> LinearCombination:
+    """
+    展开每个系数并删除为零的项
+
+    累加时系数是未展开的 sympy 乘积，结构上不为零的系数可能实际为零。
+    """
+    result = LinearCombination()
+    for op, coeff in lc.items():
+        result._add_term(op, _normalize_coeff(coeff))
+    return result
+
+
+def _canonical_lc(lc: LinearCombination) -> LinearCombination:
+    """逐项规范化线性组合"""
+    result = LinearCombination()
+    for op, coeff in lc.items():
+        if op is SCALAR or op is One:
+            result._add_term(SCALAR, coeff)
+        elif isinstance(op, Operator):
+            result._iadd(_canonical_operator(op), coeff)
+        else:
+            # 算符的普通乘积等无法规范化的项原样保留
+            result._add_term(op, coeff)
+    return result
+
+
+def _canonical_operator(op: Operator) -> LinearCombination:
+    """单个算符的规范形式"""
+    result = _canonical_memo.get(op)
+    if result is not None:
+        return result
+
+    if op is Zero:
+        result = LinearCombination()
+    elif op is One:
+        result = LinearCombination.from_operator(SCALAR)
+    elif _is_letter(op):
+        result = LinearCombination.from_operator(op)
+    elif isinstance(op, DerivativeOperator):
+        # ∂^k NO(A, B) = Σ_i C(k, i) NO(∂^i A, ∂^{k-i} B)
+        base = op.base
+        order = op.order
+        result = LinearCombination()
+        for i in range(order + 1):
+            left = derivative(base.left, i) if i else base.left
+            right = derivative(base.right, order - i) if order - i else base.right
+            result._iadd(_product_lc(_canonical_operator(left), _canonical_operator(right)),
+                         cached_binomial(order, i))
+    else:
+        result = _product_lc(_canonical_operator(op.left), _canonical_operator(op.right))
+
+    result = _normalized(result)
+    _canonical_memo[op] = result
+    return result
+
+
+def _product_lc(left: LinearCombination, right: LinearCombination) -> LinearCombination:
+    """两个规范形式的正规序乘积 NO(left, right)，结果为规范形式"""
+    result = LinearCombination()
+    for u, coeff_u in left.items():
+        for w, coeff_w in right.items():
+            result._iadd(_product(u, w), coeff_u * coeff_w)
+    return result
+
+
+def _product(u: Any, w: Any) -> LinearCombination:
+    """两个规范单项式的正规序乘积 NO(u, w)"""
+    if u is SCALAR:
+        return LinearCombination.from_operator(w)
+    if w is SCALAR:
+        return LinearCombination.from_operator(u)
+    if _is_letter(u):
+        return _insert(u, w)
+
+    key = (u, w)
+    result = _product_memo.get(key)
+    if result is not None:
+        return result
+
+    # u = NO(a, u')：NO(NO(a, u'), w) = NO(a, NO(u', w)) + 修正项
+    a = u.left
+    rest = u.right
+    result = _insert_lc(a, _product(rest, w))
+
+    if _is_quantum():
+        sign = (-1) ** (a.parity * rest.parity)
+        for n, bracket in _bracket_terms(rest, w).items():
+            if n < 1:
+                continue
+            result._iadd(_product_lc(_canonical_operator(derivative(a, n)),
+                                     _canonical_lc(bracket)),
+                         1 / cached_factorial(n))
+        for n, bracket in _bracket_terms(a, w).items():
+            if n < 1:
+                continue
+            result._iadd(_product_lc(_canonical_operator(derivative(rest, n)),
+                                     _canonical_lc(bracket)),
+                         sign / cached_factorial(n))
+
+    result = _normalized(result)
+    _product_memo[key] = result
+    return result
+
+
+def _insert_lc(letter: Any, lc: LinearCombination) -> LinearCombination:
+    """把一个因子插入规范形式的每一项: NO(letter, lc)"""
+    result = LinearCombination()
+    for w, coeff in lc.items():
+        if w is SCALAR:
+            result._add_term(letter, coeff)
+        else:
+            result._iadd(_insert(letter, w), coeff)
+    return result
+
+
+def _insert(letter: Any, word: Any) -> LinearCombination:
+    """
+    把一个因子插入规范单项式: NO(letter, word)
+
+    Args:
+        letter: 生成元或其导数
+        word: 规范单项式
+
+    Returns:
+        规范形式的 LinearCombination
+    """
+    key = (letter, word)
+    result = _insert_memo.get(key)
+    if result is not None:
+        return result
+
+    if isinstance(word, NormalOrderedOperator):
+        first = word.left
+        rest = word.right
+    else:
+        first = word
+        rest = SCALAR
+
+    order = ope_registry.compare_operators(letter, first)
+    if order > 0 or (order == 0 and letter.parity == 0):
+        # 已经是规范顺序
+        result = LinearCombination.from_operator(NormalOrderedOperator(letter, word))
+    else:
+        if order == 0:
+            # 同一个费米子: NO(A, NO(A, C)) = 修正项 / 2
+            result = LinearCombination()
+            scale = sp.Rational(1, 2)
+        else:
+            # NO(A, NO(B, C)) = p NO(B, NO(A, C)) + 修正项
+            sign = (-1) ** (letter.parity * first.parity)
+            if rest is SCALAR:
+                moved = LinearCombination.from_operator(letter)
+            else:
+                moved = _insert(letter, rest)
+            result = _insert_lc(first, moved).scale(sign)
+            scale = 1
+
+        if _is_quantum():
+            correction = _swap_correction(letter, first)
+            if correction:
+                rest_lc = LinearCombination.from_operator(rest)
+                result._iadd(_product_lc(correction, rest_lc), scale)
+
+    result = _normalized(result)
+    _insert_memo[key] = result
+    return result
+
+
+def _swap_correction(left: Any, right: Any) -> LinearCombination:
+    """
+    交换修正项 Σ_{n≥1} (-1)^{n+1}/n! ∂^n {left right}_n 的规范形式
+
+    NO(left, right) = p NO(right, left) + 交换修正项
+    """
+    key = (left, right)
+    result = _swap_memo.get(key)
+    if result is not None:
+        return result
+
+    correction = LinearCombination()
+    for n, bracket in _bracket_terms(left, right).items():
+        if n >= 1:
+            correction._iadd(bracket.derivative(n), (-1) ** (n + 1) / cached_factorial(n))
+    result = _normalized(_canonical_lc(correction))
+
+    _swap_memo[key] = result
+    return result
+
+
+def swap_correction(left: Any, right: Any) -> LinearCombination:
+    """
+    交换两个算符时的修正项（带记忆）
+
+    NO(left, right) = (-1)^{|left||right|} NO(right, left)
+                      + Σ_{n≥1} (-1)^{n+1}/n! ∂^n {left right}_n
+
+    Args:
+        left: 左侧算符
+        right: 右侧算符
+
+    Returns:
+        修正项的规范形式（经典 OPE 中为零）
+    """
+    _check_memo()
+    if not _is_quantum():
+        return LinearCombination()
+    return _swap_correction(left, right).copy()
@@ -6,18 +6,24 @@ Null States 计算模块
 2. 系数提取
 3. 自由场 Fock 空间基枚举
 4. 矩阵构建和秩计算
+
+并行模式下（parallel.parallel_opes，或给出 max_workers 时），各量子数扇区的计算
+和各算符的展开分发到进程池，结果按确定的顺序合并。
 """
 
-from typing import Dict, List, Tuple, Set, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any, Union
 from fractions import Fraction
-from collections import defaultdict
+from functools import lru_cache
 import itertools
+import math
+import warnings
 
 from .operators import BasisOperator, d
 from .api import NO
-from .simplify import simplify
 from .constants import One
-from .local_operator import OperatorSum, OperatorProduct
+from .matrix_rank import SparseMatrix
+from .charges import ChargeLattice
+from .parallel import get_parallel_engine, parallel_opes
 
 
 def integer_partitions(n: Fraction) -> List[List[Fraction]]:
@@ -139,16 +145,89 @@ class CoefficientExtractor:
                 self.coefficients[term] = 1
 
     def _is_scalar(self, obj) -> bool:
-        """判断对象是否为标量（数字）"""
+        """判断对象是否为标量（数字或只含符号参数如 c 的表达式）"""
         import sympy as sp
-        return isinstance(obj, (int, float, Fraction, complex, sp.Number))
+        from .operators import Operator
+        if isinstance(obj, (int, float, Fraction, complex, sp.Number)):
+            return True
+        return isinstance(obj, sp.Expr) and not any(
+            isinstance(symbol, Operator) for symbol in obj.free_symbols)
+
+
+def _monomial_counter(sizes: List[int], fermionic: List[bool]):
+    """
+    count(i, w): 只用第 i 个及之后的因子组成总大小为 w 的 PBW 单项式个数
+
+    sizes 是各因子权重（公分母的整数单位），费米因子最多出现一次。结果带记忆。
+    """
+    n_letters = len(sizes)
+
+    @lru_cache(maxsize=None)
+    def count(i: int, w: int) -> int:
+        if w == 0:
+            return 1
+        if i == n_letters:
+            return 0
+        if fermionic[i]:
+            # 费米因子最多出现一次
+            total = count(i + 1, w)
+            if sizes[i] <= w:
+                total += count(i + 1, w - sizes[i])
+            return total
+        # 玻色因子出现 0, 1, 2, ... 次
+        total = 0
+        while w >= 0:
+            total += count(i + 1, w)
+            w -= sizes[i]
+        return total
+
+    return count
+
+
+def _iter_monomials(sizes: List[int], fermionic: List[bool], total: int,
+                    count=None) -> Iterator[Tuple[int, ...]]:
+    """
+    惰性生成总大小为 total 的 PBW 单项式（因子下标的不减序列）
+
+    每个多重集只出现一次，count（见 _monomial_counter）用于剪掉不可能补全的分支。
+    """
+    if count is None:
+        count = _monomial_counter(sizes, fermionic)
+
+    def monomials(start: int, remaining: int):
+        if remaining == 0:
+            yield ()
+            return
+        for i in range(start, len(sizes)):
+            if sizes[i] > remaining:
+                continue
+            # 玻色因子可以重复，费米因子不能
+            next_start = i + 1 if fermionic[i] else i
+            if count(next_start, remaining - sizes[i]) == 0:
+                continue
+            for rest in monomials(next_start, remaining - sizes[i]):
+                yield (i,) + rest
+
+    return monomials(0, total)
+
+
+def _common_unit(weights: List[Fraction], level: Fraction) -> int:
+    """所有权重和 level 的公分母"""
+    unit = level.denominator
+    for weight in weights:
+        unit = unit * weight.denominator // math.gcd(unit, weight.denominator)
+    return unit
 
 
 class FockSpaceBasis:
     """
     自由场 Fock 空间基枚举器
 
-    枚举给定 level 的所有自由场算符组合
+    给定 level 的基是规范的 PBW 单项式 NO(A1, NO(A2, ..., Ak))：
+    每个 Ai 是权重为正的自由场或其导数（因子），因子按注册表的算符顺序
+    （与 normal_order 的规范形式相同）排列，同一个费米因子不出现两次。
+    基是惰性生成的，基的大小由生成函数
+    Π_玻色因子 1/(1 - q^w) Π_费米因子 (1 + q^w) 精确计算，不需要截断。
     """
 
     def __init__(self, free_fields: List[BasisOperator]):
@@ -162,79 +241,99 @@ class FockSpaceBasis:
             for field in free_fields
         }
 
-    def enumerate_basis(self, level: Fraction, max_count: int = 1000) -> List[Any]:
+    def _letters(self, level: Fraction) -> List[Tuple[Fraction, Tuple[BasisOperator, int]]]:
         """
-        枚举给定 level 的所有自由场基
-
-        Args:
-            level: 目标 level（共形权重）
-            max_count: 最大枚举数量
+        权重在 (0, level] 内的所有因子，按 PBW 顺序排列
 
         Returns:
-            自由场算符组合列表
+            [(权重, (自由场, 导数阶数))]
         """
-        basis = []
+        from functools import cmp_to_key
+        from .registry import ope_registry
 
-        # 使用整数分拆方法
-        for partition in self._integer_partitions(level):
-            # 对每个分拆，尝试分配自由场
-            for assignment in self._assign_fields_to_partition(partition):
-                basis.append(self._construct_operator(assignment))
+        letters = []
+        for field in self.free_fields:
+            base_weight = Fraction(self.field_weights[field])
+            # 权重非正的因子（如 c 和 ∂c）不出现在基中
+            order = max(0, math.floor(-base_weight) + 1)
+            while base_weight + order <= level:
+                letters.append((base_weight + order, (field, order)))
+                order += 1
 
-                if len(basis) >= max_count:
-                    return basis
+        operators = {letter: self._construct_operator([letter[1]]) for letter in letters}
+        letters.sort(key=cmp_to_key(
+            lambda a, b: -ope_registry.compare_operators(operators[a], operators[b])))
+        return letters
 
-        return basis
+    def _counter(self, letters, level: Fraction):
+        """
+        count(i, w): 只用 letters[i:] 组成总权重为 w 的单项式个数
 
-    def _integer_partitions(self, n: Fraction):
+        权重换成公分母的整数单位，结果带记忆。
         """
-        生成 n 的所有整数分拆（支持半整数）
+        unit = _common_unit([weight for weight, _ in letters], level)
+        sizes = [int(weight * unit) for weight, _ in letters]
+        fermionic = [letter[0].parity == 1 for _, letter in letters]
+        return _monomial_counter(sizes, fermionic), sizes, int(level * unit)
 
-        为了处理半整数权重，将 n 乘以 2 转换为整数
+    def basis_size(self, level: Fraction) -> int:
         """
-        n_doubled = int(2 * n)
+        给定 level 的基的精确大小
 
-        def partitions_helper(n, max_val=None):
-            if max_val is None:
-                max_val = n
-            if n == 0:
-                yield []
-                return
-            for i in range(min(n, max_val), 0, -1):
-                for p in partitions_helper(n - i, i):
-                    yield [i] + p
+        Args:
+            level: 目标 level（共形权重）
 
-        # 转换回半整数
-        for p in partitions_helper(n_doubled):
-            yield [Fraction(x, 2) for x in p]
+        Returns:
+            基的大小
+        """
+        level = Fraction(level)
+        if level <= 0:
+            return 0
+        letters = self._letters(level)
+        count, _, total = self._counter(letters, level)
+        return count(0, total)
 
-    def _assign_fields_to_partition(self, partition: List[Fraction]):
+    def iter_basis(self, level: Fraction) -> Iterator[Any]:
         """
-        将自由场分配到分拆的各个部分
+        惰性生成给定 level 的所有自由场基
+
+        Args:
+            level: 目标 level（共形权重）
 
-        对于分拆 [w1, w2, ...], 找到所有可能的自由场组合
-        使得每个部分的权重匹配
+        Yields:
+            规范的 PBW 单项式
         """
-        # 对每个权重，找到可以达到该权重的自由场（包括导数）
-        available_fields = []
+        level = Fraction(level)
+        if level <= 0:
+            return
+        letters = self._letters(level)
+        count, sizes, total = self._counter(letters, level)
+        fermionic = [letter[0].parity == 1 for _, letter in letters]
 
-        for weight in partition:
-            fields_at_weight = []
+        for indices in _iter_monomials(sizes, fermionic, total, count):
+            yield self._construct_operator([letters[i][1] for i in indices])
 
-            for field in self.free_fields:
-                base_weight = self.field_weights[field]
-                derivative_order = weight - base_weight
+    def enumerate_basis(self, level: Fraction, max_count: Optional[int] = None) -> List[Any]:
+        """
+        枚举给定 level 的所有自由场基
 
-                # 检查是否可以通过导数达到目标权重
-                if derivative_order >= 0 and derivative_order == int(derivative_order):
-                    fields_at_weight.append((field, int(derivative_order)))
+        Args:
+            level: 目标 level（共形权重）
+            max_count: 最大枚举数量（默认不限制；基更大时截断并给出警告）
 
-            available_fields.append(fields_at_weight)
+        Returns:
+            自由场算符组合列表
+        """
+        if max_count is None:
+            return list(self.iter_basis(level))
 
-        # 生成所有组合
-        if all(available_fields):
-            for combo in itertools.product(*available_fields):
-                yield combo
+        basis = list(itertools.islice(self.iter_basis(level), max_count))
+        if len(basis) == max_count:
+            size = self.basis_size(level)
+            if size > max_count:
+                warnings.warn(f"Fock basis at level {level} truncated to {max_count} "
+                              f"of {size} states")
+        return basis
 
     def _construct_operator(self, assignment: Tuple) -> Any:
         """
@@ -288,14 +387,14 @@ def extract_coefficients(expr) -> Dict[Any, Any]:
 
 def enumerate_fock_basis(free_fields: List[BasisOperator],
                          level: Fraction,
-                         max_count: int = 1000) -> List[Any]:
+                         max_count: Optional[int] = None) -> List[Any]:
     """
     便捷函数：枚举自由场 Fock 空间基
 
     Args:
         free_fields: 自由场列表
         level: 目标 level
-        max_count: 最大枚举数量
+        max_count: 最大枚举数量（默认不限制）
 
     Returns:
         自由场算符组合列表
@@ -317,11 +416,14 @@ class OperatorExpander:
             fock_basis: 自由场 Fock 空间基列表
         """
         self.fock_basis = fock_basis
-        self.basis_index = {str(basis): i for i, basis in enumerate(fock_basis)}
+        # 基算符是驻留的 sympy 符号，直接用算符本身（而不是字符串）作为键
+        self.basis_index = {basis: i for i, basis in enumerate(fock_basis)}
+        # 展开结果的记忆表，每个算符只展开一次（子节点的记忆见 _expand）
+        self._expansions: Dict[Any, Dict[Any, Any]] = {}
 
     def expand(self, operator) -> Dict[Any, Any]:
         """
-        将算符展开为自由场基的线性组合
+        将算符展开为自由场基的线性组合（带记忆，返回的字典不要修改）
 
         Args:
             operator: 要展开的算符
@@ -329,26 +431,68 @@ class OperatorExpander:
         Returns:
             字典 {自由场基: 系数}
         """
-        # 使用 simplify 简化算符
-        from .simplify import simplify
-        simplified = simplify(operator)
+        try:
+            expansion = self._expansions.get(operator)
+        except TypeError:
+            # 不可哈希的输入（如 LinearCombination）不记忆
+            return self._expand(operator)
+        if expansion is None:
+            expansion = self._expand(operator)
+            self._expansions[operator] = expansion
+        return expansion
 
-        # 提取系数
-        coeffs = extract_coefficients(simplified)
+    def expand_all(self, operators: List[Any]) -> List[Dict[Any, Any]]:
+        """
+        展开一组算符
 
-        # 将系数映射到 Fock 空间基
-        expansion = {}
-        for op, coeff in coeffs.items():
-            # 检查算符是否在 Fock 基中
-            op_str = str(op)
-            if op_str in self.basis_index:
-                expansion[op] = coeff
-            else:
-                # 如果不在基中，尝试进一步展开
-                # 这里可以添加更复杂的展开逻辑
-                expansion[op] = coeff
+        并行模式下，尚未展开的算符按顺序分成连续的块分发到进程池
+        （相邻的算符往往有公共的子节点，放在同一个工作进程中可以共享记忆），
+        结果写入记忆表。
 
-        return expansion
+        Args:
+            operators: 算符列表
+
+        Returns:
+            展开结果列表，与 operators 顺序一致
+        """
+        engine = get_parallel_engine()
+        if engine is not None:
+            pending = []
+            for op in operators:
+                try:
+                    if op not in self._expansions:
+                        pending.append(op)
+                except TypeError:
+                    continue
+            pending = list(dict.fromkeys(pending))
+            if len(pending) >= engine.min_batch:
+                n_chunks = min(len(pending), 4 * engine.max_workers)
+                bounds = [len(pending) * k // n_chunks for k in range(n_chunks + 1)]
+                chunks = [pending[a:b] for a, b in zip(bounds, bounds[1:])]
+                for chunk, expansions in zip(chunks, engine.run(_expand_operators,
+                                                                [(chunk,) for chunk in chunks])):
+                    self._expansions.update(zip(chunk, expansions))
+        return [self.expand(op) for op in operators]
+
+    def _expand(self, operator) -> Dict[Any, Any]:
+        """
+        展开单个算符
+
+        使用 normal_order 的 PBW 规范形式：每个子节点（导数、NO 乘积）的
+        规范形式都带记忆，父节点由子节点的结果组合得到。记忆表是全局的，
+        在不同的扇区和 level 之间共享（level N 的态包含 level N-1 的态的导数），
+        只在注册表或计算方式改变时清空。
+        """
+        from .linear_combination import SCALAR
+        from .normal_order import normal_order
+
+        return {op: coeff for op, coeff in normal_order(operator).items() if op is not SCALAR}
+
+
+def _expand_operators(operators: List[Any]) -> List[Dict[Any, Any]]:
+    """展开一块算符（在工作进程中执行，见 OperatorExpander.expand_all）"""
+    expander = OperatorExpander([])
+    return [expander._expand(op) for op in operators]
 
 
 class CoefficientMatrixBuilder:
@@ -358,85 +502,108 @@ class CoefficientMatrixBuilder:
     构建从抽象算符到自由场基的系数矩阵
     """
 
-    def __init__(self, fock_basis: List[Any], operators: List[Any]):
+    def __init__(self, fock_basis: List[Any], operators: List[Any],
+                 rank_method: str = 'modular', expander: OperatorExpander = None):
         """
         Args:
             fock_basis: 自由场 Fock 空间基列表
             operators: 抽象算符列表
+            rank_method: 秩的计算方法（见 matrix_rank.matrix_rank）
+            expander: 共享的 OperatorExpander（同一组 fock_basis，
+                      已展开的算符不再重复展开）
         """
         self.fock_basis = fock_basis
         self.operators = operators
-        self.expander = OperatorExpander(fock_basis)
+        self.rank_method = rank_method
+        self.expander = expander if expander is not None else OperatorExpander(fock_basis)
 
-    def build_matrix(self) -> List[List[Any]]:
+    def build_matrix(self) -> SparseMatrix:
         """
         构建系数矩阵 M[i, j] = operator[j] 在 fock_basis[i] 上的系数
 
         Returns:
-            系数矩阵（列表的列表）
+            系数矩阵（稀疏格式，只保存非零元素；仍可用 len() 和 matrix[i] 访问）
         """
-        import numpy as np
-        from sympy import sympify, simplify as sp_simplify
+        matrix = SparseMatrix((len(self.fock_basis), len(self.operators)))
 
-        n_basis = len(self.fock_basis)
-        n_ops = len(self.operators)
+        # 为每个算符展开并填充矩阵列（并行模式下先在进程池中展开）
+        self.expander.expand_all(self.operators)
+        for j, operator in enumerate(self.operators):
+            for i, coeff in sorted(self.build_column(operator).items()):
+                matrix.append(i, j, coeff)
 
-        # 初始化矩阵
-        matrix = [[0 for _ in range(n_ops)] for _ in range(n_basis)]
+        return matrix
 
-        # 为每个算符展开并填充矩阵
-        for j, operator in enumerate(self.operators):
-            expansion = self.expander.expand(operator)
+    def build_column(self, operator) -> Dict[int, Any]:
+        """
+        单个算符在 Fock 空间基上的系数（矩阵的一列）
 
-            # 填充矩阵列
-            for basis_op, coeff in expansion.items():
-                # 找到基在列表中的索引
-                basis_str = str(basis_op)
-                if basis_str in self.expander.basis_index:
-                    i = self.expander.basis_index[basis_str]
-                    matrix[i][j] = coeff
+        Args:
+            operator: 抽象算符
 
-        return matrix
+        Returns:
+            非零系数 {基的下标: 系数}
+        """
+        column = {}
+        for basis_op, coeff in self.expander.expand(operator).items():
+            # 找到基在列表中的索引（不在基中的项忽略）
+            i = self.expander.basis_index.get(basis_op)
+            if i is not None and coeff != 0:
+                column[i] = coeff
+        return column
 
-    def compute_rank(self, matrix: List[List[Any]] = None) -> int:
+    def compute_rank(self, matrix: SparseMatrix = None,
+                     rank_method: str = None) -> int:
         """
         计算矩阵的秩
 
+        默认在几个大素数下精确计算（见 matrix_rank 模块），
+        rank_method='float' 使用旧的浮点数方法。
+
         Args:
             matrix: 系数矩阵（如果为 None，则自动构建）
+            rank_method: 秩的计算方法（默认为构造时给出的方法）
 
         Returns:
             矩阵的秩
         """
+        from .matrix_rank import matrix_rank
+
         if matrix is None:
             matrix = self.build_matrix()
 
-        # 处理空矩阵情况
-        if len(matrix) == 0 or (len(matrix) > 0 and len(matrix[0]) == 0):
-            return 0
+        return matrix_rank(matrix, method=rank_method or self.rank_method)
 
-        # 转换为 numpy 数组进行秩计算
-        import numpy as np
-        from fractions import Fraction
-
-        # 将矩阵转换为浮点数（处理 Fraction 和 sympy 表达式）
-        numeric_matrix = []
-        for row in matrix:
-            numeric_row = []
-            for val in row:
-                if isinstance(val, Fraction):
-                    numeric_row.append(float(val))
-                elif hasattr(val, 'evalf'):  # sympy 表达式
-                    numeric_row.append(float(val.evalf()))
-                else:
-                    numeric_row.append(float(val))
-            numeric_matrix.append(numeric_row)
+    def compute_rank_spectrum(self, matrix: SparseMatrix = None,
+                              params: List[Any] = None) -> Dict[str, Any]:
+        """
+        含符号参数（如中心荷 c）的矩阵的秩及秩下降的特殊参数值
+
+        Args:
+            matrix: 系数矩阵（如果为 None，则自动构建）
+            params: 参数符号列表（默认为矩阵中出现的所有符号）
+
+        Returns:
+            matrix_rank.symbolic_rank 的结果
+        """
+        from .matrix_rank import symbolic_rank
+
+        if matrix is None:
+            matrix = self.build_matrix()
+        return symbolic_rank(matrix, params)
 
-        # 计算秩
-        np_matrix = np.array(numeric_matrix)
-        rank = np.linalg.matrix_rank(np_matrix)
 
-        return rank
+def _special_null_states(spectrum: Dict[str, Any], n_abstract: int) -> Dict[str, Any]:
+    """把特殊参数值上的秩换成 null states 数量"""
+    special = {}
+    for key in ('special_values', 'special_factors'):
+        ranks = spectrum[key]
+        if ranks is None:
+            special[key] = None
+        else:
+            special[key] = {value: None if rank is None else n_abstract - rank
+                            for value, rank in ranks.items()}
+    return special
 
 
 class NullStatesCalculator:
@@ -451,18 +618,21 @@ class NullStatesCalculator:
     5. 计算 null states 数量 = 抽象态数 - 物理态数
     """
 
-    def __init__(self, free_fields: List[BasisOperator]):
+    def __init__(self, free_fields: List[BasisOperator], rank_method: str = 'modular'):
         """
         Args:
             free_fields: 自由场列表（如 [b, c, beta, gamma]）
+            rank_method: 秩的计算方法（见 matrix_rank.matrix_rank）
         """
         self.free_fields = free_fields
+        self.rank_method = rank_method
 
     def calculate_null_states(
         self,
         level: Fraction,
         abstract_operators: List[Any],
-        max_fock_basis: int = 1000
+        max_fock_basis: Optional[int] = None,
+        max_workers: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         计算给定 level 的 null states
@@ -470,7 +640,9 @@ class NullStatesCalculator:
         Args:
             level: 目标 level（共形权重）
             abstract_operators: 抽象算符列表（W-algebra 生成元的组合）
-            max_fock_basis: 最大 Fock 基数量
+            max_fock_basis: 最大 Fock 基数量（默认不限制）
+            max_workers: 如果给出，在临时开启的并行模式中计算（各算符的展开
+                         分发到进程池）
 
         Returns:
             字典包含：
@@ -481,7 +653,16 @@ class NullStatesCalculator:
             - 'n_null_states': null states 数量
             - 'fock_basis': Fock 空间基列表
             - 'matrix': 系数矩阵
+            rank_method='symbolic' 时 'rank' 和 'n_null_states' 是参数一般取值时的结果，
+            另外包含：
+            - 'parameters': 矩阵中的符号参数
+            - 'special_values': {参数值: 该值上的 null states 数量}（只含数量变化的值）
+            - 'special_factors': {不可约多项式: 其根上的 null states 数量}
         """
+        if max_workers is not None:
+            with parallel_opes(max_workers=max_workers):
+                return self.calculate_null_states(level, abstract_operators, max_fock_basis)
+
         # 1. 枚举 Fock 空间基
         fock_basis = enumerate_fock_basis(
             self.free_fields,
@@ -490,17 +671,23 @@ class NullStatesCalculator:
         )
 
         # 2. 构建系数矩阵
-        matrix_builder = CoefficientMatrixBuilder(fock_basis, abstract_operators)
+        matrix_builder = CoefficientMatrixBuilder(fock_basis, abstract_operators,
+                                                  rank_method=self.rank_method)
         matrix = matrix_builder.build_matrix()
 
         # 3. 计算秩
-        rank = matrix_builder.compute_rank(matrix)
+        spectrum = None
+        if self.rank_method == 'symbolic':
+            spectrum = matrix_builder.compute_rank_spectrum(matrix)
+            rank = spectrum['rank']
+        else:
+            rank = matrix_builder.compute_rank(matrix)
 
         # 4. 计算 null states 数量
         n_abstract = len(abstract_operators)
         n_null_states = n_abstract - rank
 
-        return {
+        result = {
             'level': level,
             'n_abstract': n_abstract,
             'n_fock_basis': len(fock_basis),
@@ -509,6 +696,10 @@ class NullStatesCalculator:
             'fock_basis': fock_basis,
             'matrix': matrix
         }
+        if spectrum is not None:
+            result['parameters'] = spectrum['parameters']
+            result.update(_special_null_states(spectrum, n_abstract))
+        return result
 
     def calculate_character(
         self,
@@ -547,7 +738,8 @@ def calculate_null_states(
     free_fields: List[BasisOperator],
     level: Fraction,
     abstract_operators: List[Any],
-    max_fock_basis: int = 1000
+    max_fock_basis: Optional[int] = None,
+    rank_method: str = 'modular'
 ) -> Dict[str, Any]:
     """
     便捷函数：计算 null states
@@ -556,12 +748,13 @@ def calculate_null_states(
         free_fields: 自由场列表
         level: 目标 level
         abstract_operators: 抽象算符列表
-        max_fock_basis: 最大 Fock 基数量
+        max_fock_basis: 最大 Fock 基数量（默认不限制）
+        rank_method: 秩的计算方法（见 matrix_rank.matrix_rank）
 
     Returns:
         null states 计算结果
     """
-    calculator = NullStatesCalculator(free_fields)
+    calculator = NullStatesCalculator(free_fields, rank_method=rank_method)
     return calculator.calculate_null_states(level, abstract_operators, max_fock_basis)
 
 
@@ -569,80 +762,43 @@ class QuantumNumberCalculator:
     """
     量子数计算器
 
-    计算算符的量子数 (m, r)，用于按量子数分组
+    计算算符的量子数 (m, r)，用于按量子数分组。实际计算由 charges.ChargeLattice
+    完成：量子数在生成元上声明，复合算符的量子数在每个驻留节点上只计算一次。
+    量子数的个数不限，更多的加性荷可以把扇区分得更细。
+
+    由字典创建时，与以前一样，各项量子数不同的线性组合取第一项的量子数。
     """
 
-    def __init__(self, quantum_number_map: Dict[Any, Tuple[Fraction, Fraction]]):
+    def __init__(self, quantum_number_map: Union[Dict[Any, Tuple[Fraction, ...]], ChargeLattice]):
         """
         Args:
-            quantum_number_map: 字典 {算符: (m, r)}
+            quantum_number_map: 字典 {算符: (m, r, ...)}，或 ChargeLattice
         """
-        self.quantum_number_map = quantum_number_map
+        if isinstance(quantum_number_map, ChargeLattice):
+            self.lattice = quantum_number_map
+            self.quantum_number_map = quantum_number_map.declared()
+        else:
+            self.lattice = ChargeLattice(quantum_number_map, homogeneous=False)
+            self.quantum_number_map = quantum_number_map
 
-    def get_quantum_numbers(self, operator) -> Tuple[Fraction, Fraction]:
+    def get_quantum_numbers(self, operator) -> Tuple[Fraction, ...]:
         """
         获取算符的量子数
 
+        导数不改变量子数，正规序乘积的量子数相加，线性组合取各项（相同）的量子数；
+        没有声明的基本算符的量子数为零。
+
         Args:
             operator: 算符
 
         Returns:
-            (m, r) 量子数元组
-        """
-        from .operators import DerivativeOperator, NormalOrderedOperator
-        from .local_operator import OperatorSum
-
-        # 处理导数算符
-        if isinstance(operator, DerivativeOperator):
-            # 导数不改变量子数
-            return self.get_quantum_numbers(operator.base)
-
-        # 处理正规序算符
-        if isinstance(operator, NormalOrderedOperator):
-            # 正规序：量子数相加
-            m1, r1 = self.get_quantum_numbers(operator.left)
-            m2, r2 = self.get_quantum_numbers(operator.right)
-            return (m1 + m2, r1 + r2)
-
-        # 处理算符和
-        if isinstance(operator, OperatorSum):
-            # 算符和：所有项应该有相同的量子数
-            # 取第一项的量子数
-            if operator.terms:
-                first_op = list(operator.terms.keys())[0]
-                return self.get_quantum_numbers(first_op)
-            return (Fraction(0), Fraction(0))
-
-        # 处理 SymPy Add 表达式（算符的线性组合）
-        import sympy as sp
-        if isinstance(operator, sp.Add):
-            # SymPy Add：所有项应该有相同的量子数
-            # 取第一项的量子数
-            if operator.args:
-                # 获取第一项（可能带系数）
-                first_term = operator.args[0]
-                # 如果第一项是 Mul（系数 * 算符），提取算符部分
-                if isinstance(first_term, sp.Mul):
-                    # 找到非数值的部分
-                    for arg in first_term.args:
-                        if not arg.is_number:
-                            return self.get_quantum_numbers(arg)
-                # 否则直接使用第一项
-                return self.get_quantum_numbers(first_term)
-            return (Fraction(0), Fraction(0))
-
-        # 处理基本算符
-        if operator in self.quantum_number_map:
-            return self.quantum_number_map[operator]
-
-        # 尝试字符串匹配（用于处理复合表达式）
-        op_str = str(operator)
-        for key, value in self.quantum_number_map.items():
-            if str(key) == op_str:
-                return value
-
-        # 默认返回 (0, 0)
-        return (Fraction(0), Fraction(0))
+            (m, r) 量子数元组（声明了更多的荷时元组更长）
+
+        Raises:
+            ValueError: 如果线性组合中各项的量子数不同（只在使用要求齐次的
+                        ChargeLattice 时）
+        """
+        return self.lattice.charge(operator)
 
 
 class QuantumNumberGrouper:
@@ -674,18 +830,11 @@ class QuantumNumberGrouper:
         Returns:
             字典 {(m, r): [算符列表]}
         """
-        groups = defaultdict(list)
-
-        for op in operators:
-            m, r = self.quantum_calculator.get_quantum_numbers(op)
-
-            # 如果只保留 m≥0 的算符
-            if only_non_negative_m and m < 0:
-                continue
-
-            groups[(m, r)].append(op)
-
-        return dict(groups)
+        groups = self.quantum_calculator.lattice.group(operators)
+        if only_non_negative_m:
+            # 只保留 m≥0 的扇区
+            groups = {key: ops for key, ops in groups.items() if key[0] >= 0}
+        return groups
 
     def group_fock_basis(
         self,
@@ -733,16 +882,9 @@ class QuantumNumberGrouper:
                 Fraction(3, 2): [Op6]
             }
         """
-        groups = defaultdict(list)
-
-        for op in operators:
-            m, _ = self.quantum_calculator.get_quantum_numbers(op)
-
-            # 如果只保留 m≥0 的算符
-            if only_non_negative_m and m < 0:
-                continue
-
-            groups[m].append(op)
+        groups = {key[0]: ops for key, ops in
+                  self.quantum_calculator.lattice.group(operators, components=(0,)).items()
+                  if not (only_non_negative_m and key[0] < 0)}
 
         # 返回排序后的字典（Python 3.7+ 保证插入顺序）
         return dict(sorted(groups.items()))
@@ -776,10 +918,9 @@ class QuantumNumberGrouper:
 
         for m, states_in_m_sector in states_by_m.items():
             for state in states_in_m_sector:
-                m_check, r = self.quantum_calculator.get_quantum_numbers(state)
-                assert m_check == m, f"量子数不一致: 期望 m={m}, 实际 m={m_check}"
+                key = self.quantum_calculator.get_quantum_numbers(state)
+                assert key[0] == m, f"量子数不一致: 期望 m={m}, 实际 m={key[0]}"
 
-                key = (m, r)
                 if key not in groups:
                     groups[key] = []
                 groups[key].append(state)
@@ -802,14 +943,8 @@ class QuantumNumberGrouper:
         Returns:
             排序后的 m 值列表
         """
-        m_values = set()
-        for op in operators:
-            m, _ = self.quantum_calculator.get_quantum_numbers(op)
-            if only_non_negative_m and m < 0:
-                continue
-            m_values.add(m)
-
-        return sorted(m_values)
+        m_values = self.quantum_calculator.lattice.group(operators, components=(0,))
+        return sorted(m for (m,) in m_values if not (only_non_negative_m and m < 0))
 
 
 class GroupedNullStatesCalculator:
@@ -822,53 +957,73 @@ class GroupedNullStatesCalculator:
     def __init__(
         self,
         free_fields: List[BasisOperator],
-        quantum_number_map: Dict[Any, Tuple[Fraction, Fraction]]
+        quantum_number_map: Union[Dict[Any, Tuple[Fraction, ...]], ChargeLattice],
+        rank_method: str = 'modular'
     ):
         """
         Args:
             free_fields: 自由场列表
-            quantum_number_map: 量子数映射 {算符: (m, r)}
+            quantum_number_map: 量子数映射 {算符: (m, r)}，或 ChargeLattice
+                                （声明更多的加性荷时，扇区按所有的荷细分）
+            rank_method: 秩的计算方法（见 matrix_rank.matrix_rank）
         """
         self.free_fields = free_fields
+        self.rank_method = rank_method
         self.quantum_calculator = QuantumNumberCalculator(quantum_number_map)
         self.grouper = QuantumNumberGrouper(self.quantum_calculator)
 
+    def fock_sector_sizes(self, level: Fraction) -> Dict[Tuple[Fraction, Fraction], int]:
+        """
+        各量子数扇区 Fock 基的大小（由 q 级数得到，不构造任何算符）
+
+        Args:
+            level: 目标 level
+
+        Returns:
+            字典 {(m, r): Fock 基数量}（只含非空扇区）
+        """
+        from .qseries import fock_character
+
+        charges = {field: self.quantum_calculator.get_quantum_numbers(field)
+                   for field in self.free_fields}
+        return fock_character(self.free_fields, level, charges).sectors(level)
+
     def _filter_linearly_independent(
         self,
         operators: List[Any],
-        fock_basis: List[Any]
+        fock_basis: List[Any],
+        expander: OperatorExpander = None
     ) -> List[Any]:
         """
         过滤出线性独立的算符
 
-        通过逐个添加算符并检查矩阵秩是否增加来判断线性独立性
+        逐个把算符的系数向量加入行阶梯形（matrix_rank.IncrementalEchelon），
+        约化后不为零的算符是线性独立的。每个算符只展开、约化一次；
+        线性独立性总是精确判断（系数含符号参数时按参数的一般取值）。
 
         Args:
             operators: 算符列表
             fock_basis: Fock 空间基列表
+            expander: 共享的 OperatorExpander（默认新建）
 
         Returns:
             线性独立的算符列表
         """
+        from .matrix_rank import IncrementalEchelon
+
         if not operators or not fock_basis:
             return []
 
-        independent_ops = []
-        current_rank = 0
+        matrix_builder = CoefficientMatrixBuilder(fock_basis, operators,
+                                                  rank_method=self.rank_method,
+                                                  expander=expander)
+        matrix_builder.expander.expand_all(operators)
+        echelon = IncrementalEchelon(len(fock_basis))
 
+        independent_ops = []
         for op in operators:
-            # 尝试添加这个算符
-            test_ops = independent_ops + [op]
-
-            # 构建矩阵并计算秩
-            matrix_builder = CoefficientMatrixBuilder(fock_basis, test_ops)
-            matrix = matrix_builder.build_matrix()
-            new_rank = matrix_builder.compute_rank(matrix)
-
-            # 如果秩增加，说明这个算符是线性独立的
-            if new_rank > current_rank:
+            if echelon.add(matrix_builder.build_column(op)):
                 independent_ops.append(op)
-                current_rank = new_rank
 
         return independent_ops
 
@@ -876,19 +1031,25 @@ class GroupedNullStatesCalculator:
         self,
         level: Fraction,
         abstract_operators: List[Any],
-        max_fock_basis: int = 1000,
+        max_fock_basis: Optional[int] = None,
         only_non_negative_m: bool = False,
-        filter_linearly_independent: bool = True
+        filter_linearly_independent: bool = True,
+        max_workers: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         按量子数分组计算 null states
 
+        并行模式下各扇区分发到进程池，Fock 基与算符数之积最大的扇区最先调度；
+        只有一个扇区时在主进程中计算，改为把各算符的展开分发到进程池。
+        结果总是按扇区原来的顺序合并，与串行计算相同。
+
         Args:
             level: 目标 level
             abstract_operators: 抽象算符列表
-            max_fock_basis: 最大 Fock 基数量
+            max_fock_basis: 最大 Fock 基数量（默认不限制）
             only_non_negative_m: 是否只计算 m≥0 扇区
             filter_linearly_independent: 是否过滤线性独立的算符
+            max_workers: 如果给出，在临时开启的并行模式中计算
 
         Returns:
             字典包含：
@@ -898,7 +1059,16 @@ class GroupedNullStatesCalculator:
             - 'total_rank': 总秩
             - 'total_n_null_states': 总 null states 数
             - 'filtered': 是否进行了线性独立性过滤
+            rank_method='symbolic' 时各扇区还包含 'special_values' 和
+            'special_factors'（见 NullStatesCalculator.calculate_null_states），
+            总结果包含 'total_special_values' 和 'total_special_factors'
         """
+        if max_workers is not None:
+            with parallel_opes(max_workers=max_workers):
+                return self.calculate_null_states_grouped(
+                    level, abstract_operators, max_fock_basis,
+                    only_non_negative_m, filter_linearly_independent)
+
         # 1. 枚举 Fock 空间基
         fock_basis = enumerate_fock_basis(
             self.free_fields,
@@ -916,52 +1086,40 @@ class GroupedNullStatesCalculator:
             only_non_negative_m
         )
 
-        # 3. 对每个量子数扇区计算
-        group_results = {}
-        total_n_abstract = 0
-        total_rank = 0
-
+        # 3. 收集非空的量子数扇区
+        sectors = []
         for quantum_numbers in operator_groups.keys():
-            m, r = quantum_numbers
-
-            # 获取该量子数的算符和 Fock 基
             ops_in_group = operator_groups.get(quantum_numbers, [])
             fock_in_group = fock_groups.get(quantum_numbers, [])
+            if ops_in_group and fock_in_group:
+                # 没有算符或 Fock 基的扇区跳过
+                sectors.append((quantum_numbers, ops_in_group, fock_in_group))
+
+        # 4. 对每个量子数扇区计算
+        engine = get_parallel_engine()
+        if engine is not None and len(sectors) >= max(engine.min_batch, 2):
+            # 大的扇区先调度（排序是稳定的），结果按扇区原来的顺序合并
+            order = sorted(range(len(sectors)),
+                           key=lambda k: -len(sectors[k][1]) * len(sectors[k][2]))
+            computed = engine.run(self._compute_sector,
+                                  [sectors[k] + (filter_linearly_independent,) for k in order])
+            results_by_index = dict(zip(order, computed))
+            sector_results = [results_by_index[k] for k in range(len(sectors))]
+        else:
+            sector_results = [self._compute_sector(*sector, filter_linearly_independent)
+                              for sector in sectors]
 
-            if not ops_in_group or not fock_in_group:
-                # 如果没有算符或 Fock 基，跳过
-                continue
-
-            # 过滤线性独立的算符（如果启用）
-            if filter_linearly_independent:
-                ops_in_group = self._filter_linearly_independent(ops_in_group, fock_in_group)
-
-            # 构建该扇区的矩阵
-            matrix_builder = CoefficientMatrixBuilder(fock_in_group, ops_in_group)
-            matrix = matrix_builder.build_matrix()
-            rank = matrix_builder.compute_rank(matrix)
-
-            # 记录结果
-            n_abstract = len(ops_in_group)
-            n_null = n_abstract - rank
-
-            group_results[quantum_numbers] = {
-                'quantum_numbers': quantum_numbers,
-                'n_abstract': n_abstract,
-                'n_fock_basis': len(fock_in_group),
-                'rank': rank,
-                'n_null_states': n_null,
-                'operators': ops_in_group,
-                'fock_basis': fock_in_group,
-                'matrix': matrix
-            }
-
-            total_n_abstract += n_abstract
-            total_rank += rank
+        group_results = {}
+        total_n_abstract = 0
+        total_rank = 0
+        for sector_result in sector_results:
+            group_results[sector_result['quantum_numbers']] = sector_result
+            total_n_abstract += sector_result['n_abstract']
+            total_rank += sector_result['rank']
 
         total_n_null_states = total_n_abstract - total_rank
 
-        return {
+        result = {
             'level': level,
             'groups': group_results,
             'total_n_abstract': total_n_abstract,
@@ -970,6 +1128,86 @@ class GroupedNullStatesCalculator:
             'only_non_negative_m': only_non_negative_m,
             'filtered': filter_linearly_independent
         }
+        if self.rank_method == 'symbolic':
+            result.update(self._total_special_null_states(group_results, total_n_null_states))
+        return result
+
+    def _compute_sector(
+        self,
+        quantum_numbers: Tuple[Fraction, Fraction],
+        ops_in_group: List[Any],
+        fock_in_group: List[Any],
+        filter_linearly_independent: bool
+    ) -> Dict[str, Any]:
+        """
+        计算一个量子数扇区（并行模式下在工作进程中执行）
+
+        Args:
+            quantum_numbers: 扇区的量子数 (m, r)
+            ops_in_group: 扇区中的抽象算符
+            fock_in_group: 扇区中的 Fock 基
+            filter_linearly_independent: 是否过滤线性独立的算符
+
+        Returns:
+            扇区的结果（见 calculate_null_states_grouped）
+        """
+        # 过滤线性独立的算符（如果启用），展开结果在扇区内共享
+        expander = OperatorExpander(fock_in_group)
+        if filter_linearly_independent:
+            ops_in_group = self._filter_linearly_independent(ops_in_group, fock_in_group,
+                                                             expander)
+
+        # 构建该扇区的矩阵
+        matrix_builder = CoefficientMatrixBuilder(fock_in_group, ops_in_group,
+                                                  rank_method=self.rank_method,
+                                                  expander=expander)
+        matrix = matrix_builder.build_matrix()
+        spectrum = None
+        if self.rank_method == 'symbolic':
+            spectrum = matrix_builder.compute_rank_spectrum(matrix)
+            rank = spectrum['rank']
+        else:
+            rank = matrix_builder.compute_rank(matrix)
+
+        # 记录结果
+        n_abstract = len(ops_in_group)
+        result = {
+            'quantum_numbers': quantum_numbers,
+            'n_abstract': n_abstract,
+            'n_fock_basis': len(fock_in_group),
+            'rank': rank,
+            'n_null_states': n_abstract - rank,
+            'operators': ops_in_group,
+            'fock_basis': fock_in_group,
+            'matrix': matrix
+        }
+        if spectrum is not None:
+            result.update(_special_null_states(spectrum, n_abstract))
+        return result
+
+    @staticmethod
+    def _total_special_null_states(group_results: Dict[Any, Dict[str, Any]],
+                                   total_n_null_states: int) -> Dict[str, Any]:
+        """
+        各扇区的特殊参数值合并为总的 null states 数量
+
+        某个参数值只在部分扇区特殊时，其余扇区取一般的数量。
+        """
+        totals = {}
+        for key in ('special_values', 'special_factors'):
+            if any(group[key] is None for group in group_results.values()):
+                totals['total_' + key] = None
+                continue
+            special = {}
+            for group in group_results.values():
+                for value, n_null in group[key].items():
+                    if n_null is None:
+                        special[value] = None
+                    elif special.get(value, 0) is not None:
+                        special[value] = special.get(value, total_n_null_states) \
+                            + n_null - group['n_null_states']
+            totals['total_' + key] = special
+        return totals
 
 
 class OperatorEnumerator:
@@ -981,6 +1219,9 @@ class OperatorEnumerator:
     1. 单个生成元的导数
     2. 两个生成元的正规序乘积及其导数
     3. 更复杂的嵌套组合
+
+    pbw_ordered=True 时只枚举规范的 PBW 单项式（见 iter_pbw_operators），
+    每个因子多重集只出现一次，没有 NO(x, y)/NO(y, x) 这样线性相关的成对算符。
     """
 
     def __init__(self, generators: Dict[str, Dict[str, Any]]):
@@ -995,7 +1236,8 @@ class OperatorEnumerator:
         self,
         level: Fraction,
         max_derivative_order: int = 10,
-        use_partition_method: bool = True
+        use_partition_method: bool = True,
+        pbw_ordered: bool = False
     ) -> List[Any]:
         """
         枚举给定 level 的所有算符
@@ -1004,10 +1246,15 @@ class OperatorEnumerator:
             level: 目标 level（共形权重）
             max_derivative_order: 最大导数阶数
             use_partition_method: 是否使用整数分拆方法（推荐，支持任意多生成元）
+            pbw_ordered: 是否只枚举规范的 PBW 单项式（每个多重集一个，
+                         算符数等于 qseries.pbw_character 的系数）
 
         Returns:
             算符列表
         """
+        if pbw_ordered:
+            return list(self.iter_pbw_operators(level, max_derivative_order))
+
         if use_partition_method:
             # 使用整数分拆方法（类似 Mathematica）
             operators = self._enumerate_partition_based(level, max_derivative_order)
@@ -1017,16 +1264,58 @@ class OperatorEnumerator:
             operators.extend(self._enumerate_single_generators(level, max_derivative_order))
             operators.extend(self._enumerate_two_generator_products(level, max_derivative_order))
 
-        # 去重（使用字符串表示）
-        unique_ops = []
-        seen = set()
-        for op in operators:
-            op_str = str(op)
-            if op_str not in seen:
-                seen.add(op_str)
-                unique_ops.append(op)
+        # 去重（算符是驻留的 sympy 对象，直接比较结构，保持原来的顺序）
+        return list(dict.fromkeys(operators))
+
+    def iter_pbw_operators(self, level: Fraction,
+                           max_derivative_order: int = 10) -> Iterator[Any]:
+        """
+        惰性生成给定 level 的规范 PBW 单项式 NO(A1, NO(A2, ..., Ak))
+
+        因子 Ai 是生成元的导数 ∂^n G（n ≤ max_derivative_order），按注册表的算符顺序
+        （与 normal_order 的规范形式相同）排列，同一个费米因子不出现两次。
+        每个因子多重集只生成一次，不需要枚举排列，也不需要去重。
+
+        Args:
+            level: 目标 level（共形权重）
+            max_derivative_order: 最大导数阶数
 
-        return unique_ops
+        Yields:
+            规范的 PBW 单项式
+
+        Raises:
+            ValueError: 如果生成元的权重不为正
+        """
+        from functools import cmp_to_key
+        from .local_operator import get_operator_parity
+        from .registry import ope_registry
+
+        level = Fraction(level)
+        if level <= 0:
+            return
+
+        letters = []
+        for name, gen_info in self.generators.items():
+            base_op = gen_info['op']
+            base_weight = Fraction(gen_info['weight'])
+            if base_weight <= 0:
+                raise ValueError(f"Generator {name} has non-positive weight {base_weight}")
+            parity = gen_info['parity'] if 'parity' in gen_info else get_operator_parity(base_op)
+            order = 0
+            while order <= max_derivative_order and base_weight + order <= level:
+                op = d(base_op, order) if order > 0 else base_op
+                letters.append((base_weight + order, op, parity == 1))
+                order += 1
+
+        letters.sort(key=cmp_to_key(
+            lambda a, b: -ope_registry.compare_operators(a[1], b[1])))
+        unit = _common_unit([weight for weight, _, _ in letters], level)
+        sizes = [int(weight * unit) for weight, _, _ in letters]
+        fermionic = [fermion for _, _, fermion in letters]
+
+        for indices in _iter_monomials(sizes, fermionic, int(level * unit)):
+            factors = tuple(letters[i][1] for i in indices)
+            yield factors[0] if len(factors) == 1 else self._build_nested_no(factors)
 
     def _enumerate_partition_based(
         self,
@@ -1093,28 +1382,39 @@ class OperatorEnumerator:
 
     def _get_unique_permutations(self, partition: List[Fraction]) -> List[List[Fraction]]:
         """
-        生成分拆的所有唯一排列
+        生成分拆的所有唯一排列（多重集排列，按字典序从大到小）
 
         例如：
         - [2, 1] -> [[2, 1], [1, 2]]
         - [1, 1, 1] -> [[1, 1, 1]]  (只有一个唯一排列)
         - [2, 1, 1] -> [[2, 1, 1], [1, 2, 1], [1, 1, 2]]
 
+        每个唯一排列只生成一次（"下一个排列"算法），工作量与唯一排列的
+        数目成正比，而不是 len(partition)!。
+
         Args:
             partition: 整数分拆（降序排列）
 
         Returns:
             所有唯一排列的列表
         """
-        from itertools import permutations
-
-        # 生成所有排列并去重
-        unique_perms = set()
-        for perm in permutations(partition):
-            unique_perms.add(perm)
-
-        # 转换回列表形式
-        return [list(perm) for perm in unique_perms]
+        perm = sorted(partition, reverse=True)
+        result = [list(perm)]
+        n = len(perm)
+        while True:
+            # 从右边找第一个 perm[i] > perm[i + 1] 的位置
+            i = n - 2
+            while i >= 0 and perm[i] <= perm[i + 1]:
+                i -= 1
+            if i < 0:
+                return result
+            # 与右边比 perm[i] 小的最右一个元素交换，再把右边反转
+            j = n - 1
+            while perm[j] >= perm[i]:
+                j -= 1
+            perm[i], perm[j] = perm[j], perm[i]
+            perm[i + 1:] = reversed(perm[i + 1:])
+            result.append(list(perm))
 
     def _build_nested_no(self, operators: tuple) -> Any:
         """
@@ -3,12 +3,18 @@ OPE 数据结构模块
 
 本模块定义了用于存储和管理 OPE（算符积展开）数据的类：
 - OPEData: 存储 OPE 的极点信息
+- LazyOPEData: 按需逐阶计算极点的 OPEData
+
+极点系数在内部以 LinearCombination 存储，pole()/poles 在访问时
+才转换为 sympy 表达式。
 """
 
 from typing import Dict, List, Optional, Union, Callable, Any
 import sympy as sp
 from sympy import sympify, simplify
 
+from .linear_combination import LinearCombination
+
 
 class OPEData:
     """
@@ -22,6 +28,7 @@ class OPEData:
 
     Attributes:
         poles: 字典，键为极点阶数 n，值为对应的系数
+        _poles: 内部字典，键为极点阶数，值为 LinearCombination
     """
 
     def __init__(self, poles: Optional[Dict[int, Any]] = None):
@@ -29,14 +36,27 @@ class OPEData:
         创建 OPEData 实例
 
         Args:
-            poles: 极点字典，键为阶数，值为系数（可以是算符或 sympy 表达式）
+            poles: 极点字典，键为阶数，值为系数（可以是算符、sympy 表达式
+                   或 LinearCombination）
         """
-        if poles is None:
-            self._poles = {}
-        else:
+        self._poles: Dict[int, LinearCombination] = {}
+        if poles is not None:
             # 过滤掉零系数的极点
-            self._poles = {n: coeff for n, coeff in poles.items()
-                          if not self._is_zero(coeff)}
+            for n, coeff in poles.items():
+                lc = LinearCombination.from_expr(coeff)
+                if not lc.is_zero():
+                    self._poles[n] = lc
+
+    @classmethod
+    def _from_terms(cls, poles: Dict[int, LinearCombination]) -> 'OPEData':
+        """
+        直接由 {阶数: LinearCombination} 创建（计算引擎内部使用）
+
+        调用者保证字典归新对象所有；零极点会被丢弃。
+        """
+        obj = cls.__new__(cls)
+        obj._poles = {n: lc for n, lc in poles.items() if not lc.is_zero()}
+        return obj
 
     @staticmethod
     def _is_zero(expr: Any) -> bool:
@@ -84,8 +104,8 @@ class OPEData:
 
     @property
     def poles(self) -> Dict[int, Any]:
-        """返回极点字典的副本"""
-        return self._poles.copy()
+        """返回极点字典的副本（系数为 sympy 表达式）"""
+        return {n: lc.to_expr() for n, lc in self._poles.items()}
 
     @property
     def max_pole(self) -> int:
@@ -109,7 +129,25 @@ class OPEData:
         Returns:
             第 n 阶极点的系数，如果不存在则返回 0
         """
-        return self._poles.get(n, 0)
+        lc = self._poles.get(n)
+        if lc is None:
+            return 0
+        return lc.to_expr()
+
+    def pole_terms(self, n: int) -> LinearCombination:
+        """
+        获取第 n 阶极点的系数（LinearCombination 形式）
+
+        Args:
+            n: 极点阶数
+
+        Returns:
+            LinearCombination，如果不存在则为零组合
+        """
+        lc = self._poles.get(n)
+        if lc is None:
+            return LinearCombination()
+        return lc
 
     def set_pole(self, n: int, coeff: Any):
         """
@@ -119,11 +157,12 @@ class OPEData:
             n: 极点阶数
             coeff: 系数
         """
-        if self._is_zero(coeff):
+        lc = LinearCombination.from_expr(coeff)
+        if lc.is_zero():
             # 如果系数为零，删除该极点
             self._poles.pop(n, None)
         else:
-            self._poles[n] = coeff
+            self._poles[n] = lc
 
     def is_zero(self) -> bool:
         """
@@ -149,18 +188,18 @@ class OPEData:
 
         # 合并极点
         result_poles = self._poles.copy()
-        for n, coeff in other._poles.items():
+        for n, lc in other._poles.items():
             if n in result_poles:
                 # 同阶极点相加
-                new_coeff = result_poles[n] + coeff
-                if self._is_zero(new_coeff):
+                new_lc = result_poles[n] + lc
+                if new_lc.is_zero():
                     del result_poles[n]
                 else:
-                    result_poles[n] = new_coeff
+                    result_poles[n] = new_lc
             else:
-                result_poles[n] = coeff
+                result_poles[n] = lc
 
-        return OPEData(result_poles)
+        return OPEData._from_terms(result_poles)
 
     def __radd__(self, other):
         """
@@ -187,8 +226,8 @@ class OPEData:
         Returns:
             新的 OPEData
         """
-        result_poles = {n: scalar * coeff for n, coeff in self._poles.items()}
-        return OPEData(result_poles)
+        result_poles = {n: lc.scale(scalar) for n, lc in self._poles.items()}
+        return OPEData._from_terms(result_poles)
 
     def __rmul__(self, scalar: Any) -> 'OPEData':
         """
@@ -243,12 +282,7 @@ class OPEData:
         # 比较每个极点的系数
         for n in self._poles.keys():
             if self._poles[n] != other._poles[n]:
-                # 尝试使用 sympy 的 equals 方法
-                if isinstance(self._poles[n], sp.Expr) and isinstance(other._poles[n], sp.Expr):
-                    if not self._poles[n].equals(other._poles[n]):
-                        return False
-                else:
-                    return False
+                return False
 
         return True
 
@@ -263,17 +297,15 @@ class OPEData:
         Returns:
             简化后的新 OPEData
         """
+        result_poles = {}
         if simplify_func is None:
-            # 使用 pyope 的 simplify 而不是 sympy 的
+            # 使用 pyope 的 simplify 而不是 sympy 的，直接作用于内部的线性组合
             from .simplify import simplify as pyope_simplify
-            simplify_func = lambda expr: pyope_simplify(expr, expand_derivatives=expand_derivatives)
-
-        result_poles = {}
-        for n, coeff in self._poles.items():
-            if isinstance(coeff, sp.Expr):
-                result_poles[n] = simplify_func(coeff)
-            else:
-                result_poles[n] = coeff
+            for n, lc in self._poles.items():
+                result_poles[n] = pyope_simplify(lc, expand_derivatives=expand_derivatives)
+        else:
+            for n, lc in self._poles.items():
+                result_poles[n] = simplify_func(lc.to_expr())
 
         return OPEData(result_poles)
 
@@ -282,7 +314,7 @@ class OPEData:
         if self.is_zero():
             return "OPEData({})"
 
-        pole_strs = [f"{n}: {coeff}" for n, coeff in sorted(self._poles.items(), reverse=True)]
+        pole_strs = [f"{n}: {lc}" for n, lc in sorted(self._poles.items(), reverse=True)]
         return f"OPEData({{{', '.join(pole_strs)}}})"
 
     def __str__(self) -> str:
@@ -314,7 +346,7 @@ class OPEData:
 
         terms = []
         for n in sorted(self._poles.keys(), reverse=True):
-            coeff = self._poles[n]
+            coeff = self._poles[n].to_expr()
 
             # 将系数转换为 LaTeX
             from sympy import latex
@@ -332,3 +364,101 @@ class OPEData:
         # 包装在 $ $ 中
         return f"${latex_str}$"
 
+
+
+class LazyOPEData(OPEData):
+    """
+    惰性 OPE 数据类
+
+    只保存 (left, right)，每一阶极点在第一次访问时单独计算并记住。
+    只需要一两阶极点时（例如 Jacobi 恒等式和 null field 检查），
+    不会计算代价最高的高阶极点。
+
+    访问 max_pole、poles 等需要全部极点的属性时，退化为计算完整的 OPE。
+
+    Examples:
+        >>> ope = OPE.lazy(NO(T, NO(T, T)), NO(T, NO(T, T)))
+        >>> ope.pole(1)  # 只计算第 1 阶极点
+    """
+
+    def __init__(self, left: Any, right: Any):
+        """
+        创建惰性 OPEData
+
+        Args:
+            left: 左侧算符
+            right: 右侧算符
+        """
+        from .api import get_ope_method
+        from .domains import get_coefficient_domain
+
+        self.left = left
+        self.right = right
+        # 创建时的计算方式和系数域，之后按需计算的极点都使用它们
+        self.method = get_ope_method()
+        self.domain = get_coefficient_domain()
+        self._pole_cache: Dict[int, LinearCombination] = {}
+        self._full: Optional[Dict[int, LinearCombination]] = None
+
+    @property
+    def _poles(self) -> Dict[int, LinearCombination]:
+        """全部极点（第一次访问时计算完整的 OPE）"""
+        if self._full is None:
+            from .api import _compute_ope, _to_sympy, ope_method
+            from .domains import coefficient_domain
+            with ope_method(self.method), coefficient_domain(self.domain):
+                self._full = dict(_to_sympy(_compute_ope(self.left, self.right))._poles)
+            self._pole_cache.clear()
+        return self._full
+
+    @_poles.setter
+    def _poles(self, poles: Dict[int, LinearCombination]) -> None:
+        self._full = poles
+
+    @property
+    def is_evaluated(self) -> bool:
+        """是否已经计算了完整的 OPE"""
+        return self._full is not None
+
+    def pole_terms(self, n: int) -> LinearCombination:
+        """
+        获取第 n 阶极点的系数（LinearCombination 形式），按需计算
+
+        Args:
+            n: 极点阶数
+
+        Returns:
+            LinearCombination，如果不存在则为零组合
+        """
+        if self._full is not None or n < 1:
+            return super().pole_terms(n)
+
+        lc = self._pole_cache.get(n)
+        if lc is None:
+            from .api import _compute_pole, _to_sympy, ope_method
+            from .domains import coefficient_domain
+            with ope_method(self.method), coefficient_domain(self.domain):
+                lc = _to_sympy(_compute_pole(self.left, self.right, n))
+            self._pole_cache[n] = lc
+        return lc
+
+    def pole(self, n: int) -> Any:
+        """
+        获取第 n 阶极点的系数，按需计算
+
+        Args:
+            n: 极点阶数
+
+        Returns:
+            第 n 阶极点的系数，如果不存在则返回 0
+        """
+        lc = self.pole_terms(n)
+        if not lc:
+            return 0
+        return lc.to_expr()
+
+    def __repr__(self) -> str:
+        """字符串表示"""
+        if self._full is None:
+            return f"LazyOPEData({self.left}, {self.right})"
+        return super().__repr__()
@@ -6,26 +6,96 @@
 - BasisOperator: 基本算符（用户定义的基础局域算符）
 - DerivativeOperator: 导数算符
 - NormalOrderedOperator: 正规序算符
+
+算符节点采用 hash-consing（驻留）：结构相同的节点在全局驻留表中只存在
+一个实例，因此相等性判断退化为身份比较。驻留键与 __eq__ 使用相同的字段
+（基本算符为 base_name、统计性和索引），共形权重等附加信息不参与区分：
+重新声明时给出的共形权重更新已有的节点。每个节点在创建时缓存其哈希值、
+parity、深度和大小，复合节点的共形权重在首次访问时缓存（共形权重改变后
+重新计算），避免对子树的重复遍历。
 """
 
+import weakref
 from typing import Optional, Tuple, Any
 import sympy as sp
 from sympy.core.symbol import Symbol
 
 
+# 全局驻留表：结构键 -> 算符节点
+# 使用弱引用，不再被引用的节点可以被回收
+_intern_table: "weakref.WeakValueDictionary[Tuple, Operator]" = weakref.WeakValueDictionary()
+
+
+# 基本算符的共形权重每次改变时加一，复合节点据此重新计算缓存的共形权重
+_weight_epoch = 0
+
+
+def intern_table_size() -> int:
+    """返回驻留表中当前存活的节点数量"""
+    return len(_intern_table)
+
+
 class Operator(Symbol):
     """
     算符基类
 
     继承自 sympy.Symbol 以便与 sympy 的符号计算系统集成。
     所有算符都具有 parity（奇偶性）属性。
+
+    子类通过 _intern 创建节点：结构相同的节点只创建一次。
     """
 
+    # 节点元数据的默认值（子类在创建时覆盖）
+    _depth = 0
+    _size = 1
+
     def __new__(cls, name: str, **assumptions):
         """创建新的算符实例"""
-        obj = Symbol.__new__(cls, name, **assumptions)
+        # 绕过 sympy 的 Symbol 缓存：该缓存只按名称区分，
+        # 会把 parity 不同的同名算符合并为同一个对象
+        cls._sanitize(assumptions, cls)
+        obj = Symbol.__xnew__(cls, name, **assumptions)
         return obj
 
+    @classmethod
+    def _intern(cls, key: Tuple, name: str, **assumptions):
+        """
+        查询或创建驻留节点
+
+        Args:
+            key: 节点的结构键
+            name: 节点名称（仅在首次创建时构造）
+
+        Returns:
+            (obj, created) 元组，created 表示是否为新建节点
+        """
+        obj = _intern_table.get(key)
+        if obj is not None:
+            return obj, False
+        obj = Operator.__new__(cls, name, **assumptions)
+        _intern_table[key] = obj
+        return obj, True
+
+    @property
+    def cache_key(self) -> "Operator":
+        """
+        结构化的缓存键
+
+        驻留节点本身就是键：哈希值在创建时已计算，相等性比较
+        在命中时由 is 判断完成，两者都是 O(1)。
+        """
+        return self
+
+    @property
+    def depth(self) -> int:
+        """节点树的高度（基本算符为 0）"""
+        return self._depth
+
+    @property
+    def size(self) -> int:
+        """节点树中的节点总数"""
+        return self._size
+
     @property
     def parity(self) -> int:
         """
@@ -66,14 +136,35 @@ class BasisOperator(Operator):
             indices: 索引元组（用于索引算符）
             base_name: 基础名称（用于索引算符保持原始名称）
         """
-        obj = Operator.__new__(cls, name, **assumptions)
-        obj._bosonic = bosonic
-        obj._indexed = indexed
-        obj._conformal_weight = conformal_weight
-        obj._indices = indices if indices is not None else ()
-        obj._base_name = base_name if base_name is not None else name
+        global _weight_epoch
+
+        indices = indices if indices is not None else ()
+        base_name = base_name if base_name is not None else name
+        # 与 __eq__ 相同的字段：相等的算符总是同一个节点
+        key = ('basis', base_name, bool(bosonic), indices)
+        obj, created = cls._intern(key, name, **assumptions)
+        if created:
+            obj._bosonic = bosonic
+            obj._indexed = indexed
+            obj._conformal_weight = conformal_weight
+            obj._indices = indices
+            obj._base_name = base_name
+            obj._parity = 0 if bosonic else 1
+            obj._hash = hash((base_name, bosonic, indices))
+        else:
+            # 重新声明：给出的附加信息更新已有的节点
+            obj._indexed = obj._indexed or indexed
+            if conformal_weight is not None and conformal_weight != obj._conformal_weight:
+                obj._conformal_weight = conformal_weight
+                _weight_epoch += 1
         return obj
 
+    def __reduce_ex__(self, protocol):
+        """序列化：反序列化时重新经过驻留表"""
+        return (_rebuild_basis, (self.name, self._bosonic, self._indexed,
+                                 self._conformal_weight, self._indices,
+                                 self._base_name))
+
     @property
     def is_bosonic(self) -> bool:
         """是否为玻色算符"""
@@ -93,7 +184,7 @@ class BasisOperator(Operator):
             0 表示玻色子
             1 表示费米子
         """
-        return 0 if self._bosonic else 1
+        return self._parity
 
     @property
     def base_name(self) -> str:
@@ -140,15 +231,19 @@ class BasisOperator(Operator):
 
     def __eq__(self, other):
         """相等性比较"""
+        if self is other:
+            return True
         if not isinstance(other, BasisOperator):
             return False
-        return (self._base_name == other._base_name and
+        # 相等的算符总是同一个驻留节点，这里只排除哈希碰撞
+        return (self._hash == other._hash and
+                self._base_name == other._base_name and
                 self._bosonic == other._bosonic and
                 self._indices == other._indices)
 
     def __hash__(self):
-        """哈希值"""
-        return hash((self._base_name, self._bosonic, self._indices))
+        """哈希值（创建时缓存）"""
+        return self._hash
 
     def __repr__(self):
         """字符串表示"""
@@ -177,17 +272,34 @@ class DerivativeOperator(Operator):
             base: 被求导的算符
             order: 导数阶数（默认为 1）
         """
-        # 生成导数算符的名称
+        # 子节点已驻留（相等即同一个节点），按身份组成键
+        # （节点存活期间子节点也存活，id 不会被复用）
+        key = ('deriv', id(base), order)
+        obj = _intern_table.get(key)
+        if obj is not None:
+            return obj
+
+        # 生成导数算符的名称（每个驻留节点只构造一次）
         if order == 1:
             name = f"∂{base.name}"
         else:
             name = f"∂^{order}{base.name}"
 
-        obj = Operator.__new__(cls, name, **assumptions)
-        obj._base = base
-        obj._order = order
+        obj, created = cls._intern(key, name, **assumptions)
+        if created:
+            obj._base = base
+            obj._order = order
+            obj._parity = base.parity
+            obj._weight_epoch = None
+            obj._depth = getattr(base, '_depth', 0) + 1
+            obj._size = getattr(base, '_size', 1) + 1
+            obj._hash = hash((base, order))
         return obj
 
+    def __reduce_ex__(self, protocol):
+        """序列化：反序列化时重新经过驻留表"""
+        return (DerivativeOperator, (self._base, self._order))
+
     @property
     def base(self) -> Operator:
         """被求导的基础算符"""
@@ -203,7 +315,7 @@ class DerivativeOperator(Operator):
         """
         导数算符的 parity 与基础算符相同
         """
-        return self._base.parity
+        return self._parity
 
     @property
     def conformal_weight(self) -> Optional[float]:
@@ -214,22 +326,24 @@ class DerivativeOperator(Operator):
 
         如果基础算符的共形权重未定义，则返回 None
         """
-        base_weight = getattr(self._base, 'conformal_weight', None)
-
-        if base_weight is None:
-            return None
-
-        return base_weight + self._order
+        if self._weight_epoch != _weight_epoch:
+            base_weight = getattr(self._base, 'conformal_weight', None)
+            self._conformal_weight = None if base_weight is None else base_weight + self._order
+            self._weight_epoch = _weight_epoch
+        return self._conformal_weight
 
     def __eq__(self, other):
         """相等性比较"""
+        if self is other:
+            return True
         if not isinstance(other, DerivativeOperator):
             return False
-        return self._base == other._base and self._order == other._order
+        return (self._hash == other._hash and self._order == other._order and
+                self._base == other._base)
 
     def __hash__(self):
-        """哈希值"""
-        return hash((self._base, self._order))
+        """哈希值（创建时缓存）"""
+        return self._hash
 
     def __repr__(self):
         """字符串表示"""
@@ -276,15 +390,32 @@ class NormalOrderedOperator(Operator):
             left: 左侧算符
             right: 右侧算符
         """
-        # 生成正规序算符的名称
+        # 子节点已驻留（相等即同一个节点），按身份组成键
+        # （节点存活期间子节点也存活，id 不会被复用）
+        key = ('no', id(left), id(right))
+        obj = _intern_table.get(key)
+        if obj is not None:
+            return obj
+
+        # 生成正规序算符的名称（每个驻留节点只构造一次）
         name = f"NO({left.name},{right.name})"
 
-        obj = Operator.__new__(cls, name, **assumptions)
-        obj._left = left
-        obj._right = right
-        obj._factors = (left, right)
+        obj, created = cls._intern(key, name, **assumptions)
+        if created:
+            obj._left = left
+            obj._right = right
+            obj._factors = (left, right)
+            obj._parity = (left.parity + right.parity) % 2
+            obj._weight_epoch = None
+            obj._depth = max(getattr(left, '_depth', 0), getattr(right, '_depth', 0)) + 1
+            obj._size = getattr(left, '_size', 1) + getattr(right, '_size', 1) + 1
+            obj._hash = hash((left, right))
         return obj
 
+    def __reduce_ex__(self, protocol):
+        """序列化：反序列化时重新经过驻留表"""
+        return (NormalOrderedOperator, (self._left, self._right))
+
     @property
     def left(self) -> Operator:
         """左侧算符"""
@@ -305,7 +436,7 @@ class NormalOrderedOperator(Operator):
         """
         正规序算符的 parity 是两个算符 parity 之和模 2
         """
-        return (self._left.parity + self._right.parity) % 2
+        return self._parity
 
     @property
     def conformal_weight(self) -> Optional[float]:
@@ -314,23 +445,28 @@ class NormalOrderedOperator(Operator):
 
         如果任一算符的共形权重未定义，则返回 None
         """
-        left_weight = getattr(self._left, 'conformal_weight', None)
-        right_weight = getattr(self._right, 'conformal_weight', None)
-
-        if left_weight is None or right_weight is None:
-            return None
-
-        return left_weight + right_weight
+        if self._weight_epoch != _weight_epoch:
+            left_weight = getattr(self._left, 'conformal_weight', None)
+            right_weight = getattr(self._right, 'conformal_weight', None)
+            if left_weight is None or right_weight is None:
+                self._conformal_weight = None
+            else:
+                self._conformal_weight = left_weight + right_weight
+            self._weight_epoch = _weight_epoch
+        return self._conformal_weight
 
     def __eq__(self, other):
         """相等性比较"""
+        if self is other:
+            return True
         if not isinstance(other, NormalOrderedOperator):
             return False
-        return self._left == other._left and self._right == other._right
+        return (self._hash == other._hash and self._left == other._left and
+                self._right == other._right)
 
     def __hash__(self):
-        """哈希值"""
-        return hash((self._left, self._right))
+        """哈希值（创建时缓存）"""
+        return self._hash
 
     def __repr__(self):
         """字符串表示"""
@@ -356,6 +492,13 @@ class NormalOrderedOperator(Operator):
 
 
 
+def _rebuild_basis(name, bosonic, indexed, conformal_weight, indices, base_name):
+    """反序列化 BasisOperator（经过驻留表）"""
+    return BasisOperator(name, bosonic=bosonic, indexed=indexed,
+                         conformal_weight=conformal_weight, indices=indices,
+                         base_name=base_name)
+
+
 # 辅助函数
 
 def d(operator, order: int = 1):
@@ -382,8 +525,13 @@ def d(operator, order: int = 1):
         >>> d(2 * T)  # 2 * d(T)
         >>> d(T + W)  # d(T) + d(W)
     """
-    # 导入常数算符（避免循环导入）
+    # 导入常数算符和线性组合（避免循环导入）
     from .constants import One, Zero, ConstantOperator
+    from .linear_combination import LinearCombination
+
+    # 线性组合：逐项求导
+    if isinstance(operator, LinearCombination):
+        return operator.derivative(order)
 
     # 如果是常数算符，导数为 0
     if operator == One or operator == Zero or isinstance(operator, ConstantOperator):
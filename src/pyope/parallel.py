@@ -0,0 +1,366 @@
+"""
+并行计算模块
+
+本模块提供可选的多进程并行模式：复合规则中相互独立的子 OPE
+（例如 _ope_composite_right 中的 OPE({AB}_q, C)、_ope_composite_left 中的
+OPE(B, {AC}_q)，以及 Jacobi 恒等式检查中的各个表）会被分发到
+concurrent.futures 进程池中计算。
+
+- ParallelEngine: 进程池及其调度逻辑
+- enable_parallel / disable_parallel: 开启或关闭并行模式
+- parallel_opes: 在 with 语句内开启并行模式
+- compute_opes: 批量计算一组 OPE（并行模式下分发到进程池）
+
+ParallelEngine.run 还可以把其他相互独立的任务（如 null_states 中各量子数扇区的
+计算、各算符的展开）分发到同一个进程池。
+
+注册表在每个工作进程启动时只发送一次；注册表改变后进程池会自动重建。
+工作进程计算时写入的缓存条目会合并回主进程的缓存。
+
+Examples:
+    >>> with parallel_opes(max_workers=8):
+    ...     result = OPE(NO(T, NO(T, T)), NO(W, W))
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from .cache import get_ope_cache, make_ope_cache_key
+
+
+class _Batch:
+    """
+    一组相互独立的子 OPE 请求
+
+    规则生成器 yield 一个 _Batch 时，求值引擎可以一次性返回所有结果
+    （并行模式），也可以返回 None，此时规则逐个 yield 这些请求。
+    """
+
+    __slots__ = ('pairs',)
+
+    def __init__(self, pairs: Sequence[Tuple[Any, Any]]):
+        self.pairs = pairs
+
+
+# 当前启用的并行引擎（None 表示串行）
+_engine: Optional['ParallelEngine'] = None
+
+
+def get_parallel_engine() -> Optional['ParallelEngine']:
+    """返回当前启用的并行引擎，串行模式下返回 None"""
+    return _engine
+
+
+class ParallelEngine:
+    """
+    OPE 并行计算引擎
+
+    维护一个进程池。注册表内容通过进程池的 initializer 在每个工作进程
+    启动时发送一次；主进程的注册表版本号改变后，进程池会在下一次使用时重建。
+
+    Attributes:
+        max_workers: 工作进程数
+        min_batch: 至少有这么多个未缓存的子 OPE 时才分发到进程池
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, min_batch: int = 2,
+                 registry: Any = None):
+        """
+        创建并行引擎（进程池在第一次使用时才启动）
+
+        Args:
+            max_workers: 工作进程数（默认为 CPU 核数）
+            min_batch: 分发到进程池的最小批量
+            registry: 注册表（默认为全局注册表）
+        """
+        if registry is None:
+            from .registry import ope_registry
+            registry = ope_registry
+
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_batch = min_batch
+        self.registry = registry
+        self._pool = None
+        self._pool_version = None
+        self.tasks = 0
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        """返回与当前注册表一致的进程池"""
+        version = self.registry.version
+        if self._pool is None or self._pool_version != version:
+            self.shutdown()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.registry.export_state(),),
+            )
+            self._pool_version = version
+        return self._pool
+
+    def map(self, pairs: Sequence[Tuple[Any, Any]]) -> List[Tuple[Any, frozenset]]:
+        """
+        在进程池中计算一组 OPE
+
+        工作进程写入的缓存条目会合并到主进程的缓存中。
+
+        Args:
+            pairs: (left, right) 列表
+
+        Returns:
+            (OPEData, deps) 列表，与 pairs 顺序一致
+        """
+        from .api import get_ope_method
+        from .domains import get_coefficient_domain
+
+        pool = self._ensure_pool()
+        method = get_ope_method()
+        domain = get_coefficient_domain()
+        futures = [pool.submit(_worker_compute, left, right, method, domain)
+                   for left, right in pairs]
+        self.tasks += len(futures)
+
+        cache = get_ope_cache()
+        results = []
+        for future in futures:
+            result, deps, journal = future.result()
+            cache.merge(journal)
+            results.append((result, deps))
+        return results
+
+    def run(self, function: Callable, tasks: Sequence[Tuple]) -> List[Any]:
+        """
+        在进程池中执行一组相互独立的任务
+
+        任务按给出的顺序提交（调用者可以把耗时的任务排在前面），
+        结果按相同的顺序返回，与完成的先后无关。工作进程写入的缓存条目
+        会合并到主进程的缓存中。
+
+        Args:
+            function: 模块级函数或可 pickle 的绑定方法
+            tasks: 参数元组列表，每个元组调用一次 function(*args)
+
+        Returns:
+            结果列表，与 tasks 顺序一致
+        """
+        from .api import get_ope_method
+        from .domains import get_coefficient_domain
+
+        pool = self._ensure_pool()
+        method = get_ope_method()
+        domain = get_coefficient_domain()
+        futures = [pool.submit(_worker_call, function, args, method, domain)
+                   for args in tasks]
+        self.tasks += len(futures)
+
+        cache = get_ope_cache()
+        results = []
+        for future in futures:
+            result, journal = future.result()
+            cache.merge(journal)
+            results.append(result)
+        return results
+
+    def resolve(self, pairs: Sequence[Tuple[Any, Any]], cache: Any,
+                memo: Optional[dict] = None, in_progress: Iterable = ()) -> Optional[List[Any]]:
+        """
+        解析一组子 OPE 请求（求值引擎使用）
+
+        已缓存的结果直接使用，其余的去重后分发到进程池。如果未缓存的
+        请求少于 min_batch，或者其中有正在计算的请求，返回 None，
+        由调用者串行计算。
+
+        Args:
+            pairs: (left, right) 列表（参数已规范化）
+            cache: OPE 缓存
+            memo: 求值引擎的局部记忆表 {key: (result, deps)}
+            in_progress: 正在计算的键
+
+        Returns:
+            OPEData 列表，或 None
+        """
+        keys = [make_ope_cache_key(left, right) for left, right in pairs]
+        found = {}
+        missing = {}
+        for key, (left, right) in zip(keys, pairs):
+            if key in found or key in missing:
+                continue
+            if memo is not None and key in memo:
+                result, deps = memo[key]
+                cache.record_dependencies(deps)
+                found[key] = result
+                continue
+            result = cache.get(left, right)
+            if result is not None:
+                found[key] = result
+            elif key in in_progress:
+                return None
+            else:
+                missing[key] = (left, right)
+
+        if len(missing) < self.min_batch:
+            return None
+
+        for key, entry in zip(missing, self.map(list(missing.values()))):
+            if memo is not None:
+                memo[key] = entry
+            cache.record_dependencies(entry[1])
+            found[key] = entry[0]
+
+        return [found[key] for key in keys]
+
+    def shutdown(self) -> None:
+        """关闭进程池"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            self._pool_version = None
+
+    def __repr__(self) -> str:
+        return f"ParallelEngine(max_workers={self.max_workers}, min_batch={self.min_batch})"
+
+
+def _init_worker(registry_state: dict) -> None:
+    """工作进程的初始化函数：载入注册表并重置缓存状态"""
+    global _engine
+    # 工作进程内部总是串行计算
+    _engine = None
+
+    from .registry import ope_registry
+    ope_registry.load_state(registry_state)
+
+    cache = get_ope_cache()
+    cache.reset_tracking()
+    # fork 继承的持久化存储连接不能在子进程中使用
+    cache.attach_store(None)
+    cache.enable()
+
+
+def _worker_compute(left: Any, right: Any, method: str,
+                    domain: Any) -> Tuple[Any, frozenset, list]:
+    """
+    工作进程中计算一个 OPE
+
+    Args:
+        left: 左侧算符
+        right: 右侧算符
+        method: 计算方式（与主进程一致）
+        domain: 系数域（与主进程一致）
+
+    Returns:
+        (OPEData, deps, journal) 元组，journal 是这次计算写入的缓存条目
+    """
+    from .api import _compute_ope, set_ope_method
+    from .domains import set_coefficient_domain
+
+    set_ope_method(method)
+    set_coefficient_domain(domain)
+    cache = get_ope_cache()
+    cache.start_journal()
+    cache.begin_tracking()
+    try:
+        result = _compute_ope(left, right)
+    finally:
+        deps = cache.end_tracking()
+        journal = cache.stop_journal()
+    return result, deps, journal
+
+
+def _worker_call(function: Callable, args: Tuple, method: str,
+                 domain: Any) -> Tuple[Any, list]:
+    """
+    工作进程中执行一个任务（ParallelEngine.run 使用）
+
+    Args:
+        function: 要调用的函数
+        args: 参数元组
+        method: 计算方式（与主进程一致）
+        domain: 系数域（与主进程一致）
+
+    Returns:
+        (结果, journal) 元组，journal 是这次计算写入的缓存条目
+    """
+    from .api import set_ope_method
+    from .domains import set_coefficient_domain
+
+    set_ope_method(method)
+    set_coefficient_domain(domain)
+    cache = get_ope_cache()
+    cache.start_journal()
+    try:
+        result = function(*args)
+    finally:
+        journal = cache.stop_journal()
+    return result, journal
+
+
+def enable_parallel(max_workers: Optional[int] = None, min_batch: int = 2) -> ParallelEngine:
+    """
+    开启并行模式
+
+    Args:
+        max_workers: 工作进程数（默认为 CPU 核数）
+        min_batch: 分发到进程池的最小批量
+
+    Returns:
+        ParallelEngine 实例
+    """
+    global _engine
+    disable_parallel()
+    _engine = ParallelEngine(max_workers=max_workers, min_batch=min_batch)
+    return _engine
+
+
+def disable_parallel() -> None:
+    """关闭并行模式并关闭进程池"""
+    global _engine
+    if _engine is not None:
+        _engine.shutdown()
+        _engine = None
+
+
+@contextmanager
+def parallel_opes(max_workers: Optional[int] = None, min_batch: int = 2):
+    """
+    在 with 语句内开启并行模式
+
+    Args:
+        max_workers: 工作进程数（默认为 CPU 核数）
+        min_batch: 分发到进程池的最小批量
+
+    Yields:
+        ParallelEngine 实例
+    """
+    global _engine
+    previous = _engine
+    _engine = ParallelEngine(max_workers=max_workers, min_batch=min_batch)
+    try:
+        yield _engine
+    finally:
+        _engine.shutdown()
+        _engine = previous
+
+
+def compute_opes(pairs: Sequence[Tuple[Any, Any]]) -> List[Any]:
+    """
+    批量计算一组 OPE
+
+    并行模式下，未缓存的 OPE 分发到进程池；否则依次计算。
+
+    Args:
+        pairs: (left, right) 列表
+
+    Returns:
+        OPEData 列表，与 pairs 顺序一致
+    """
+    from .api import _as_ope_argument, _compute_ope, _to_sympy
+
+    pairs = [(_as_ope_argument(left), _as_ope_argument(right)) for left, right in pairs]
+    engine = _engine
+    results = None
+    if engine is not None:
+        results = engine.resolve(pairs, get_ope_cache(), memo={})
+    if results is None:
+        results = [_compute_ope(left, right) for left, right in pairs]
+    return [_to_sympy(result) for result in results]
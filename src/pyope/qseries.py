@@ -0,0 +1,323 @@
+"""
+q 级数（生成函数）模块
+
+不构造任何算符，直接由生成函数得到每个 level（以及每个荷扇区）的态数：
+
+- Fock 特征：自由场及其导数中权重为正的因子生成的 Fock 空间，
+  Π_玻色因子 1/(1 - x^Q q^w) Π_费米因子 (1 + x^Q q^w)，
+  与 null_states.FockSpaceBasis 枚举的基一一对应
+- PBW 特征：强生成元 G 及其导数 ∂^k G 的 PBW 单项式，公式相同；
+  没有 null states 时就是真空模的特征，与实际态数之差即 null states 数
+
+级数截断到给定的 level，系数是 NumPy int64 数组，乘法用 numpy.convolve。
+按荷（如量子数 (m, r)）分级时，每个荷对应一个数组，乘法时荷相加。
+
+Examples:
+    >>> J = BasisOperator("J", bosonic=True, conformal_weight=1)
+    >>> fock_character([J], 4).coefficients()
+    {Fraction(0, 1): 1, Fraction(1, 1): 1, Fraction(2, 1): 2, Fraction(3, 1): 3, Fraction(4, 1): 5}
+"""
+
+from fractions import Fraction
+from math import floor, gcd
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+# int64 系数的上限（超过时报错，而不是静默溢出）
+_INT64_LIMIT = 2 ** 63 - 1
+
+
+class QSeries:
+    """
+    截断到 max_level 的 q 级数（可按荷分级）
+
+    q 的指数是 unit 分之一的整数倍（半整数权重时 unit = 2），
+    terms[荷] 是长度为 max_level * unit + 1 的 int64 数组。
+    不分级的级数只有一个荷 ()。
+    """
+
+    def __init__(self, max_level: Any, unit: int = 1,
+                 terms: Optional[Dict[Tuple, np.ndarray]] = None):
+        """
+        Args:
+            max_level: 截断的 level
+            unit: q 指数的分母
+            terms: {荷: 系数数组}
+        """
+        self.max_level = Fraction(max_level)
+        self.unit = int(unit)
+        if (self.max_level * self.unit).denominator != 1:
+            raise ValueError(f"max_level {max_level} is not a multiple of 1/{unit}")
+        self.length = int(self.max_level * self.unit) + 1
+        self.terms: Dict[Tuple, np.ndarray] = dict(terms) if terms else {}
+
+    @classmethod
+    def one(cls, max_level: Any, unit: int = 1, charge: Tuple = ()) -> 'QSeries':
+        """常数级数 1（荷为 charge）"""
+        result = cls(max_level, unit)
+        array = np.zeros(result.length, dtype=np.int64)
+        array[0] = 1
+        result.terms[charge] = array
+        return result
+
+    def _check_compatible(self, other: 'QSeries') -> None:
+        if self.max_level != other.max_level or self.unit != other.unit:
+            raise ValueError("QSeries with different truncation or unit")
+
+    def __mul__(self, other: 'QSeries') -> 'QSeries':
+        self._check_compatible(other)
+        result = QSeries(self.max_level, self.unit)
+        others = [(charge_b, b, np.flatnonzero(b)) for charge_b, b in other.terms.items()]
+        for charge_a, a in self.terms.items():
+            bound_a = int(np.abs(a).max(initial=0))
+            if bound_a == 0:
+                continue
+            for charge_b, b, nonzero in others:
+                if bound_a * int(np.abs(b).sum()) > _INT64_LIMIT:
+                    raise OverflowError("q-series coefficients exceed int64")
+                if nonzero.size == 1:
+                    # 单项式（如一个因子的各项）只需平移
+                    shift = int(nonzero[0])
+                    product = np.zeros(self.length, dtype=np.int64)
+                    product[shift:] = a[:self.length - shift] * b[shift]
+                else:
+                    product = np.convolve(a, b)[:self.length]
+                charge = tuple(x + y for x, y in zip(charge_a, charge_b)) \
+                    if charge_a else charge_b
+                existing = result.terms.get(charge)
+                result.terms[charge] = product if existing is None else existing + product
+        return result
+
+    def _combine(self, other: 'QSeries', sign: int) -> 'QSeries':
+        self._check_compatible(other)
+        result = QSeries(self.max_level, self.unit,
+                         {charge: array.copy() for charge, array in self.terms.items()})
+        for charge, array in other.terms.items():
+            existing = result.terms.get(charge)
+            result.terms[charge] = sign * array if existing is None else existing + sign * array
+        return result
+
+    def __add__(self, other: 'QSeries') -> 'QSeries':
+        return self._combine(other, 1)
+
+    def __sub__(self, other: 'QSeries') -> 'QSeries':
+        return self._combine(other, -1)
+
+    def _index(self, level: Any) -> int:
+        index = Fraction(level) * self.unit
+        if index.denominator != 1 or not 0 <= index < self.length:
+            raise ValueError(f"Level {level} is not in the series")
+        return int(index)
+
+    def coefficient(self, level: Any, charge: Optional[Tuple] = None) -> int:
+        """
+        q^level 的系数
+
+        Args:
+            level: level
+            charge: 荷（默认为所有荷的和）
+
+        Returns:
+            态数
+        """
+        index = self._index(level)
+        if charge is not None:
+            array = self.terms.get(tuple(charge))
+            return 0 if array is None else int(array[index])
+        return sum(int(array[index]) for array in self.terms.values())
+
+    def coefficients(self, charge: Optional[Tuple] = None) -> Dict[Fraction, int]:
+        """
+        所有非零系数 {level: 态数}
+
+        Args:
+            charge: 荷（默认为所有荷的和）
+        """
+        total = self.ungraded().terms.get((), np.zeros(self.length, dtype=np.int64)) \
+            if charge is None else self.terms.get(tuple(charge), np.zeros(self.length, dtype=np.int64))
+        return {Fraction(n, self.unit): int(value) for n, value in enumerate(total) if value}
+
+    def sectors(self, level: Any) -> Dict[Tuple, int]:
+        """
+        level 上各个荷扇区的态数 {荷: 态数}（只含非零的扇区）
+        """
+        index = self._index(level)
+        return {charge: int(array[index]) for charge, array in self.terms.items()
+                if array[index]}
+
+    def ungraded(self) -> 'QSeries':
+        """忽略荷的级数"""
+        total = np.zeros(self.length, dtype=np.int64)
+        for array in self.terms.values():
+            total = total + array
+        return QSeries(self.max_level, self.unit, {(): total})
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, QSeries):
+            return NotImplemented
+        if self.max_level != other.max_level or self.unit != other.unit:
+            return False
+        charges = set(self.terms) | set(other.terms)
+        zero = np.zeros(self.length, dtype=np.int64)
+        return all(np.array_equal(self.terms.get(charge, zero), other.terms.get(charge, zero))
+                   for charge in charges)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        terms = []
+        for level, value in self.coefficients().items():
+            if level == 0:
+                power = ""
+            elif level == 1:
+                power = "q"
+            else:
+                power = f"q^{level}" if level.denominator == 1 else f"q^({level})"
+            terms.append(f"{value}{'*' if power else ''}{power}" if value != 1 or not power
+                         else power)
+        order = self.max_level + Fraction(1, self.unit)
+        order = order if order.denominator == 1 else f"({order})"
+        return " + ".join(terms or ["0"]) + f" + O(q^{order})"
+
+
+def _letter_factor(weight: Fraction, charge: Tuple, fermionic: bool,
+                   max_level: Fraction, unit: int) -> QSeries:
+    """
+    一个因子的生成函数
+
+    玻色因子 1/(1 - x^Q q^w) = Σ_n x^{nQ} q^{nw}，费米因子 1 + x^Q q^w。
+    """
+    result = QSeries.one(max_level, unit, tuple(0 for _ in charge))
+    step = int(weight * unit)
+    count = 1 if fermionic else (result.length - 1) // step
+    for n in range(1, count + 1):
+        if n * step >= result.length:
+            break
+        key = tuple(n * x for x in charge)
+        array = result.terms.get(key)
+        if array is None:
+            array = result.terms[key] = np.zeros(result.length, dtype=np.int64)
+        array[n * step] += 1
+    return result
+
+
+def _unit_for(weights: Iterable[Fraction], max_level: Fraction) -> int:
+    """所有权重和 max_level 的公分母"""
+    unit = max_level.denominator
+    for weight in weights:
+        unit = unit * weight.denominator // gcd(unit, weight.denominator)
+    return unit
+
+
+def _charge_of(operator: Any, charges: Optional[Mapping], key: Any = None) -> Tuple:
+    """算符的荷（元组）；未分级时为 ()"""
+    if charges is None:
+        return ()
+    if key is not None and key in charges:
+        value = charges[key]
+    elif operator in charges:
+        value = charges[operator]
+    else:
+        raise ValueError(f"No charge given for {key if key is not None else operator}")
+    if isinstance(value, (tuple, list)):
+        return tuple(Fraction(x) for x in value)
+    return (Fraction(value),)
+
+
+def _character(letters: List[Tuple[Fraction, Tuple, bool]], max_level: Any) -> QSeries:
+    """
+    因子 [(权重, 荷, 是否费米)] 生成的 PBW 单项式的特征
+
+    权重大于 max_level 的因子不影响结果，调用者可以不提供。
+    """
+    max_level = Fraction(max_level)
+    unit = _unit_for([weight for weight, _, _ in letters], max_level)
+    n_charges = len(letters[0][1]) if letters else 0
+    result = QSeries.one(max_level, unit, tuple(0 for _ in range(n_charges)))
+    for weight, charge, fermionic in letters:
+        if weight <= 0:
+            raise ValueError(f"Factor weight {weight} is not positive")
+        if weight <= max_level:
+            result = result * _letter_factor(weight, charge, fermionic, max_level, unit)
+    return result
+
+
+def fock_character(free_fields: List[Any], max_level: Any,
+                   charges: Optional[Mapping[Any, Any]] = None) -> QSeries:
+    """
+    自由场 Fock 空间的特征（截断到 max_level）
+
+    每个自由场 φ 贡献权重为正的因子 ∂^k φ（与 FockSpaceBasis 相同，
+    权重非正的因子如 c、∂c 不计入），导数的荷与 φ 相同。
+
+    Args:
+        free_fields: 自由场列表（需要 conformal_weight）
+        max_level: 截断的 level
+        charges: 可选的荷 {自由场: 荷}（如量子数映射 {φ: (m, r)}）
+
+    Returns:
+        QSeries；coefficient(level, charge) 即该扇区 Fock 基的大小
+
+    Raises:
+        ValueError: 如果自由场没有共形权重，或缺少荷
+    """
+    max_level = Fraction(max_level)
+    letters = []
+    for field in free_fields:
+        if field.conformal_weight is None:
+            raise ValueError(f"Free field {field} has no conformal weight")
+        base_weight = Fraction(field.conformal_weight)
+        charge = _charge_of(field, charges)
+        order = max(0, floor(-base_weight) + 1)
+        while base_weight + order <= max_level:
+            letters.append((base_weight + order, charge, field.parity == 1))
+            order += 1
+    return _character(letters, max_level)
+
+
+def pbw_character(generators: Any, max_level: Any,
+                  charges: Optional[Mapping[Any, Any]] = None) -> QSeries:
+    """
+    强生成元的 PBW 特征（截断到 max_level）
+
+    每个生成元 G 贡献因子 ∂^k G（k ≥ 0），结果是生成元的规范 PBW 单项式
+    按 level 的数目，即没有 null states 时真空模的特征。
+
+    Args:
+        generators: 生成元列表（需要 conformal_weight），或 OperatorEnumerator
+                    使用的字典 {name: {'op': 算符, 'weight': 权重, ...}}
+                    （可选 'parity'，否则由算符确定）
+        max_level: 截断的 level
+        charges: 可选的荷 {生成元（或字典格式中的 name）: 荷}
+
+    Returns:
+        QSeries
+
+    Raises:
+        ValueError: 如果生成元的权重不为正，或缺少荷
+    """
+    from .local_operator import get_operator_parity
+
+    max_level = Fraction(max_level)
+    if isinstance(generators, Mapping):
+        specs = []
+        for name, info in generators.items():
+            op = info['op']
+            parity = info['parity'] if 'parity' in info else get_operator_parity(op)
+            specs.append((Fraction(info['weight']), _charge_of(op, charges, name), parity))
+    else:
+        specs = []
+        for op in generators:
+            if op.conformal_weight is None:
+                raise ValueError(f"Generator {op} has no conformal weight")
+            specs.append((Fraction(op.conformal_weight), _charge_of(op, charges), op.parity))
+
+    letters = []
+    for weight, charge, parity in specs:
+        k = 0
+        while weight + k <= max_level:
+            letters.append((weight + k, charge, parity == 1))
+            k += 1
+    return _character(letters, max_level)
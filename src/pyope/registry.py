@@ -7,6 +7,7 @@ OPE 注册表模块
 - Bosonic, Fermionic: 声明算符类型的辅助函数
 """
 
+from contextlib import contextmanager
 from typing import Dict, Tuple, Optional, Any, Union
 import sympy as sp
 
@@ -14,6 +15,11 @@ from .operators import Operator, BasisOperator
 from .ope_data import OPEData
 
 
+# 正规序乘积中同一算符不同阶导数的排列方式（类似 OPEdefs.m 中的 NOOrdering）
+HigherDerivativesFirst = -1
+LowerDerivativesFirst = 1
+
+
 class OPERegistry:
     """
     OPE 注册表类
@@ -29,6 +35,8 @@ class OPERegistry:
         _parities: 算符 parity 字典
         _positions: 算符位置字典（用于排序）
         _position_counter: 位置计数器
+        _version: 版本号，每次修改注册表时递增
+        _no_ordering: 同一算符不同阶导数的排列方式
     """
 
     def __init__(self):
@@ -37,6 +45,54 @@ class OPERegistry:
         self._parities: Dict[Any, int] = {}
         self._positions: Dict[Any, int] = {}
         self._position_counter: int = 0
+        self._version: int = 0
+        self._no_ordering: int = LowerDerivativesFirst
+
+    @property
+    def version(self) -> int:
+        """
+        注册表的版本号
+
+        每次注册算符、定义 OPE 或清空注册表时递增，
+        可用于判断依赖注册表内容的派生数据是否过期。
+        """
+        return self._version
+
+    @property
+    def no_ordering(self) -> int:
+        """同一算符不同阶导数的排列方式（LowerDerivativesFirst 或 HigherDerivativesFirst）"""
+        return self._no_ordering
+
+    def set_no_ordering(self, ordering: int) -> None:
+        """
+        设置同一算符不同阶导数的排列方式（类似 OPEdefs.m 中的 NOOrdering）
+
+        - LowerDerivativesFirst: 低阶导数在左，例如 NO(T, ∂T)（默认）
+        - HigherDerivativesFirst: 高阶导数在左，例如 NO(∂T, T)
+
+        排列方式影响 compare_operators，因此也影响 simplify、canonicalize
+        和算符枚举的结果。非默认的排列方式会加入 OPE 缓存键和持久化存储的指纹。
+
+        Args:
+            ordering: LowerDerivativesFirst 或 HigherDerivativesFirst
+
+        Raises:
+            ValueError: 如果 ordering 不是已知的排列方式
+        """
+        if ordering not in (LowerDerivativesFirst, HigherDerivativesFirst):
+            raise ValueError(f"Unknown NO ordering: {ordering!r}")
+        if ordering == self._no_ordering:
+            return
+
+        self._no_ordering = ordering
+        self._version += 1
+        self._sync_cache_ordering()
+
+    def _sync_cache_ordering(self) -> None:
+        """把排列方式告诉全局 OPE 缓存（默认排列方式不加入缓存键）"""
+        from .cache import get_ope_cache
+        ordering = self._no_ordering
+        get_ope_cache().no_ordering = None if ordering == LowerDerivativesFirst else ordering
 
     def register_operator(self, operator: Any, parity: int) -> None:
         """
@@ -52,13 +108,22 @@ class OPERegistry:
         if parity not in (0, 1):
             raise ValueError(f"Parity must be 0 (bosonic) or 1 (fermionic), got {parity}")
 
+        from .cache import get_ope_cache
+
         # 如果算符已经注册，发出警告
         if self.is_registered(operator):
             import warnings
             warnings.warn(f"Operator {operator} is already registered, overwriting parity")
+            # parity 影响所有符号因子，缓存的结果全部失效
+            if self._parities[operator] != parity:
+                get_ope_cache().clear()
+        elif isinstance(operator, Operator):
+            # 新算符改变了排序位置，使涉及它的缓存项失效
+            get_ope_cache().invalidate_operator(operator.name)
 
         # 注册 parity
         self._parities[operator] = parity
+        self._version += 1
 
         # 分配位置（用于排序）
         if operator not in self._positions:
@@ -159,9 +224,9 @@ class OPERegistry:
                 return -1 if str(left_base) < str(right_base) else 1
         
         # 基础算符相同，比较导数阶数
-        # 阶数小的在前
+        # 默认阶数小的在前；HigherDerivativesFirst 时阶数大的在前
         if left_order != right_order:
-            return right_order - left_order # 如果 right > left (order), 返回正数
+            return (right_order - left_order) * self._no_ordering
             
         return 0
 
@@ -187,6 +252,11 @@ class OPERegistry:
         # 创建规范化的键（使用算符的字符串表示）
         key = self._make_key(left, right)
         self._opes[key] = ope_data
+        self._version += 1
+
+        # 只使依赖于这个 OPE 的缓存项失效
+        from .cache import get_ope_cache
+        get_ope_cache().invalidate([key])
 
     def get_ope(self, left: Any, right: Any) -> Optional[OPEData]:
         """
@@ -242,12 +312,49 @@ class OPERegistry:
 
         return (left_key, right_key)
 
+    def export_state(self) -> Dict[str, Any]:
+        """
+        导出注册表内容（可序列化，用于发送给工作进程）
+
+        Returns:
+            包含 OPE 定义、parity、排序位置和导数排列方式的字典
+        """
+        return {
+            'opes': dict(self._opes),
+            'parities': dict(self._parities),
+            'positions': dict(self._positions),
+            'position_counter': self._position_counter,
+            'version': self._version,
+            'no_ordering': self._no_ordering,
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """
+        载入 export_state 导出的内容，替换当前注册表
+
+        Args:
+            state: export_state 返回的字典
+        """
+        self._opes = dict(state['opes'])
+        self._parities = dict(state['parities'])
+        self._positions = dict(state['positions'])
+        self._position_counter = state['position_counter']
+        self._version = state['version']
+        self._no_ordering = state.get('no_ordering', LowerDerivativesFirst)
+        self._sync_cache_ordering()
+
+        from .cache import get_ope_cache
+        get_ope_cache().clear()
+
     def clear(self) -> None:
         """清空注册表（主要用于测试）"""
         self._opes.clear()
         self._parities.clear()
         self._positions.clear()
         self._position_counter = 0
+        self._no_ordering = LowerDerivativesFirst
+        self._version += 1
+        self._sync_cache_ordering()
 
         # 清空全局 OPE 缓存
         from .cache import get_ope_cache
@@ -306,6 +413,42 @@ def Fermionic(*operators) -> None:
         ope_registry.register_operator(op, parity=1)
 
 
+def get_no_ordering() -> int:
+    """返回全局注册表的导数排列方式"""
+    return ope_registry.no_ordering
+
+
+def set_no_ordering(ordering: int) -> None:
+    """
+    设置全局注册表的导数排列方式（类似 OPEdefs.m 中的 NOOrdering）
+
+    Args:
+        ordering: LowerDerivativesFirst 或 HigherDerivativesFirst
+
+    Examples:
+        >>> set_no_ordering(HigherDerivativesFirst)
+        >>> canonicalize(NO(T, d(T)))  # NO(∂T, T) + 修正项
+    """
+    ope_registry.set_no_ordering(ordering)
+
+
+@contextmanager
+def no_ordering(ordering: int):
+    """
+    在 with 语句内使用指定的导数排列方式
+
+    Examples:
+        >>> with no_ordering(HigherDerivativesFirst):
+        ...     result = simplify(NO(T, d(T)))
+    """
+    previous = ope_registry.no_ordering
+    set_no_ordering(ordering)
+    try:
+        yield
+    finally:
+        set_no_ordering(previous)
+
+
 class OPEDefiner:
     """
     OPE 定义器类
@@ -7,8 +7,7 @@
 - simplify(expr): 将表达式化简为排序的 NO product 线性组合
 """
 
-from typing import Any, Dict, List, Tuple
-import sympy as sp
+from typing import Any, Dict, Tuple
 from sympy import Add, Mul
 
 from .operators import (
@@ -17,12 +16,9 @@ from .operators import (
     DerivativeOperator,
     NormalOrderedOperator,
 )
-from .local_operator import (
-    is_local_operator,
-    extract_scalar_operator,
-    collect_operator_terms,
-)
+from .local_operator import extract_scalar_operator
 from .constants import Zero, One
+from .linear_combination import LinearCombination
 from .registry import ope_registry
 
 
@@ -37,8 +33,11 @@ def simplify(expr: Any, expand_derivatives: bool = True) -> Any:
     4. 标准化导数表示
     5. （可选）应用莱布尼茨法则展开正规序的导数
 
+    内部在 LinearCombination 上进行计算。输入为 LinearCombination 时
+    返回 LinearCombination，否则返回 sympy 表达式。
+
     Args:
-        expr: 要化简的表达式（可以是 Operator、OPEData 或符号表达式）
+        expr: 要化简的表达式（可以是 Operator、OPEData、LinearCombination 或符号表达式）
         expand_derivatives: 是否自动展开正规序算符的导数（默认 True）
                            当为 True 时，应用莱布尼茨法则：
                            d^n(NO(A,B)) = Σ_{k=0}^{n} C(n,k) * NO(d^k(A), d^{n-k}(B))
@@ -60,6 +59,10 @@ def simplify(expr: Any, expand_derivatives: bool = True) -> Any:
         >>> # 禁用导数展开
         >>> simplify(expr, expand_derivatives=False)  # 返回 d(NO(T, J))
     """
+    # 处理线性组合
+    if isinstance(expr, LinearCombination):
+        return _simplify_terms(expr, expand_derivatives)
+
     # 处理零
     if expr == 0 or expr == Zero:
         return 0
@@ -73,25 +76,39 @@ def simplify(expr: Any, expand_derivatives: bool = True) -> Any:
     if isinstance(expr, OPEData):
         return _simplify_ope_data(expr, expand_derivatives)
 
-    # 处理加法：分别化简每一项
-    if isinstance(expr, Add):
-        simplified_terms = [simplify(term, expand_derivatives) for term in expr.args]
-        return sp.Add(*simplified_terms)
-
-    # 处理标量乘法
-    if isinstance(expr, Mul):
-        coeff, op = extract_scalar_operator(expr)
-        if coeff != 1:
-            return coeff * simplify(op, expand_derivatives)
-
-    # 处理算符
+    # 处理单个算符
     if isinstance(expr, Operator):
-        return _simplify_operator(expr, expand_derivatives)
+        return _simplify_operator(expr, expand_derivatives).to_expr()
+
+    # 处理加法和标量乘法
+    if isinstance(expr, (Add, Mul)):
+        return _simplify_terms(LinearCombination.from_expr(expr), expand_derivatives).to_expr()
 
     # 其他情况直接返回
     return expr
 
 
+def _simplify_terms(lc: LinearCombination, expand_derivatives: bool = True) -> LinearCombination:
+    """
+    逐项化简线性组合
+
+    Args:
+        lc: LinearCombination 实例
+        expand_derivatives: 是否展开导数
+
+    Returns:
+        化简后的 LinearCombination
+    """
+    result = LinearCombination()
+    for op, coeff in lc.items():
+        if isinstance(op, Operator):
+            result._iadd(_simplify_operator(op, expand_derivatives), coeff)
+        else:
+            # 纯标量项和不透明的项保持不变
+            result._add_term(op, coeff)
+    return result
+
+
 def _simplify_ope_data(ope_data: 'OPEData', expand_derivatives: bool = True) -> 'OPEData':
     """
     化简 OPEData 对象
@@ -106,15 +123,15 @@ def _simplify_ope_data(ope_data: 'OPEData', expand_derivatives: bool = True) ->
     from .ope_data import OPEData
 
     new_poles = {}
-    for q, coeff in ope_data.poles.items():
-        simplified_coeff = simplify(coeff, expand_derivatives)
-        if simplified_coeff != 0:
+    for q in ope_data.poles:
+        simplified_coeff = _simplify_terms(ope_data.pole_terms(q), expand_derivatives)
+        if simplified_coeff:
             new_poles[q] = simplified_coeff
 
-    return OPEData(new_poles)
+    return OPEData._from_terms(new_poles)
 
 
-def _simplify_operator(op: Operator, expand_derivatives: bool = True) -> Any:
+def _simplify_operator(op: Operator, expand_derivatives: bool = True) -> LinearCombination:
     """
     化简单个算符
 
@@ -123,7 +140,7 @@ def _simplify_operator(op: Operator, expand_derivatives: bool = True) -> Any:
         expand_derivatives: 是否展开导数
 
     Returns:
-        化简后的表达式
+        化简后的 LinearCombination
     """
     # 处理 DerivativeOperator：应用莱布尼茨法则展开 d(NO(...))
     if isinstance(op, DerivativeOperator) and expand_derivatives:
@@ -133,49 +150,48 @@ def _simplify_operator(op: Operator, expand_derivatives: bool = True) -> Any:
         # 检查 base 是否为 NormalOrderedOperator
         if isinstance(base, NormalOrderedOperator):
             # 应用莱布尼茨法则: d^n(NO(A,B)) = Σ_{k=0}^{n} C(n,k) * NO(d^k(A), d^{n-k}(B))
-            from .api import NO
-            from .operators import d as derivative_operator
+            from .api import _no_terms
             from .cache import cached_binomial
 
             # 先化简左右算符
-            left = simplify(base.left, expand_derivatives)
-            right = simplify(base.right, expand_derivatives)
+            left = _simplify_operator(base.left, expand_derivatives)
+            right = _simplify_operator(base.right, expand_derivatives)
 
             # 生成莱布尼茨展开的各项
-            terms = []
+            terms = LinearCombination()
             for k in range(n + 1):
                 coeff = cached_binomial(n, k)
 
                 # 计算 d^k(left) 和 d^(n-k)(right)
-                left_deriv = derivative_operator(left, k) if k > 0 else left
-                right_deriv = derivative_operator(right, n - k) if n - k > 0 else right
+                left_deriv = left.derivative(k) if k > 0 else left
+                right_deriv = right.derivative(n - k) if n - k > 0 else right
 
                 # 构造 NO 项
-                terms.append(coeff * NO(left_deriv, right_deriv))
+                terms._iadd(_no_terms(left_deriv, right_deriv), coeff)
 
             # 递归化简展开后的表达式
-            result = sp.Add(*terms) if len(terms) > 1 else terms[0]
-            return simplify(result, expand_derivatives)
+            return _simplify_terms(terms, expand_derivatives)
 
         # 对于非 NO 的 base，保持 DerivativeOperator 结构
         # 但可以递归化简 base（可选）
-        simplified_base = simplify(base, expand_derivatives)
-        if simplified_base != base:
-            return DerivativeOperator(simplified_base, n)
-        return op
+        simplified_base = _simplify_operator(base, expand_derivatives)
+        if not simplified_base.is_single_operator() or simplified_base.coeff(base) != 1:
+            return simplified_base.derivative(n)
+        return LinearCombination.from_operator(op)
 
     # BasisOperator 和 DerivativeOperator（未展开）已经是最简形式
     if isinstance(op, (BasisOperator, DerivativeOperator)):
-        return op
+        return LinearCombination.from_operator(op)
 
     # 处理 NormalOrderedOperator
     if isinstance(op, NormalOrderedOperator):
         return _simplify_normal_ordered(op, expand_derivatives)
 
-    return op
+    return LinearCombination.from_operator(op)
 
 
-def _simplify_normal_ordered(no_op: NormalOrderedOperator, expand_derivatives: bool = True) -> Any:
+def _simplify_normal_ordered(no_op: NormalOrderedOperator,
+                             expand_derivatives: bool = True) -> LinearCombination:
     """
     化简正规序算符
 
@@ -189,117 +205,148 @@ def _simplify_normal_ordered(no_op: NormalOrderedOperator, expand_derivatives: b
         expand_derivatives: 是否展开导数
 
     Returns:
-        化简后的表达式
+        化简后的 LinearCombination
     """
-    from .api import NO
+    from .api import _no_terms
 
     # 递归化简左右算符
-    left = simplify(no_op.left, expand_derivatives)
-    right = simplify(no_op.right, expand_derivatives)
-
-    # 如果左侧或右侧是加法，分配
-    if isinstance(left, Add):
-        return sp.Add(*[NO(term, right) for term in left.args])
-    if isinstance(right, Add):
-        return sp.Add(*[NO(left, term) for term in right.args])
-
-    # 处理标量乘法
-    if isinstance(left, Mul):
-        coeff, op = extract_scalar_operator(left)
-        if coeff != 1:
-            return coeff * NO(op, right)
-    if isinstance(right, Mul):
-        coeff, op = extract_scalar_operator(right)
-        if coeff != 1:
-            return coeff * NO(left, op)
-
-    # 处理嵌套的 NO
-    # 如果左侧是 NO，展开为 NO(NO(A,B), C)
-    if isinstance(left, NormalOrderedOperator):
-        # 这需要使用 OPE 来展开
-        # 暂时保持原样，因为完整展开需要 OPE 信息
-        pass
-
-    # 如果右侧是 NO，展开为 NO(A, NO(B,C))
-    if isinstance(right, NormalOrderedOperator):
-        # 同样暂时保持原样
-        pass
+    left_lc = _simplify_operator(no_op.left, expand_derivatives)
+    right_lc = _simplify_operator(no_op.right, expand_derivatives)
+
+    # 经典 OPE：正规序乘积分次交换、结合，重排不产生修正项
+    from .api import ClassicalOPEs, get_ope_method
+    if get_ope_method() == ClassicalOPEs:
+        result = LinearCombination()
+        for op, coeff in _no_terms(left_lc, right_lc).items():
+            if isinstance(op, NormalOrderedOperator):
+                result._iadd(_classical_normal_ordered(op.left, op.right), coeff)
+            else:
+                result._add_term(op, coeff)
+        return result
+
+    # 如果左侧或右侧是线性组合（加法或标量乘法），分配
+    if not left_lc.is_single_operator() or not right_lc.is_single_operator():
+        return _no_terms(left_lc, right_lc)
+
+    left = next(iter(left_lc.operators()))
+    right = next(iter(right_lc.operators()))
 
     # 检查算符顺序
     # 只有当左右都是 BasisOperator 或 DerivativeOperator 时才进行交换
-    # 嵌套的 NO 已经在上面处理过了（虽然目前是 pass）
+    # 嵌套的 NO 保持原样，因为完整展开需要 OPE 信息
     if isinstance(left, (BasisOperator, DerivativeOperator)) and \
        isinstance(right, (BasisOperator, DerivativeOperator)):
-        
+
         order = ope_registry.compare_operators(left, right)
         if order < 0:
             # 需要交换顺序: NO(B, A) -> NO(A, B) + 修正项
             # 修正项来自 OPE(B, A) 的极点部分
-            # 公式: NO(B, A) = (-1)^{|A||B|} NO(A, B) + \sum_{n >= 1} rac{1}{n!} \partial^n \{BA\}_n
-            
+            # 公式: NO(B, A) = (-1)^{|A||B|} NO(A, B) + \sum_{n >= 1} \frac{(-1)^{n+1}}{n!} \partial^n \{BA\}_n
+
             # 1. 计算符号因子 (-1)^{|A||B|}
             parity_sign = 1
             if left.parity == 1 and right.parity == 1:
                 parity_sign = -1
-                
-            # 2. 计算修正项
-            # 需要计算 OPE(B, A)
-            from .api import OPE
-            from .operators import d as derivative_operator
-            
+
+            # 2. 计算修正项（带记忆，同一对算符只计算一次）
             # 注意：这里 left 是 B，right 是 A
-            # 我们要计算 OPE(left, right)
+            from .normal_order import swap_correction
             try:
-                ope_data = OPE(left, right)
-                correction = 0
-                
-                # 遍历极点，计算 rac{1}{n!} \partial^n \{BA\}_n
-                # 注意：OPEData 中的极点系数就是 \{BA\}_n
-                for n, coeff in ope_data.poles.items():
-                    if n >= 1:
-                        term = derivative_operator(coeff, n) / sp.factorial(n)
-                        correction += term
-                        
-                # 递归化简修正项
-                correction = simplify(correction, expand_derivatives)
-                
-                # 返回交换后的结果
-                return parity_sign * NO(right, left) + correction
-                
-            except Exception as e:
-                # 如果无法计算 OPE（例如未定义），则不交换，或者发出警告
-                # 目前保持原样
-                pass
+                correction = swap_correction(left, right)
+            except Exception:
+                # 如果无法计算 OPE（例如未定义），则不交换
+                return _no_terms(left, right)
+
+            # 修正项已经是规范形式
+            result = correction
+
+            # 返回交换后的结果
+            result._add_term(NormalOrderedOperator(right, left), parity_sign)
+            return result
 
     # 创建简化的 NO
-    return NO(left, right)
+    return _no_terms(left, right)
+
+
+def _classical_normal_ordered(left: Operator, right: Operator) -> LinearCombination:
+    """
+    经典 OPE 下的正规序乘积 NO(left, right)
+
+    经典极限下正规序乘积是分次交换、结合的：嵌套的 NO 展平后按算符顺序
+    排列（右结合），每交换两个费米子乘以 -1，同一个费米子出现两次时
+    乘积为零。
+
+    Args:
+        left: 化简后的左侧算符
+        right: 化简后的右侧算符
+
+    Returns:
+        LinearCombination
+    """
+    factors = []
+    for op in (left, right):
+        stack = [op]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, NormalOrderedOperator):
+                stack.append(node.right)
+                stack.append(node.left)
+            else:
+                factors.append(node)
+
+    # 插入排序，同时累计交换费米子产生的符号
+    sign = 1
+    for i in range(1, len(factors)):
+        j = i
+        while j > 0 and ope_registry.compare_operators(factors[j - 1], factors[j]) < 0:
+            if factors[j - 1].parity == 1 and factors[j].parity == 1:
+                sign = -sign
+            factors[j - 1], factors[j] = factors[j], factors[j - 1]
+            j -= 1
+
+    for a, b in zip(factors, factors[1:]):
+        if a is b and a.parity == 1:
+            return LinearCombination()
+
+    result = factors[-1]
+    for op in reversed(factors[:-1]):
+        result = NormalOrderedOperator(op, result)
+    return LinearCombination.from_operator(result, sign)
 
 
 def canonicalize(expr: Any, expand_derivatives: bool = True) -> Any:
     """
-    将表达式规范化
+    将表达式规范化为 PBW 形式
 
     比 simplify 更激进的化简，会：
-    1. 完全展开所有嵌套的 NO
-    2. 强制按字母顺序排列算符
+    1. 用重组公式完全展开所有嵌套的 NO
+    2. 按注册表的算符顺序排列每个单项式中的算符（NOCommuteHelp）
     3. 合并所有同类项
 
+    结果中的每一项都是右结合的规范单项式 NO(A1, NO(A2, ...))，
+    因此顺序不同的相同态会合并。重排结果带记忆（见 normal_order 模块）。
+
     Args:
         expr: 要规范化的表达式
-        expand_derivatives: 是否展开导数
+        expand_derivatives: 保留以兼容 simplify 的接口；PBW 形式中
+                            复合算符的导数总是按 Leibniz 规则展开
 
     Returns:
-        规范化后的表达式
+        规范化后的表达式（LinearCombination 输入返回 LinearCombination）
 
     Note:
         此函数需要完整的 OPE 信息才能正确展开
     """
-    # TODO: 实现完整的规范化
-    # 需要：
-    # 1. NOCommuteHelp 来处理算符交换
-    # 2. NO 展开规则
-    # 3. 项的收集和合并
-    return simplify(expr, expand_derivatives)
+    from .normal_order import normal_order
+    from .ope_data import OPEData
+
+    if isinstance(expr, OPEData):
+        return OPEData._from_terms({n: normal_order(lc) for n, lc in expr._poles.items()})
+
+    result = normal_order(expr)
+    if isinstance(expr, LinearCombination):
+        return result
+    return result.to_expr()
 
 
 def collect_normal_ordered_terms(expr: Any) -> Dict[Tuple, Any]:
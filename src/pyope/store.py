@@ -0,0 +1,343 @@
+"""
+持久化 OPE 存储模块
+
+本模块提供跨会话复用 OPE 计算结果的磁盘存储（类似 OPEdefs.m 中的 OPESave）：
+- OPEStore: 基于 SQLite 的 OPE 结果存储
+- attach_store / detach_store: 把存储挂接到全局 OPE 缓存
+- registry_fingerprint: 注册表内容的指纹
+- stable_key: 与进程无关的算符表达式键
+
+复合 OPE 的结果按照代数指纹（已定义的 OPE、parity、算符顺序和导数排列方式）存储。
+另一个进程只要定义了同样的代数，就会在缓存未命中时从磁盘惰性加载结果。
+"""
+
+import hashlib
+import pickle
+import sqlite3
+import threading
+from typing import Any, List, Optional, Tuple
+
+import sympy as sp
+
+from .operators import Operator, BasisOperator, DerivativeOperator, NormalOrderedOperator
+from .linear_combination import SCALAR, LinearCombination
+from .registry import LowerDerivativesFirst
+
+
+def stable_key(expr: Any) -> str:
+    """
+    计算与进程无关的表达式键
+
+    驻留节点的键保存在节点上，只计算一次；系数使用展开后的 srepr，
+    线性组合的项按键排序，因此结果不依赖于哈希种子和构造顺序。
+
+    Args:
+        expr: 算符、LinearCombination 或 sympy 表达式
+
+    Returns:
+        字符串键
+    """
+    if isinstance(expr, Operator):
+        key = expr.__dict__.get('_stable_key')
+        if key is None:
+            key = _operator_stable_key(expr)
+            expr._stable_key = key
+        return key
+
+    lc = LinearCombination.from_expr(expr)
+    if lc.is_single_operator():
+        return stable_key(next(iter(lc.operators())))
+
+    terms = []
+    for op, coeff in lc.items():
+        op_key = '1' if op is SCALAR else (
+            stable_key(op) if isinstance(op, Operator) else sp.srepr(op))
+        terms.append(f"{sp.srepr(sp.expand(sp.sympify(coeff)))}*{op_key}")
+    return '+'.join(sorted(terms))
+
+
+def _operator_stable_key(op: Operator) -> str:
+    """单个算符的稳定键"""
+    if isinstance(op, BasisOperator):
+        parity = 'F' if op.parity else 'B'
+        if op.indices:
+            indices = ','.join(sp.srepr(i) for i in op.indices)
+            return f"{op.base_name}:{parity}[{indices}]"
+        return f"{op.name}:{parity}"
+    if isinstance(op, DerivativeOperator):
+        return f"d{op.order}({stable_key(op.base)})"
+    if isinstance(op, NormalOrderedOperator):
+        return f"NO({stable_key(op.left)},{stable_key(op.right)})"
+    return f"{type(op).__name__}:{op.name}"
+
+
+def registry_fingerprint(registry: Any) -> str:
+    """
+    计算注册表内容的指纹
+
+    指纹覆盖已定义的 OPE、算符的 parity、算符顺序和非默认的导数排列方式，
+    内容相同的注册表在不同进程中得到相同的指纹。
+
+    Args:
+        registry: OPERegistry 实例
+
+    Returns:
+        十六进制 SHA-256 摘要
+    """
+    h = hashlib.sha256()
+
+    # 算符顺序和 parity
+    ordered = sorted(registry._positions.items(), key=lambda item: item[1])
+    for op, _ in ordered:
+        parity = registry._parities.get(op)
+        h.update(f"op {stable_key(op)} {parity}\n".encode())
+
+    # 导数排列方式（默认方式不写入，已有存储的指纹保持不变）
+    if registry.no_ordering != LowerDerivativesFirst:
+        h.update(f"no_ordering {registry.no_ordering}\n".encode())
+
+    # OPE 定义
+    for (left, right) in sorted(registry._opes):
+        ope_data = registry._opes[(left, right)]
+        h.update(f"ope {left} {right}\n".encode())
+        for n in sorted(ope_data._poles):
+            h.update(f"  {n}: {stable_key(ope_data._poles[n])}\n".encode())
+
+    return h.hexdigest()
+
+
+def _is_composite(expr: Any) -> bool:
+    """判断算符是否为（导数作用于）正规序乘积"""
+    while isinstance(expr, DerivativeOperator):
+        expr = expr.base
+    return isinstance(expr, NormalOrderedOperator)
+
+
+class OPEStore:
+    """
+    基于 SQLite 的 OPE 结果存储
+
+    以 (指纹, 左算符键, 右算符键) 为主键保存序列化的 OPEData。
+    写入先缓冲在内存中，累积到 batch_size 条或调用 flush() 时才提交，
+    避免每次写入都触发一次磁盘同步。
+
+    Examples:
+        >>> store = OPEStore("w3_opes.sqlite")
+        >>> attach_store(store)
+        >>> OPE(NO(T, W), NO(W, W))  # 结果写入磁盘
+        >>> store.flush()
+    """
+
+    def __init__(self, path: str, registry: Any = None, batch_size: int = 256):
+        """
+        打开（或创建）存储
+
+        Args:
+            path: SQLite 数据库文件路径（":memory:" 表示内存数据库）
+            registry: 计算指纹使用的注册表（默认为全局注册表）
+            batch_size: 写入缓冲的大小
+        """
+        if registry is None:
+            from .registry import ope_registry
+            registry = ope_registry
+
+        self.path = path
+        self.registry = registry
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS opes ("
+            " fingerprint TEXT NOT NULL,"
+            " left_key TEXT NOT NULL,"
+            " right_key TEXT NOT NULL,"
+            " data BLOB NOT NULL,"
+            " PRIMARY KEY (fingerprint, left_key, right_key))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, str, str, bytes]] = []
+        self._pending_keys = {}
+        self._fingerprint_version = None
+        self._fingerprint = None
+        self.loads = 0
+        self.saves = 0
+
+    @property
+    def fingerprint(self) -> str:
+        """当前注册表的指纹（按注册表版本号缓存）"""
+        version = self.registry.version
+        if version != self._fingerprint_version:
+            self._fingerprint = registry_fingerprint(self.registry)
+            self._fingerprint_version = version
+        return self._fingerprint
+
+    def accepts(self, left: Any, right: Any) -> bool:
+        """
+        判断一对参数的 OPE 是否应该写入存储
+
+        只保存两个算符中至少有一个是复合算符的结果；
+        线性组合和导数的结果可以由已存储的结果快速重建。
+        """
+        return (isinstance(left, Operator) and isinstance(right, Operator) and
+                (_is_composite(left) or _is_composite(right)))
+
+    def _row_key(self, left: Any, right: Any, namespace: Any) -> Tuple[str, str, str]:
+        """主键 (指纹, 左算符键, 右算符键)；非默认的计算方式附加在指纹后"""
+        fingerprint = self.fingerprint
+        if namespace is not None:
+            fingerprint = f"{fingerprint}/{namespace}"
+        return (fingerprint, stable_key(left), stable_key(right))
+
+    def load(self, left: Any, right: Any, namespace: Any = None) -> Optional[Any]:
+        """
+        读取 OPE 结果
+
+        Args:
+            left: 左侧算符
+            right: 右侧算符
+            namespace: 计算方式的命名空间（None 表示量子 OPE）
+
+        Returns:
+            OPEData 或 None（不存在）
+        """
+        entry = self.load_entry(left, right, namespace)
+        return entry[0] if entry is not None else None
+
+    def load_entry(self, left: Any, right: Any,
+                   namespace: Any = None) -> Optional[Tuple[Any, frozenset]]:
+        """
+        读取 OPE 结果及其依赖的注册表 OPE 键
+
+        Args:
+            left: 左侧算符
+            right: 右侧算符
+            namespace: 计算方式的命名空间（None 表示量子 OPE）
+
+        Returns:
+            (OPEData, deps) 元组或 None（不存在）
+        """
+        key = self._row_key(left, right, namespace)
+        with self._lock:
+            data = self._pending_keys.get(key)
+            if data is None:
+                row = self._conn.execute(
+                    "SELECT data FROM opes WHERE fingerprint=? AND left_key=? AND right_key=?",
+                    key
+                ).fetchone()
+                if row is None:
+                    return None
+                data = row[0]
+        self.loads += 1
+        return pickle.loads(data)
+
+    def save(self, left: Any, right: Any, result: Any, deps: frozenset = frozenset(),
+             namespace: Any = None) -> None:
+        """
+        写入 OPE 结果（缓冲，不立即提交）
+
+        Args:
+            left: 左侧算符
+            right: 右侧算符
+            result: OPEData 结果
+            deps: 结果依赖的注册表 OPE 键（加载时用于缓存失效跟踪）
+            namespace: 计算方式的命名空间（None 表示量子 OPE）
+        """
+        key = self._row_key(left, right, namespace)
+        data = pickle.dumps((result, deps), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._pending.append(key + (data,))
+            self._pending_keys[key] = data
+            self.saves += 1
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """提交所有缓冲的写入"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO opes (fingerprint, left_key, right_key, data) "
+            "VALUES (?, ?, ?, ?)",
+            self._pending
+        )
+        self._conn.commit()
+        self._pending.clear()
+        self._pending_keys.clear()
+
+    def clear(self, fingerprint: Optional[str] = None) -> None:
+        """
+        删除存储的结果（类似 OPEdefs.m 中的 ClearOPESavedValues）
+
+        Args:
+            fingerprint: 只删除该指纹下的结果（包括各种计算方式）；None 表示删除全部
+        """
+        with self._lock:
+            self._pending.clear()
+            self._pending_keys.clear()
+            if fingerprint is None:
+                self._conn.execute("DELETE FROM opes")
+            else:
+                self._conn.execute("DELETE FROM opes WHERE fingerprint=? OR fingerprint LIKE ?",
+                                   (fingerprint, fingerprint + "/%"))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        """存储的结果总数（包括尚未提交的写入）"""
+        self.flush()
+        return self._conn.execute("SELECT COUNT(*) FROM opes").fetchone()[0]
+
+    def close(self) -> None:
+        """提交缓冲的写入并关闭数据库"""
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> 'OPEStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"OPEStore({self.path!r})"
+
+
+def attach_store(store: Any, cache: Any = None) -> OPEStore:
+    """
+    把持久化存储挂接到 OPE 缓存
+
+    挂接后，缓存未命中时会从存储中加载结果，复合 OPE 的计算结果会写入存储。
+
+    Args:
+        store: OPEStore 实例或数据库文件路径
+        cache: OPECache 实例（默认为全局缓存）
+
+    Returns:
+        挂接的 OPEStore 实例
+    """
+    if not isinstance(store, OPEStore):
+        store = OPEStore(store)
+    if cache is None:
+        from .cache import get_ope_cache
+        cache = get_ope_cache()
+    cache.attach_store(store)
+    return store
+
+
+def detach_store(cache: Any = None) -> Optional[OPEStore]:
+    """
+    从 OPE 缓存上卸下持久化存储（提交缓冲的写入）
+
+    Args:
+        cache: OPECache 实例（默认为全局缓存）
+
+    Returns:
+        卸下的 OPEStore 实例，如果没有挂接则返回 None
+    """
+    if cache is None:
+        from .cache import get_ope_cache
+        cache = get_ope_cache()
+    return cache.detach_store()
@@ -4,9 +4,17 @@ Pytest configuration for pyope tests
 This file contains shared fixtures and configuration for all tests.
 """
 
+from fractions import Fraction
+
 import pytest
+import sympy as sp
+from pyope import Bosonic, Fermionic
+from pyope.api import OPE
 from pyope.cache import get_ope_cache
+from pyope.constants import One
+from pyope.operators import BasisOperator, d
 from pyope.registry import ope_registry
+from pyope.store import detach_store
 
 
 @pytest.fixture(autouse=True, scope="function")
@@ -35,3 +43,53 @@ def disable_cache_for_tests():
     cache.enable()
     cache.clear()
     ope_registry.clear()
+
+
+@pytest.fixture
+def ope_cache():
+    """
+    Enable the global OPE cache for one test.
+
+    The cache is disabled by disable_cache_for_tests; tests of caching and
+    of the persistent store request this fixture to turn it back on. Any
+    store attached during the test is detached afterwards.
+    """
+    cache = get_ope_cache()
+    cache.enable()
+    yield cache
+    detach_store()
+
+
+@pytest.fixture
+def virasoro():
+    """The Virasoro OPE with a symbolic central charge c; returns T."""
+    T = BasisOperator("T", bosonic=True)
+    c = sp.Symbol("c")
+    OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+    return T
+
+
+@pytest.fixture
+def bc_beta_gamma():
+    """The bc-βγ system [b, c, β, γ] with its OPEs."""
+    b = BasisOperator("b", bosonic=False, conformal_weight=Fraction(2))
+    c = BasisOperator("c", bosonic=False, conformal_weight=Fraction(-1))
+    beta = BasisOperator("β", bosonic=True, conformal_weight=Fraction(3, 2))
+    gamma = BasisOperator("γ", bosonic=True, conformal_weight=Fraction(-1, 2))
+    Fermionic(b, c)
+    Bosonic(beta, gamma)
+    OPE[b, c] = OPE.make([One])
+    OPE[beta, gamma] = OPE.make([-One])
+    return [b, c, beta, gamma]
+
+
+@pytest.fixture
+def bc_beta_gamma_charges(bc_beta_gamma):
+    """The (m, r) quantum numbers of the bc-βγ system."""
+    b, c, beta, gamma = bc_beta_gamma
+    return {
+        b: (Fraction(1), Fraction(1, 2)),
+        c: (Fraction(-1), Fraction(-1, 2)),
+        beta: (Fraction(3, 2), Fraction(0)),
+        gamma: (Fraction(-3, 2), Fraction(0)),
+    }
@@ -4,11 +4,13 @@ Unit tests for API functions (OPE, NO, bracket).
 
 import pytest
 import sympy as sp
-from pyope.api import OPE, NO, bracket
+from pyope.api import OPE, NO, bracket, ClassicalOPEs, QuantumOPEs, get_ope_method, ope_method
 from pyope.operators import BasisOperator, d
 from pyope.ope_data import OPEData
 from pyope.constants import One
 from pyope.registry import ope_registry
+from pyope.cache import get_ope_cache
+from pyope.simplify import simplify
 
 
 @pytest.fixture(autouse=True)
@@ -167,3 +169,259 @@ class TestBracket:
         result = bracket(psi, chi, anticommutator=True)
         # Should be NO(psi,chi) + NO(chi,psi)
         assert isinstance(result, sp.Add)
+
+
+class TestEvaluationEngine:
+    """Tests for the explicit-stack OPE evaluation engine."""
+
+    def test_deep_nesting_without_recursion(self):
+        """Test that deeply nested composites do not hit the recursion limit."""
+        import sys
+
+        J = BasisOperator("J", bosonic=True)
+        b = BasisOperator("b", bosonic=True)
+        OPE[J, J] = OPE.make([One, 0])
+        OPE[J, b] = OPE.make([b])
+
+        depth = 1000
+        X = b
+        for _ in range(depth):
+            X = NO(J, X)
+
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(200)
+        try:
+            result = OPE(J, X)
+        finally:
+            sys.setrecursionlimit(limit)
+
+        assert result.max_pole == 2
+        # {J X}_2 = depth * NO(J, ..., b)（少一个 J）
+        inner = X.right
+        assert result.pole_terms(2).coeff(inner) == depth
+
+    def test_matches_repeated_subcomputations(self):
+        """Test that memoized sub-OPEs give the same result as fresh ones."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+
+        X = NO(T, T)
+        first = OPE(X, X)
+        second = OPE(X, X)
+        assert first == second
+        assert first.max_pole == 8
+
+
+class TestOPETable:
+    """Tests for OPE.table."""
+
+    def test_matches_individual_opes(self):
+        """Test that every entry equals the corresponding OPE."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+        OPE[J, J] = OPE.make([One, 0])
+        OPE[T, J] = OPE.make([J, d(J)])
+
+        lefts = [T, NO(J, J), NO(T, J)]
+        rights = [NO(J, J), d(T), NO(T, T) + 2 * J]
+        table = OPE.table(lefts, rights)
+
+        assert len(table) == 3
+        for left, row in zip(lefts, table):
+            assert len(row) == 3
+            for right, result in zip(rights, row):
+                assert result == OPE(left, right)
+
+    def test_duplicate_pairs_share_result(self):
+        """Test that equal pairs are computed once."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+
+        X = NO(T, T)
+        table = OPE.table([X, 2 * X / 2])
+        assert table[0][0] is table[1][1]
+        assert table[0][1] is table[1][0]
+        assert table[0][0].max_pole == 8
+
+
+class TestLazyOPE:
+    """Tests for per-pole evaluation."""
+
+    def test_poles_match_full_ope(self):
+        """Test that every pole agrees with the full OPE."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        psi = BasisOperator("ψ", bosonic=False)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+        OPE[T, J] = OPE.make([J, d(J)])
+        OPE[J, J] = OPE.make([One, 0])
+        OPE[T, psi] = OPE.make([sp.Rational(1, 2) * psi, d(psi)])
+        OPE[psi, psi] = OPE.make([One])
+
+        pairs = [
+            (NO(T, T), NO(T, d(T))),
+            (NO(J, T), NO(T, J)),
+            (d(NO(psi, d(psi)), 2), NO(T, psi)),
+            (J, NO(psi, NO(T, psi))),
+            (NO(T, J) + 3 * d(T), NO(J, J)),
+        ]
+        for left, right in pairs:
+            full = OPE(left, right)
+            lazy = OPE.lazy(left, right)
+            for n in range(1, full.max_pole + 2):
+                assert lazy.pole_terms(n) == full.pole_terms(n)
+                assert bracket(left, right, n) == full.pole(n)
+            assert not lazy.is_evaluated
+            assert lazy == full
+            assert lazy.is_evaluated
+
+    def test_low_pole_skips_high_sub_opes(self):
+        """Test that a low pole does not evaluate the full OPE."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+
+        X = NO(T, T)
+        Y = NO(T, d(T))
+        cache = get_ope_cache()
+        cache.enable()
+        lazy = OPE.lazy(X, Y)
+        assert lazy.pole(1) == OPE(X, Y).pole(1)
+        # 只算第 1 阶极点时，完整的 OPE(X, Y) 不会进入缓存
+        cache.clear()
+        OPE.lazy(X, Y).pole(1)
+        assert cache.get(X, Y) is None
+
+
+class TestPoleWindow:
+    """Tests for OPE(A, B, min_pole=, max_pole=)."""
+
+    def test_window_matches_truncated_ope(self):
+        """Test that every window equals the truncated full OPE."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        psi = BasisOperator("ψ", bosonic=False)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+        OPE[T, J] = OPE.make([J, d(J)])
+        OPE[J, J] = OPE.make([One, 0])
+        OPE[T, psi] = OPE.make([sp.Rational(1, 2) * psi, d(psi)])
+        OPE[psi, psi] = OPE.make([One])
+
+        pairs = [
+            (NO(T, T), NO(T, d(T))),
+            (J, NO(psi, NO(T, psi))),
+            (d(J, 2), NO(T, d(J))),
+            (NO(NO(T, J), psi), NO(psi, J)),
+            (NO(T, J) + 3 * d(T), NO(J, J)),
+        ]
+        for left, right in pairs:
+            full = OPE(left, right)
+            top = full.max_pole
+            for lo in range(1, top + 2):
+                for hi in [None] + list(range(lo, top + 2)):
+                    window = OPE(left, right, min_pole=lo, max_pole=hi)
+                    expected = OPEData({n: full.pole(n) for n in range(lo, top + 1)
+                                        if hi is None or n <= hi})
+                    assert window == expected
+
+    def test_central_term(self):
+        """Test extracting only the top pole."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+
+        X = NO(T, T)
+        result = OPE(X, X, min_pole=8)
+        assert result.max_pole == 8
+        assert list(result.poles) == [8]
+        assert result.pole(8) == OPE(X, X).pole(8)
+
+    def test_window_uses_cached_full_ope(self):
+        """Test that a cached full OPE is truncated instead of recomputed."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+
+        cache = get_ope_cache()
+        cache.enable()
+        X = NO(T, T)
+        full = OPE(X, T)
+        hits = cache.hits
+        assert OPE(X, T, max_pole=2) == OPEData({n: full.pole(n) for n in (1, 2)})
+        assert cache.hits == hits + 1
+
+
+class TestClassicalOPEs:
+    """Tests for the classical (Poisson vertex algebra) method."""
+
+    def test_no_multiple_contractions(self):
+        """Test the classical OPE of T with the composite TT."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+
+        quantum = OPE(T, NO(T, T))
+        assert quantum.max_pole == 6
+
+        with ope_method(ClassicalOPEs):
+            result = OPE(T, NO(T, T)).simplify()
+        assert get_ope_method() == QuantumOPEs
+        assert result.max_pole == 4
+        assert result.pole(4) == c * T
+        assert result.pole(3) == 0
+        assert result.pole(2) == 4 * NO(T, T)
+        assert result.pole(1) == 2 * NO(T, d(T))
+
+    def test_method_argument_and_cache_namespace(self):
+        """Test that quantum and classical results are cached separately."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+
+        cache = get_ope_cache()
+        cache.enable()
+        X = NO(T, T)
+        quantum = OPE(X, X)
+        classical = OPE(X, X, method=ClassicalOPEs)
+        assert classical != quantum
+        assert classical.max_pole < quantum.max_pole
+        assert OPE(X, X) is quantum
+        assert OPE(X, X, method=ClassicalOPEs) is classical
+
+    def test_lazy_keeps_method(self):
+        """Test that lazy poles use the method active at creation."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+
+        with ope_method(ClassicalOPEs):
+            lazy = OPE.lazy(T, NO(T, T))
+        assert lazy.pole(6) == 0
+        assert lazy.pole(4) == c * T
+
+    def test_graded_commutative_normal_ordering(self):
+        """Test that classical NO reordering has no corrections."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        psi = BasisOperator("ψ", bosonic=False)
+        chi = BasisOperator("χ", bosonic=False)
+        OPE[T, J] = OPE.make([J, d(J)])
+
+        assert simplify(NO(J, T)) != NO(T, J)
+        with ope_method(ClassicalOPEs):
+            assert simplify(NO(J, T)) == NO(T, J)
+            assert simplify(NO(NO(T, J), T)) == NO(T, NO(T, J))
+            assert simplify(NO(chi, psi)) == -NO(psi, chi)
+            assert simplify(NO(psi, NO(chi, psi))) == 0
+
+    def test_unknown_method(self):
+        """Test that an unknown method is rejected."""
+        with pytest.raises(ValueError):
+            with ope_method("semiclassical"):
+                pass
@@ -0,0 +1,240 @@
+"""
+Unit tests for the OPE cache.
+"""
+
+import pytest
+import sympy as sp
+from pyope.api import OPE, NO
+from pyope.cache import OPECache, get_ope_cache, make_operator_key
+from pyope.constants import One
+from pyope.linear_combination import LinearCombination
+from pyope.ope_data import OPEData
+from pyope.operators import BasisOperator, d
+from pyope.registry import HigherDerivativesFirst, no_ordering
+
+
+class TestCacheKeys:
+    """Tests for structural cache keys."""
+
+    def test_operator_key_is_node(self):
+        """Test that an interned operator is its own key."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+
+        assert make_operator_key(T) is T
+        assert make_operator_key(NO(T, d(J))) is NO(T, d(J))
+
+    def test_equal_coefficients_share_key(self):
+        """Test that coefficients written differently give the same key."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        c = sp.Symbol("c")
+
+        expr1 = sp.Mul(2, c, sp.Rational(1, 2), T, evaluate=False) + c * (c + 1) * J
+        expr2 = (c ** 2 + c) * J + c * T
+        assert make_operator_key(expr1) == make_operator_key(expr2)
+        assert make_operator_key(expr1) != make_operator_key(c * T)
+
+    def test_single_term_matches_operator(self):
+        """Test that a coefficient-one combination shares the operator key."""
+        T = BasisOperator("T", bosonic=True)
+
+        assert make_operator_key(LinearCombination.from_operator(T)) is T
+
+    def test_key_stored_on_linear_combination(self):
+        """Test that the key is computed once and invalidated on mutation."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+
+        lc = LinearCombination.from_expr(T + 2 * J)
+        key = lc.cache_key
+        assert lc.cache_key is key
+
+        lc._add_term(T, 1)
+        assert lc.cache_key != key
+
+
+class TestOPECache:
+    """Tests for OPECache lookups."""
+
+    def test_hit_for_equivalent_expression(self):
+        """Test that an equivalent expression hits the same entry."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+
+        cache = OPECache(maxsize=16)
+        result = OPEData({1: T})
+        cache.put(T, 2 * c / 2 * T, result)
+        assert cache.get(T, c * T) is result
+        assert cache.stats()['hits'] == 1
+
+    def test_cached_ope_matches_uncached(self):
+        """Test that enabling the cache does not change OPE results."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        c = sp.Symbol("c")
+
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+        OPE[J, J] = OPE.make([One])
+        OPE[T, J] = OPE.make([J, d(J)])
+
+        expected = OPE(NO(T, J), NO(J, T))
+
+        cache = get_ope_cache()
+        cache.enable()
+        first = OPE(NO(T, J), NO(J, T))
+        second = OPE(NO(T, J), NO(J, T))
+        assert first == expected
+        assert second == expected
+        assert cache.stats()['hits'] > 0
+
+    def test_no_ordering_keys_separate(self):
+        """Test that results under another derivative ordering use separate keys."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+
+        cache = get_ope_cache()
+        cache.enable()
+        X = NO(T, d(T))
+        default = OPE(X, X)
+        with no_ordering(HigherDerivativesFirst):
+            assert cache.no_ordering == HigherDerivativesFirst
+            other = OPE(X, X)
+            assert other is not default
+            assert other == default
+            assert OPE(X, X) is other
+        assert cache.no_ordering is None
+        assert OPE(X, X) is default
+
+
+class TestCacheEviction:
+    """Tests for LRU eviction, memory budget and pinned entries."""
+
+    def test_lru_order(self):
+        """Test that the least recently used entry is evicted first."""
+        A = BasisOperator("A", bosonic=True)
+        B = BasisOperator("B", bosonic=True)
+        C = BasisOperator("C", bosonic=True)
+
+        cache = OPECache(maxsize=2)
+        cache.put(A, A, OPEData({1: A}))
+        cache.put(B, B, OPEData({1: B}))
+        cache.get(A, A)  # A 变为最近使用
+        cache.put(C, C, OPEData({1: C}))
+
+        assert cache.get(A, A) is not None
+        assert cache.get(B, B) is None
+        assert cache.get(C, C) is not None
+        assert cache.stats()['evictions'] == 1
+
+    def test_memory_budget(self):
+        """Test that the byte budget bounds the LRU tier."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+
+        small = OPEData({1: T})
+        large = OPEData({n: sum(c ** k * d(T, k) for k in range(1, 20))
+                         for n in range(1, 6)})
+
+        cache = OPECache(maxsize=100)
+        cache.put(T, T, small)
+        small_bytes = cache.stats()['bytes']
+        cache.clear()
+        cache.put(T, T, large)
+        assert cache.stats()['bytes'] > 10 * small_bytes
+
+        cache = OPECache(maxsize=100, max_bytes=5 * small_bytes)
+        for k in range(10):
+            cache.put(T, d(T, k + 1), small)
+        stats = cache.stats()
+        assert stats['bytes'] <= 5 * small_bytes
+        assert stats['cache_size'] == 5
+
+    def test_pinned_entries_not_evicted(self):
+        """Test that pinned entries survive eviction."""
+        T = BasisOperator("T", bosonic=True)
+
+        cache = OPECache(maxsize=1)
+        cache.put(T, T, OPEData({2: T}), pin=True)
+        for k in range(5):
+            cache.put(T, d(T, k + 1), OPEData({1: T}))
+
+        assert cache.get(T, T) is not None
+        stats = cache.stats()
+        assert stats['pinned_size'] == 1
+        assert stats['cache_size'] == 1
+
+    def test_generator_opes_are_pinned(self):
+        """Test that registry OPEs between generators are pinned."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+
+        cache = get_ope_cache()
+        cache.enable()
+        OPE(NO(T, T), T)
+        assert cache.stats()['pinned_size'] == 1
+
+
+class TestCacheInvalidation:
+    """Tests for dependency-tracked invalidation."""
+
+    def test_redefine_invalidates_only_dependents(self):
+        """Test that redefining an OPE drops only results that used it."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        c = sp.Symbol("c")
+        k = sp.Symbol("k")
+
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+        OPE[J, J] = OPE.make([k * One, 0])
+
+        cache = get_ope_cache()
+        cache.enable()
+        ope_T = OPE(NO(T, T), NO(T, T))
+        ope_J = OPE(NO(J, J), J)
+        assert ope_J.pole(2) == 2 * k * J
+
+        OPE[J, J] = OPE.make([2 * k * One, 0])
+        assert cache.stats()['invalidations'] > 0
+
+        # 只依赖于 OPE[T, T] 的结果仍然命中
+        hits = cache.hits
+        assert OPE(NO(T, T), NO(T, T)) is ope_T
+        assert cache.hits == hits + 1
+
+        # 依赖于 OPE[J, J] 的结果重新计算
+        assert OPE(NO(J, J), J).pole(2) == 4 * k * J
+
+    def test_undefined_ope_dependency(self):
+        """Test that defining a previously undefined OPE invalidates zero results."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        c = sp.Symbol("c")
+
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+        OPE[J, J] = OPE.make([One, 0])
+
+        cache = get_ope_cache()
+        cache.enable()
+        assert OPE(NO(T, T), J).max_pole == 0
+
+        OPE[T, J] = OPE.make([J, 0])
+        assert OPE(NO(T, T), J).max_pole > 0
+
+    def test_parity_change_clears_cache(self):
+        """Test that overwriting a parity clears the cache."""
+        T = BasisOperator("T", bosonic=True)
+
+        OPE[T, T] = OPE.make([One, 0])
+        cache = get_ope_cache()
+        cache.enable()
+        OPE(NO(T, T), T)
+        assert len(cache) > 0
+
+        from pyope.registry import ope_registry
+        with pytest.warns(UserWarning):
+            ope_registry.register_operator(T, 1)
+        assert len(cache) == 0
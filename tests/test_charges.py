@@ -0,0 +1,80 @@
+"""
+Unit tests for the additive charge lattice.
+"""
+
+from fractions import Fraction
+
+import pytest
+import sympy as sp
+from pyope.api import NO
+from pyope.charges import ChargeLattice
+from pyope.linear_combination import LinearCombination
+from pyope.null_states import GroupedNullStatesCalculator, enumerate_fock_basis
+from pyope.operators import d
+
+
+class TestChargeLattice:
+    """Tests for charges of composite operators."""
+
+    def test_structural_rules(self, bc_beta_gamma):
+        """Test derivatives, normal-ordered products and linear combinations."""
+        b, c, beta, gamma = bc_beta_gamma
+        lattice = ChargeLattice({b: (1, Fraction(1, 2), 0), c: (-1, Fraction(-1, 2), 0),
+                                 beta: (Fraction(3, 2), 0, 1), gamma: (Fraction(-3, 2), 0, -1)},
+                                names=("m", "r", "n"))
+        assert lattice.rank == 3
+        assert lattice.charge(d(b, 2)) == (1, Fraction(1, 2), 0)
+        assert lattice.charge(NO(beta, NO(d(b), beta))) == (4, Fraction(1, 2), 2)
+        assert lattice.charge(2 * NO(gamma, b) - sp.Symbol("k") * NO(d(gamma), b)) == \
+            (Fraction(-1, 2), Fraction(1, 2), -1)
+        assert lattice.charge(LinearCombination.from_expr(NO(b, c) + 3)) == (0, 0, 0)
+
+        with pytest.raises(ValueError):
+            lattice.charge(NO(b, c) + beta)
+        assert ChargeLattice({b: 1, beta: 2}, homogeneous=False).charge(b + beta) in [(1,), (2,)]
+        with pytest.raises(ValueError):
+            lattice.declare(b, (1, 2))
+
+    def test_cached_on_nodes(self, bc_beta_gamma):
+        """Test that node charges are stored once and invalidated by declarations."""
+        b, c, beta, gamma = bc_beta_gamma
+        lattice = ChargeLattice({b: 1, c: -1})
+        op = NO(d(b), NO(b, c))
+        assert lattice.charge(op) == (1,)
+        assert op._charge_entry[1] == (1,)
+        assert op.right._charge_entry[1] == (0,)
+
+        lattice.declare(beta, 5)
+        assert lattice.charge(NO(beta, op)) == (6,)
+        lattice.declare(b, 2)
+        assert lattice.charge(op) == (3,)
+
+        groups = lattice.group([b, d(c), NO(b, c), beta, c], components=(0,))
+        assert groups == {(2,): [b], (-1,): [d(c), c], (1,): [NO(b, c)], (5,): [beta]}
+
+        # a charge declared on a linear combination carries over to its derivatives
+        j0 = 2 * NO(b, c) + 3 * NO(beta, gamma)
+        lattice.declare(j0, 7)
+        assert lattice.charge(j0) == lattice.charge(d(j0)) == lattice.charge(d(j0, 2)) == (7,)
+        with pytest.raises(ValueError):
+            lattice.declare(NO(b, c) + NO(d(b), c), 4)
+
+    def test_refined_sectors(self, bc_beta_gamma):
+        """Test that further charges split sectors without changing the counts."""
+        b, c, beta, gamma = bc_beta_gamma
+        J = NO(c, b) + NO(beta, gamma) / 2
+        lower = enumerate_fock_basis(bc_beta_gamma, Fraction(2))
+        ops = [NO(J, op) for op in lower] + [d(op) for op in lower]
+
+        # only the bc number; β and γ are neutral
+        coarse = ChargeLattice({b: 1, c: -1})
+        fine = ChargeLattice({b: (1, 1, 0), c: (-1, -1, 0),
+                              beta: (Fraction(3, 2), 0, 1), gamma: (Fraction(-3, 2), 0, -1)})
+        results = [GroupedNullStatesCalculator(bc_beta_gamma, lattice)
+                   .calculate_null_states_grouped(Fraction(3), ops)
+                   for lattice in (coarse, fine)]
+
+        assert len(results[1]['groups']) > len(results[0]['groups'])
+        assert all(len(key) == 3 for key in results[1]['groups'])
+        assert results[1]['total_rank'] == results[0]['total_rank']
+        assert results[1]['total_n_null_states'] == results[0]['total_n_null_states']
@@ -0,0 +1,151 @@
+"""
+Unit tests for coefficient domains.
+"""
+
+from fractions import Fraction
+
+import pytest
+import sympy as sp
+from pyope.api import OPE, NO
+from pyope.ope_data import OPEData
+from pyope.domains import (
+    EX,
+    GF,
+    QQ,
+    GFElement,
+    coefficient_domain,
+    get_coefficient_domain,
+)
+from pyope.operators import d
+
+
+def _substituted(ope, values, modulus=None):
+    """Poles of an OPE with parameters substituted (optionally reduced mod p)."""
+    result = {}
+    for n, lc in ope._poles.items():
+        terms = {}
+        for op, coeff in lc.items():
+            value = sp.sympify(sp.sympify(coeff).xreplace(values))
+            if modulus is not None:
+                value = value.p * pow(int(value.q), -1, modulus) % modulus
+            if value != 0:
+                terms[op] = sp.expand(value)
+        result[n] = terms
+    return result
+
+
+class TestDomainElements:
+    """Tests for domain element arithmetic and conversion."""
+
+    def test_rational_conversion(self):
+        """Test conversion to and from QQ."""
+        c = sp.Symbol("c")
+        assert QQ.convert(sp.Rational(3, 4)) == Fraction(3, 4)
+        assert QQ.with_values({c: 2}).convert(c / 3 + 1) == Fraction(5, 3)
+        assert QQ.to_sympy(Fraction(3, 4)) == sp.Rational(3, 4)
+        with pytest.raises(ValueError):
+            QQ.convert(c)
+
+    def test_polynomial_arithmetic(self):
+        """Test sparse polynomial arithmetic in QQ[c, k]."""
+        c, k = sp.symbols("c k")
+        ring = QQ[c, k]
+        p = ring.convert(c / 2 + k)
+        q = ring.convert(c - 1)
+        product = p * q - Fraction(1, 2) * p + 3
+        expected = sp.expand((c / 2 + k) * (c - 1) - (c / 2 + k) / 2 + 3)
+        assert sp.expand(ring.to_sympy(product) - expected) == 0
+        assert p - p == 0
+        with pytest.raises(ValueError):
+            ring.convert(1 / c)
+
+    def test_prime_field(self):
+        """Test GF(p) arithmetic and conversion."""
+        field = GF(7)
+        x = field.convert(sp.Rational(1, 3))
+        assert isinstance(x, GFElement)
+        assert x * 3 == 1
+        assert (x + 2) / x == 7 * x + 7
+        assert field.inverse_factorial(3) * 6 == 1
+        with pytest.raises(ValueError):
+            field.inverse_factorial(7)
+        with pytest.raises(ValueError):
+            GF(8)
+
+
+class TestDomainOPEs:
+    """Tests for OPE computations in a coefficient domain."""
+
+    def test_fixed_central_charge(self, virasoro):
+        """Test that QQ with a value for c matches substitution."""
+        T = virasoro
+        c = sp.Symbol("c")
+        X = NO(T, NO(T, T))
+        Y = NO(T, d(T))
+        values = {c: sp.Rational(-22, 5)}
+
+        expected = _substituted(OPE(X, Y), values)
+        result = OPE(X, Y, domain=QQ.with_values(values))
+        assert get_coefficient_domain() is EX
+        assert _substituted(result, {}) == expected
+        assert all(isinstance(coeff, sp.Basic) for lc in result._poles.values()
+                   for _, coeff in lc.items())
+
+    def test_polynomial_ring(self, virasoro):
+        """Test that QQ[c] reproduces the sympy result."""
+        T = virasoro
+        c = sp.Symbol("c")
+        X = NO(T, NO(T, T))
+        Y = NO(T, T)
+        assert OPE(X, Y, domain=QQ[c]) == OPE(X, Y)
+
+    def test_prime_field(self, virasoro):
+        """Test that GF(p) gives the sympy result reduced mod p."""
+        T = virasoro
+        c = sp.Symbol("c")
+        X = NO(T, NO(T, T))
+        p = 32003
+
+        Y = NO(T, T)
+        expected = _substituted(OPE(X, Y), {c: 17}, modulus=p)
+        result = OPE(X, Y, domain=GF(p, values={c: 17}))
+        assert _substituted(result, {}) == expected
+
+    def test_linear_combination_arguments(self, virasoro):
+        """Test that argument coefficients are converted into the domain."""
+        T = virasoro
+        c = sp.Symbol("c")
+        X = c * NO(T, T) + d(T, 2) / 3
+
+        expected = _substituted(OPE(X, T), {c: 3})
+        with coefficient_domain(QQ.with_values({c: 3})):
+            result = OPE(X, T)
+        assert _substituted(result, {}) == expected
+
+    def test_cache_keys_separate(self, virasoro, ope_cache):
+        """Test that results in different domains are cached separately."""
+        T = virasoro
+        c = sp.Symbol("c")
+        X = NO(T, T)
+        domain = QQ.with_values({c: 1})
+
+        cache = ope_cache
+        with coefficient_domain(domain):
+            assert cache.domain == domain.key
+            OPE(X, X)
+            size = len(cache)
+        assert cache.domain is None
+        symbolic = OPE(X, X)
+        assert len(cache) > size
+        assert c in sp.sympify(symbolic.pole(4)).free_symbols
+
+    def test_lazy_keeps_domain(self, virasoro):
+        """Test that lazy poles use the domain active at creation."""
+        T = virasoro
+        c = sp.Symbol("c")
+        X = NO(T, T)
+        with coefficient_domain(GF(101, values={c: 2})):
+            lazy = OPE.lazy(X, X)
+        assert lazy.domain.key == "GF(101, c=2)"
+        expected = _substituted(OPE(X, X), {c: 2}, modulus=101)
+        assert _substituted(OPEData({4: lazy.pole(4)}), {}) == {4: expected[4]}
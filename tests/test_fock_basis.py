@@ -0,0 +1,111 @@
+"""
+Unit tests for the PBW Fock-space basis.
+"""
+
+import itertools
+from fractions import Fraction
+
+import pytest
+from pyope import Bosonic
+from pyope.api import OPE
+from pyope.constants import One
+from pyope.normal_order import normal_order
+from pyope.null_states import FockSpaceBasis, enumerate_fock_basis
+from pyope.operators import BasisOperator, NormalOrderedOperator
+
+
+def _letters(op):
+    """Factors of a right-nested normal-ordered product."""
+    letters = []
+    while isinstance(op, NormalOrderedOperator):
+        letters.append(op.left)
+        op = op.right
+    return letters + [op]
+
+
+def _series(level, bosons, fermions):
+    """Coefficient of q^level in prod 1/(1-q^w) prod (1+q^w), by brute force."""
+    unit = 2
+    coeffs = [1] + [0] * int(level * unit)
+    for weight in bosons:
+        step = int(weight * unit)
+        for n in range(step, len(coeffs)):
+            coeffs[n] += coeffs[n - step]
+    for weight in fermions:
+        step = int(weight * unit)
+        for n in range(len(coeffs) - 1, step - 1, -1):
+            coeffs[n] += coeffs[n - step]
+    return coeffs[-1]
+
+
+class TestFockSpaceBasis:
+    """Tests for the streaming PBW basis."""
+
+    def test_size_matches_generating_function(self, bc_beta_gamma):
+        """Test the exact size against the character of the free fields."""
+        basis = FockSpaceBasis(bc_beta_gamma)
+        for level in [Fraction(1), Fraction(5, 2), Fraction(4), Fraction(6)]:
+            weights = [Fraction(n, 2) for n in range(1, int(2 * level) + 1)]
+            # b: 2, 3, ...; ∂^2c: 1, 2, ...; β: 3/2, 5/2, ...; ∂γ: 1/2, 3/2, ...
+            fermions = [w for w in weights if w.denominator == 1 and w >= 1] \
+                + [w for w in weights if w.denominator == 1 and w >= 2]
+            bosons = [w for w in weights if w.denominator == 2 and w >= Fraction(3, 2)] \
+                + [w for w in weights if w.denominator == 2]
+            expected = _series(level, bosons, fermions)
+            assert basis.basis_size(level) == expected
+            assert sum(1 for _ in basis.iter_basis(level)) == expected
+
+    def test_canonical_monomials(self, bc_beta_gamma):
+        """Test that every element is a distinct PBW monomial without fermion repeats."""
+        basis = enumerate_fock_basis(bc_beta_gamma, Fraction(4))
+        assert len(set(basis)) == len(basis)
+        for op in basis:
+            letters = _letters(op)
+            fermionic = [letter for letter in letters if letter.parity == 1]
+            assert len(set(fermionic)) == len(fermionic)
+            assert list(normal_order(op).items()) == [(op, 1)]
+
+    def test_lazy_and_truncation(self, bc_beta_gamma):
+        """Test lazy generation and the truncation warning."""
+        basis = FockSpaceBasis(bc_beta_gamma)
+        first = list(itertools.islice(basis.iter_basis(Fraction(20)), 3))
+        assert len(first) == 3
+        with pytest.warns(UserWarning):
+            assert len(basis.enumerate_basis(Fraction(4), max_count=5)) == 5
+        assert basis.enumerate_basis(Fraction(0)) == []
+
+    def test_expander_reuses_sub_nodes(self, monkeypatch):
+        """Test that nested composites expand onto the basis, reusing cached sub-nodes."""
+        from pyope import normal_order as normal_order_module
+        from pyope.api import NO
+        from pyope.null_states import OperatorExpander
+        from pyope.operators import d
+
+        J = BasisOperator("J", bosonic=True, conformal_weight=1)
+        Bosonic(J)
+        OPE[J, J] = OPE.make([One, 0])
+        T = NO(J, J) / 2
+        composite = NO(T, NO(T, T))
+
+        basis = enumerate_fock_basis([J], Fraction(6))
+        expansion = OperatorExpander(basis).expand(composite)
+        assert expansion and set(expansion) <= set(basis)
+
+        calls = []
+        original = normal_order_module._product
+        monkeypatch.setattr(normal_order_module, "_product",
+                            lambda u, w: calls.append((u, w)) or original(u, w))
+
+        def expand_derivative():
+            calls.clear()
+            next_basis = enumerate_fock_basis([J], Fraction(7))
+            result = OperatorExpander(next_basis).expand(d(composite))
+            assert result and set(result) <= set(next_basis)
+            return result, len(calls)
+
+        # the level-7 expansion is built from the cached level-6 sub-nodes
+        cached, cached_calls = expand_derivative()
+        normal_order_module.clear_normal_order_memo()
+        fresh, fresh_calls = expand_derivative()
+        assert cached == fresh
+        assert cached_calls < fresh_calls
@@ -0,0 +1,142 @@
+"""
+Unit tests for LinearCombination.
+"""
+
+import pytest
+import sympy as sp
+from pyope.api import OPE, NO
+from pyope.constants import One
+from pyope.linear_combination import SCALAR, LinearCombination
+from pyope.ope_data import OPEData
+from pyope.operators import BasisOperator, NormalOrderedOperator, d
+from pyope.simplify import simplify
+
+
+class TestLinearCombination:
+    """Tests for LinearCombination construction and arithmetic."""
+
+    def test_from_expr(self):
+        """Test converting sympy expressions."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        c = sp.Symbol("c")
+
+        lc = LinearCombination.from_expr(2 * T + c * d(J) + c / 2)
+        assert lc.coeff(T) == 2
+        assert lc.coeff(d(J)) == c
+        assert lc.coeff(SCALAR) == c / 2
+        assert lc.coeff(J) == 0
+
+    def test_from_expr_distributes_products(self):
+        """Test that c*(A + B) is expanded."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        c = sp.Symbol("c")
+
+        lc = LinearCombination.from_expr(sp.Mul(c, sp.Add(T, J), evaluate=False))
+        assert lc.coeff(T) == c
+        assert lc.coeff(J) == c
+
+    def test_round_trip(self):
+        """Test LinearCombination -> sympy -> LinearCombination."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+
+        expr = 3 * T - d(J)
+        lc = LinearCombination.from_expr(expr)
+        assert lc.to_expr() == expr
+        assert LinearCombination.from_expr(lc.to_expr()) == lc
+
+    def test_cancellation(self):
+        """Test that cancelling terms are dropped."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+
+        lc = LinearCombination.from_expr(T + J) - T
+        assert len(lc) == 1
+        assert lc.is_single_operator()
+        assert (lc - J).is_zero()
+        assert (lc - J).to_expr() == 0
+
+    def test_scalar_arithmetic(self):
+        """Test scalar multiplication and division."""
+        T = BasisOperator("T", bosonic=True)
+
+        lc = LinearCombination.from_operator(T)
+        assert (3 * lc).coeff(T) == 3
+        assert (lc / 2).coeff(T) == sp.Rational(1, 2)
+        assert (-lc).coeff(T) == -1
+
+    def test_derivative(self):
+        """Test derivative of a linear combination."""
+        T = BasisOperator("T", bosonic=True)
+        c = sp.Symbol("c")
+
+        lc = LinearCombination.from_expr(2 * d(T) + c)
+        result = lc.derivative(2)
+        assert result.coeff(d(T, 3)) == 2
+        assert len(result) == 1
+        assert d(lc, 2) == result
+
+    def test_parity(self):
+        """Test parity of a linear combination."""
+        T = BasisOperator("T", bosonic=True)
+        psi = BasisOperator("ψ", bosonic=False)
+
+        assert LinearCombination.from_expr(2 * psi + d(psi)).parity == 1
+        assert LinearCombination.from_expr(T).parity == 0
+        with pytest.raises(ValueError):
+            LinearCombination.from_expr(T + psi).parity
+
+
+class TestLinearCombinationAPI:
+    """Tests for NO, OPE and simplify on LinearCombination inputs."""
+
+    def test_no_bilinear(self):
+        """Test NO on linear combinations."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+
+        lc = LinearCombination.from_expr(2 * T + J)
+        result = NO(lc, J)
+        assert isinstance(result, LinearCombination)
+        assert result.coeff(NormalOrderedOperator(T, J)) == 2
+        assert result.coeff(NormalOrderedOperator(J, J)) == 1
+
+        # sympy 输入返回 sympy 表达式
+        assert NO(2 * T + J, J) == result.to_expr()
+
+    def test_no_identity(self):
+        """Test that scalar terms act as the identity in NO."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+
+        lc = LinearCombination.from_expr(T + 3)
+        result = NO(lc, J)
+        assert result.coeff(NormalOrderedOperator(T, J)) == 1
+        assert result.coeff(J) == 3
+
+    def test_ope_matches_sympy_input(self):
+        """Test OPE with LinearCombination and sympy inputs agree."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        c = sp.Symbol("c")
+
+        OPE[T, T] = OPE.make([c / 2 * One, 0, 2 * T, d(T)])
+        OPE[T, J] = OPEData({2: J, 1: d(J)})
+
+        lc = LinearCombination.from_expr(2 * T + J)
+        assert OPE(T, lc) == OPE(T, 2 * T + J)
+        assert OPE(T, lc).pole_terms(4).coeff(One) == c
+
+    def test_simplify_returns_linear_combination(self):
+        """Test simplify keeps the input representation."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+
+        lc = LinearCombination.from_expr(d(NO(T, J)))
+        result = simplify(lc)
+        assert isinstance(result, LinearCombination)
+        assert result.coeff(NormalOrderedOperator(d(T), J)) == 1
+        assert result.coeff(NormalOrderedOperator(T, d(J))) == 1
+        assert simplify(d(NO(T, J))) == result.to_expr()
@@ -0,0 +1,256 @@
+"""
+Unit tests for exact matrix ranks.
+"""
+
+import random
+from fractions import Fraction
+
+import pytest
+import sympy as sp
+from pyope.matrix_rank import (
+    DEFAULT_PRIMES,
+    IncrementalEchelon,
+    SparseMatrix,
+    bareiss_rank,
+    integer_rows,
+    matrix_rank,
+    modular_rank,
+    rank_mod_p,
+    sparse_integer_rows,
+    sparse_pivots_mod_p,
+    symbolic_rank,
+)
+
+
+def _random_matrix(rows, cols, rank, seed):
+    """A random rational matrix with a prescribed rank."""
+    rng = random.Random(seed)
+    left = [[Fraction(rng.randint(-9, 9), rng.randint(1, 5)) for _ in range(rank)]
+            for _ in range(rows)]
+    right = [[Fraction(rng.randint(-9, 9), rng.randint(1, 5)) for _ in range(cols)]
+             for _ in range(rank)]
+    return [[sum(left[i][k] * right[k][j] for k in range(rank)) for j in range(cols)]
+            for i in range(rows)]
+
+
+class TestExactRank:
+    """Tests for modular and Bareiss ranks."""
+
+    def test_integer_rows(self):
+        """Test that rows are cleared of denominators and common factors."""
+        assert integer_rows([[Fraction(1, 2), Fraction(1, 3)], [2, 4]]) == [[3, 2], [1, 2]]
+
+    def test_matches_sympy(self):
+        """Test both exact methods against sympy on random low-rank matrices."""
+        for seed, (rows, cols, rank) in enumerate([(6, 4, 2), (5, 9, 5), (12, 12, 7)]):
+            matrix = _random_matrix(rows, cols, rank, seed)
+            expected = sp.Matrix(matrix).rank()
+            assert modular_rank(matrix) == expected
+            assert bareiss_rank(matrix) == expected
+            assert matrix_rank(matrix, method='bareiss') == expected
+
+    def test_large_entries(self):
+        """Test a matrix where float rank is wrong but the exact rank is right."""
+        big = 10 ** 20
+        matrix = [[big, big + 1], [big + 1, big + 2]]
+        assert matrix_rank(matrix, method='float') == 1
+        assert matrix_rank(matrix) == 2
+        assert bareiss_rank(matrix) == 2
+
+    def test_modulus_dividing_minor(self):
+        """Test that a single prime can undercount but several primes do not."""
+        import numpy as np
+        p = 2147483647
+        matrix = [[1, 1], [1, 1 + p]]
+        reduced = np.array([[v % p for v in row] for row in matrix], dtype=np.int64)
+        assert rank_mod_p(reduced, p) == 1
+        assert modular_rank(matrix) == 2
+
+    def test_sympy_entries(self):
+        """Test sympy and float entries and symbolic rejection."""
+        matrix = [[sp.Rational(1, 2), sp.Integer(1)], [1.5, 3]]
+        assert matrix_rank(matrix) == 1
+        with pytest.raises(ValueError):
+            matrix_rank([[sp.Symbol("c"), 1]])
+        with pytest.raises(ValueError):
+            matrix_rank([[1]], method='svd')
+
+
+class TestSparseMatrix:
+    """Tests for sparse coefficient matrices."""
+
+    def test_dense_round_trip(self):
+        """Test conversion and list-of-lists compatibility."""
+        dense = [[0, Fraction(1, 2), 0], [3, 0, 0]]
+        matrix = SparseMatrix.from_dense(dense)
+        assert matrix.nnz == 2
+        assert matrix.to_dense() == dense
+        assert len(matrix) == 2 and matrix[1] == [3, 0, 0] and list(matrix) == dense
+        assert matrix.transpose().to_dense() == [list(col) for col in zip(*dense)]
+
+    def test_rows_indexed(self):
+        """Test that rows are read from the row index, one row at a time."""
+        matrix = SparseMatrix((10 ** 6, 3))
+        for i in range(0, 10 ** 6, 1000):
+            matrix.append(i, i % 3, i + 1)
+        assert matrix[5000] == [0, 0, 5001] and matrix[5001] == [0, 0, 0]
+        rows = iter(matrix)
+        assert next(rows) == [1, 0, 0] and next(rows) == [0, 0, 0]
+        assert list(matrix.items())[:2] == [(0, 0, 1), (1000, 1, 1001)]
+
+    def test_rank_matches_dense(self, monkeypatch):
+        """Test sparse modular elimination against the dense rank."""
+        import sys
+        module = sys.modules[SparseMatrix.__module__]
+        for seed, (rows, cols, rank) in enumerate([(8, 5, 3), (5, 11, 4)]):
+            dense = _random_matrix(rows, cols, rank, seed)
+            dense[0] = [0] * cols
+            matrix = SparseMatrix.from_dense(dense)
+            assert modular_rank(matrix) == rank
+            # both the sparse and the NumPy elimination paths
+            for fill in [0, 10 ** 9]:
+                monkeypatch.setattr(module, "DENSE_ROW_FILL", fill)
+                assert modular_rank(matrix) == rank
+            monkeypatch.undo()
+            assert matrix_rank(matrix, method='bareiss') == rank
+            assert matrix_rank(matrix, method='float') == rank
+
+    def test_pivot_minor(self):
+        """Test that the pivot rows and columns form a nonsingular minor."""
+        dense = _random_matrix(7, 6, 4, 11)
+        pivots = sparse_pivots_mod_p(sparse_integer_rows(SparseMatrix.from_dense(dense)),
+                                     DEFAULT_PRIMES[0])
+        assert len(pivots) == 4
+        minor = sp.Matrix([[dense[i][j] for _, j in pivots] for i, _ in pivots])
+        assert minor.det() != 0
+
+    def test_builder_is_sparse(self):
+        """Test that the coefficient matrix stores only nonzeros."""
+        from pyope.api import OPE
+        from pyope.null_states import CoefficientMatrixBuilder, enumerate_fock_basis
+        from pyope.operators import BasisOperator
+
+        J = BasisOperator("J", bosonic=True, conformal_weight=Fraction(1))
+        OPE[J, J] = OPE.make([1, 0])
+        basis = enumerate_fock_basis([J], Fraction(4))
+        builder = CoefficientMatrixBuilder(basis, [basis[0], basis[-1] - basis[0] / 2])
+        matrix = builder.build_matrix()
+        assert matrix.shape == (len(basis), 2)
+        assert matrix.nnz == 3
+        assert builder.compute_rank(matrix) == 2
+
+
+class TestIncrementalEchelon:
+    """Tests for incremental linear independence checks."""
+
+    def test_matches_rank(self):
+        """Test that greedy selection agrees with ranks of growing matrices."""
+        matrix = _random_matrix(10, 7, 4, 3)
+        echelon = IncrementalEchelon(7)
+        selected = []
+        for row in matrix:
+            independent = echelon.add(row)
+            assert independent == (modular_rank(selected + [row]) > len(selected))
+            if independent:
+                selected.append(row)
+        assert echelon.rank == len(selected) == 4
+
+    def test_prime_multiple_differences(self):
+        """Test vectors that differ by a multiple of one of the primes."""
+        p = DEFAULT_PRIMES[0]
+        echelon = IncrementalEchelon(2)
+        assert echelon.add([0, 1])
+        assert echelon.add([p, 1])
+        assert not echelon.add([1, 0])
+        assert not echelon.add([2 * p, 3])
+        assert echelon.rank == 2
+
+    def test_filter_expands_once(self, monkeypatch):
+        """Test that the grouped filter expands each operator once."""
+        from pyope.api import OPE
+        from pyope.null_states import (
+            GroupedNullStatesCalculator,
+            OperatorExpander,
+            enumerate_fock_basis,
+        )
+        from pyope.operators import BasisOperator
+
+        J = BasisOperator("J", bosonic=True, conformal_weight=Fraction(1))
+        OPE[J, J] = OPE.make([1, 0])
+        first, second = enumerate_fock_basis([J], Fraction(2))
+        operators = [first, 2 * first, second, first - 3 * second]
+
+        calls = []
+        expand = OperatorExpander._expand
+        monkeypatch.setattr(OperatorExpander, "_expand",
+                            lambda self, op: calls.append(op) or expand(self, op))
+        calculator = GroupedNullStatesCalculator([J], {J: (Fraction(0), Fraction(0))})
+        result = calculator.calculate_null_states_grouped(Fraction(2), operators)
+
+        group = result['groups'][(0, 0)]
+        assert group['operators'] == [operators[0], operators[2]]
+        assert group['rank'] == 2
+        assert sorted(map(str, calls)) == sorted(map(str, operators))
+
+
+class TestSymbolicRank:
+    """Tests for ranks over Q(c) and special parameter values."""
+
+    def test_special_values(self):
+        """Test rational and irrational values where the rank drops."""
+        c = sp.Symbol("c")
+        matrix = [[c - sp.Rational(1, 2), 0, 1],
+                  [0, c**2 - 2, 1],
+                  [0, 0, (c + 3) / (c - 1)]]
+        result = symbolic_rank(matrix)
+        assert result['rank'] == 3
+        assert result['parameters'] == [c]
+        assert result['special_values'] == {sp.Rational(1, 2): 2, -3: 2}
+        assert result['special_factors'] == {c**2 - 2: 2}
+        for value, rank in result['special_values'].items():
+            assert sp.Matrix(matrix).subs(c, value).rank() == rank
+        assert matrix_rank(matrix, method='symbolic') == 3
+
+    def test_minor_vanishing_without_rank_drop(self):
+        """Test that roots of one pivot minor are not reported if another minor survives."""
+        c = sp.Symbol("c")
+        matrix = [[c, 0], [0, 1], [1, 0]]
+        result = symbolic_rank(matrix)
+        assert result['rank'] == 2
+        assert result['special_values'] == {}
+
+    def test_several_parameters(self):
+        """Test that several parameters give only the generic rank."""
+        c, k = sp.symbols("c k")
+        result = symbolic_rank([[c, k], [k, c], [c + k, c + k]])
+        assert result['rank'] == 2
+        assert result['special_values'] is None
+        assert symbolic_rank([[1, 2], [2, 4]])['rank'] == 1
+
+
+class TestNullStateSpectrum:
+    """Tests for null-state counts as a function of a parameter."""
+
+    def test_spectrum(self):
+        """Test that null states appear only at the special values of Q."""
+        from pyope.api import OPE, NO
+        from pyope.null_states import GroupedNullStatesCalculator, calculate_null_states
+        from pyope.operators import BasisOperator, d
+
+        J = BasisOperator("J", bosonic=True, conformal_weight=Fraction(1))
+        OPE[J, J] = OPE.make([1, 0])
+        Q = sp.Symbol("Q")
+        operators = [d(J, 3) + Q * NO(d(J), d(J)),
+                     Q * d(J, 3) + NO(d(J), d(J)),
+                     NO(J, NO(J, NO(J, J)))]
+
+        result = calculate_null_states([J], Fraction(4), operators, rank_method='symbolic')
+        assert result['n_null_states'] == 0
+        assert result['parameters'] == [Q]
+        assert result['special_values'] == {1: 1, -1: 1}
+
+        calculator = GroupedNullStatesCalculator([J], {J: (Fraction(0), Fraction(0))},
+                                                 rank_method='symbolic')
+        grouped = calculator.calculate_null_states_grouped(Fraction(4), operators)
+        assert grouped['total_n_null_states'] == 0
+        assert grouped['total_special_values'] == {1: 1, -1: 1}
@@ -161,3 +161,61 @@ class TestNormalOrderedOperator:
 
         assert NO1 == NO2
         assert NO1 != NO3
+
+
+class TestOperatorInterning:
+    """Tests for hash-consed operator nodes."""
+
+    def test_structurally_equal_nodes_are_identical(self):
+        """Test that equal nodes are the same object."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+
+        assert BasisOperator("T", bosonic=True) is T
+        assert d(T, 2) is d(d(T))
+        assert NormalOrderedOperator(T, d(J)) is NormalOrderedOperator(T, d(J))
+
+    def test_equal_nodes_with_metadata_are_identical(self):
+        """Test that nodes equal under == are interned once, whatever their weight."""
+        W = BasisOperator("Ω", bosonic=True)
+        X = NormalOrderedOperator(d(W), W)
+        assert X.conformal_weight is None
+
+        W2 = BasisOperator("Ω", bosonic=True, conformal_weight=2)
+        assert W2 == W and W2 is W
+        assert d(W2) is d(W)
+        assert NormalOrderedOperator(d(W2), W2) is X
+        # the new weight reaches composites created before it was declared
+        assert X.conformal_weight == 5
+        assert BasisOperator("Ω", bosonic=True).conformal_weight == 2
+
+    def test_parity_distinguishes_nodes(self):
+        """Test that same-named operators with different parity stay distinct."""
+        x_bos = BasisOperator("x", bosonic=True)
+        x_ferm = BasisOperator("x", bosonic=False)
+
+        assert x_bos is not x_ferm
+        assert x_bos.parity == 0
+        assert x_ferm.parity == 1
+
+    def test_cached_metadata(self):
+        """Test depth, size, parity and weight cached on creation."""
+        psi = BasisOperator("ψ", bosonic=False, conformal_weight=sp.Rational(1, 2))
+        T = BasisOperator("T", bosonic=True, conformal_weight=2)
+        expr = NormalOrderedOperator(psi, NormalOrderedOperator(d(T), psi))
+
+        assert T.depth == 0 and T.size == 1
+        assert d(T).depth == 1 and d(T).size == 2
+        assert expr.depth == 3
+        assert expr.size == 6
+        assert expr.parity == 0
+        assert expr.conformal_weight == 4
+
+    def test_pickle_roundtrip_preserves_identity(self):
+        """Test that unpickled nodes are re-interned."""
+        import pickle
+
+        T = BasisOperator("T", bosonic=True, conformal_weight=2)
+        expr = NormalOrderedOperator(T, d(T))
+
+        assert pickle.loads(pickle.dumps(expr)) is expr
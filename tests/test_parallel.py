@@ -0,0 +1,121 @@
+"""
+Unit tests for the parallel OPE mode.
+"""
+
+from fractions import Fraction
+
+from pyope.api import OPE, NO
+from pyope.constants import One
+from pyope.jacobi import check_jacobi_identity
+from pyope.null_states import (
+    GroupedNullStatesCalculator,
+    NullStatesCalculator,
+    enumerate_fock_basis,
+)
+from pyope.operators import BasisOperator, d
+from pyope.parallel import compute_opes, get_parallel_engine, parallel_opes
+
+
+def _composites(fields, level):
+    """Composite operators at a level, with linear dependencies among them."""
+    b, c, beta, gamma = fields
+    J = NO(c, b) + NO(beta, gamma) / 2
+    lower = enumerate_fock_basis(fields, level - 1)
+    ops = [NO(J, op) for op in lower] + [d(op) for op in lower]
+    return ops + [ops[0] + ops[-1], 2 * ops[1]]
+
+
+class TestParallelMode:
+    """Tests for process-pool evaluation."""
+
+    def test_matches_serial(self, virasoro):
+        """Test that parallel evaluation gives the serial result."""
+        T = virasoro
+        X = NO(T, T)
+        Y = NO(T, d(T))
+
+        expected = OPE(X, Y)
+        with parallel_opes(max_workers=2, min_batch=1) as engine:
+            result = OPE(X, Y)
+            assert engine.tasks > 0
+        assert result == expected
+        assert get_parallel_engine() is None
+
+    def test_worker_entries_merged(self, virasoro, ope_cache):
+        """Test that worker cache entries are merged into the parent cache."""
+        T = virasoro
+        cache = ope_cache
+
+        with parallel_opes(max_workers=2, min_batch=1):
+            OPE(NO(T, T), NO(T, T))
+        size = cache.stats()['cache_size']
+        assert size > 1
+
+        # 合并的条目在主进程中直接命中
+        hits = cache.hits
+        OPE(NO(T, T), T)
+        assert cache.hits > hits
+
+    def test_registry_change_restarts_pool(self, virasoro):
+        """Test that workers see redefined OPEs."""
+        T = virasoro
+        J = BasisOperator("J", bosonic=True)
+
+        with parallel_opes(max_workers=1, min_batch=1):
+            compute_opes([(NO(T, T), T), (NO(T, T), d(T))])
+            OPE[J, J] = OPE.make([One, 0])
+            first, second = compute_opes([(NO(J, J), J), (J, NO(J, J))])
+        assert first.pole(2) == 2 * J
+        assert second.pole(2) == 2 * J
+
+    def test_jacobi_tables(self, virasoro):
+        """Test the Jacobi check with parallel tables."""
+        T = virasoro
+        with parallel_opes(max_workers=2, min_batch=1):
+            result = check_jacobi_identity(T, T, NO(T, T))
+        assert all(value == 0 for row in result for value in row)
+
+    def test_table(self, virasoro):
+        """Test OPE.table in a process pool."""
+        T = virasoro
+        ops = [NO(T, T), d(T, 2), NO(T, d(T))]
+
+        expected = [[OPE(A, B) for B in ops] for A in ops]
+        assert OPE.table(ops, max_workers=2) == expected
+        assert get_parallel_engine() is None
+
+
+class TestParallelNullStates:
+    """Tests for the process-pool null-state pipeline."""
+
+    def test_grouped_matches_serial(self, bc_beta_gamma, bc_beta_gamma_charges):
+        """Test that sectors computed in workers are merged in the serial order."""
+        fields, charges = bc_beta_gamma, bc_beta_gamma_charges
+        ops = _composites(fields, Fraction(3))
+        calculator = GroupedNullStatesCalculator(fields, charges)
+
+        expected = calculator.calculate_null_states_grouped(Fraction(3), ops)
+        with parallel_opes(max_workers=2) as engine:
+            result = calculator.calculate_null_states_grouped(Fraction(3), ops)
+            assert engine.tasks == len(expected['groups'])
+        assert list(result['groups']) == list(expected['groups'])
+        for key, group in expected['groups'].items():
+            assert result['groups'][key]['rank'] == group['rank']
+            assert result['groups'][key]['operators'] == group['operators']
+        assert result['total_n_null_states'] == expected['total_n_null_states']
+        assert calculator.calculate_null_states_grouped(
+            Fraction(3), ops, max_workers=2)['total_rank'] == expected['total_rank']
+        assert get_parallel_engine() is None
+
+    def test_operator_expansions(self, bc_beta_gamma):
+        """Test per-operator expansion in workers for a single matrix."""
+        fields = bc_beta_gamma
+        ops = _composites(fields, Fraction(5, 2))
+        calculator = NullStatesCalculator(fields)
+
+        expected = calculator.calculate_null_states(Fraction(5, 2), ops)
+        with parallel_opes(max_workers=2) as engine:
+            result = calculator.calculate_null_states(Fraction(5, 2), ops)
+            assert engine.tasks > 0
+        assert result['rank'] == expected['rank']
+        assert result['matrix'].to_dense() == expected['matrix'].to_dense()
@@ -4,9 +4,12 @@
 验证新的枚举器能否正确生成任意数量生成元的乘积
 """
 
+import itertools
 from fractions import Fraction
+from pyope.normal_order import normal_order
 from pyope.null_states import OperatorEnumerator, integer_partitions
 from pyope.operators import BasisOperator
+from pyope.qseries import pbw_character
 
 
 def test_integer_partitions():
@@ -141,6 +144,41 @@ def test_z3_w_algebra_level4():
     print(f"当前实现生成了 {len(ops)} 个算符")
 
 
+def test_unique_permutations():
+    """测试多重集排列与 itertools.permutations 去重的结果一致"""
+    enumerator = OperatorEnumerator({})
+    for partition in [[3], [2, 1], [1, 1, 1], [2, 1, 1], [3, 2, 2, 1, 1]]:
+        perms = enumerator._get_unique_permutations(partition)
+        assert len(perms) == len(set(map(tuple, perms)))
+        assert set(map(tuple, perms)) == set(itertools.permutations(partition))
+
+    # 十个相同的部分只有一个排列
+    assert enumerator._get_unique_permutations([1] * 10) == [[1] * 10]
+
+
+def test_pbw_ordered_enumerator():
+    """测试 PBW 单项式枚举：每个多重集一个，数目等于 PBW 特征"""
+    J = BasisOperator('J', bosonic=True, conformal_weight=1)
+    G = BasisOperator('G', bosonic=False, conformal_weight=Fraction(3, 2))
+    generators = {
+        'J': {'op': J, 'weight': Fraction(1)},
+        'G': {'op': G, 'weight': Fraction(3, 2)},
+    }
+    enumerator = OperatorEnumerator(generators)
+    character = pbw_character(generators, 5)
+
+    for level in [Fraction(2), Fraction(7, 2), Fraction(5)]:
+        ops = enumerator.enumerate_operators(level, pbw_ordered=True)
+        assert len(ops) == character.coefficient(level)
+        assert len(set(ops)) == len(ops)
+        for op in ops:
+            assert list(normal_order(op).items()) == [(op, 1)]
+
+    # 排列枚举的算符都是这些单项式的线性组合，但数目更多
+    level3 = enumerator.enumerate_operators(Fraction(3), pbw_ordered=True)
+    assert len(enumerator.enumerate_operators(Fraction(3))) > len(level3)
+
+
 if __name__ == '__main__':
     test_integer_partitions()
     test_simple_enumerator()
@@ -0,0 +1,106 @@
+"""
+Unit tests for q-series characters.
+"""
+
+from collections import Counter
+from fractions import Fraction
+
+import pytest
+import sympy as sp
+from pyope import Bosonic
+from pyope.api import OPE, NO
+from pyope.constants import One
+from pyope.null_states import (
+    FockSpaceBasis,
+    GroupedNullStatesCalculator,
+    NullStatesCalculator,
+    OperatorEnumerator,
+    QuantumNumberCalculator,
+)
+from pyope.operators import BasisOperator, d
+from pyope.qseries import QSeries, fock_character, pbw_character
+
+
+class TestCharacters:
+    """Tests for Fock and PBW characters."""
+
+    def test_virasoro_vacuum(self):
+        """Test the PBW character of a weight-2 generator: partitions into parts >= 2."""
+        T = BasisOperator("T", bosonic=True, conformal_weight=2)
+        character = pbw_character([T], 8)
+        assert character.coefficients() == {0: 1, 2: 1, 3: 1, 4: 2, 5: 2, 6: 4, 7: 4, 8: 7}
+        assert repr(character).startswith("1 + q^2 + q^3 + 2*q^4")
+
+    def test_fermionic_generator(self):
+        """Test that a fermionic generator contributes (1 + q^w) factors."""
+        psi = BasisOperator("ψ", bosonic=False, conformal_weight=Fraction(1, 2))
+        character = pbw_character({"psi": {"op": psi, "weight": Fraction(1, 2)}}, 5,
+                                  charges={"psi": 1})
+        # distinct parts from 1/2, 3/2, 5/2, ...
+        assert character.coefficient(4) == 2
+        assert character.sectors(Fraction(9, 2)) == {(1,): 1, (3,): 1}
+        assert character.coefficient(4, charge=(2,)) == 2
+        assert repr(character).startswith("1 + q^(1/2) + q^(3/2) + q^2")
+
+    def test_fock_sectors_match_basis(self, bc_beta_gamma, bc_beta_gamma_charges):
+        """Test graded Fock characters against the enumerated basis."""
+        fields, charges = bc_beta_gamma, bc_beta_gamma_charges
+        character = fock_character(fields, 4, charges)
+        basis = FockSpaceBasis(fields)
+        quantum = QuantumNumberCalculator(charges)
+        for level in [Fraction(3, 2), Fraction(3), Fraction(4)]:
+            counts = Counter(quantum.get_quantum_numbers(op) for op in basis.iter_basis(level))
+            assert character.sectors(level) == dict(counts)
+            assert character.coefficient(level) == basis.basis_size(level)
+
+        calculator = GroupedNullStatesCalculator(fields, charges)
+        assert calculator.fock_sector_sizes(Fraction(3)) == character.sectors(3)
+
+    def test_arithmetic(self, bc_beta_gamma):
+        """Test series arithmetic and truncation checks."""
+        fields = bc_beta_gamma
+        character = fock_character(fields, 3)
+        assert (character + character - character) == character
+        assert (character * QSeries.one(3, character.unit)) == character
+        with pytest.raises(ValueError):
+            character * QSeries.one(2, character.unit)
+        with pytest.raises(ValueError):
+            character.coefficient(Fraction(1, 3))
+
+
+class TestNullStateCounts:
+    """Tests pinning null-state counts against independently known dimensions."""
+
+    def test_free_boson_virasoro(self):
+        """Test that T = (JJ)/2 at c = 1 has no null states below level 9."""
+        J = BasisOperator("J", bosonic=True, conformal_weight=1)
+        Bosonic(J)
+        OPE[J, J] = OPE.make([One, 0])
+        T = NO(J, J) / 2
+        generators = {"T": {"op": T, "weight": 2}}
+        calculator = NullStatesCalculator([J])
+        for level in [4, 6]:
+            expected = pbw_character(generators, level).coefficient(level)
+            for pbw_ordered in [True, False]:
+                ops = OperatorEnumerator(generators).enumerate_operators(
+                    Fraction(level), pbw_ordered=pbw_ordered)
+                result = calculator.calculate_null_states(Fraction(level), ops)
+                assert result['rank'] == expected
+                assert result['n_fock_basis'] == fock_character([J], level).coefficient(level)
+
+    def test_z3_neutral_sector(self, bc_beta_gamma, bc_beta_gamma_charges):
+        """Test that j0 and t span the whole level-4 (0, 0) Fock sector."""
+        fields, charges = bc_beta_gamma, bc_beta_gamma_charges
+        b, c, beta, gamma = fields
+        j0 = 2 * NO(b, c) + 3 * NO(beta, gamma)
+        t = (-2 * NO(b, d(c)) - Fraction(3, 2) * NO(beta, d(gamma))
+             - NO(d(b), c) - Fraction(1, 2) * NO(d(beta), gamma))
+        generators = {"j0": {"op": j0, "weight": 1}, "t": {"op": t, "weight": 2}}
+        ops = OperatorEnumerator(generators).enumerate_operators(Fraction(4))
+
+        result = GroupedNullStatesCalculator(fields, charges).calculate_null_states_grouped(
+            Fraction(4), ops, filter_linearly_independent=False)
+        sector = result['groups'][(0, 0)]
+        assert sector['n_fock_basis'] == fock_character(fields, 4, charges).coefficient(4, (0, 0))
+        assert sector['rank'] == sector['n_fock_basis'] == 6
+        assert sp.Matrix(sector['matrix'].to_dense()).rank() == 6
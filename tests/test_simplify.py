@@ -383,5 +383,114 @@ class TestSimplifyDerivativeExpansion:
         assert result == expected
 
 
+class TestCanonicalize:
+    """测试 PBW 规范形式"""
+
+    def test_swap_formula(self, virasoro):
+        """测试交换公式 NO(∂T, T) = NO(T, ∂T) - ∂³T/6"""
+        T = virasoro
+        expected = NO(T, d(T)) - d(T, 3) / 6
+        assert canonicalize(NO(d(T), T)) == expected
+        assert simplify(NO(d(T), T)) == expected
+
+    def test_rebracketing_consistent_with_ope(self, virasoro):
+        """测试重组后的算符与原算符的 OPE 相同"""
+        T = virasoro
+        X = NO(NO(T, T), T)
+        Y = canonicalize(X)
+        assert Y != X
+        for Z in [T, d(T), NO(T, T)]:
+            assert canonicalize(OPE(Z, X)) == canonicalize(OPE(Z, Y))
+            assert canonicalize(OPE(X, Z)) == canonicalize(OPE(Y, Z))
+
+    def test_equal_states_cancel(self, virasoro):
+        """测试同一个态的两种写法之差规范化后为零（系数展开后比较）"""
+        T = virasoro
+        X = NO(NO(d(T), T), d(T))
+        Y = canonicalize(X)
+        assert canonicalize(X - Y) == 0
+        assert canonicalize(OPE(X, NO(T, T)).pole(5) - OPE(Y, NO(T, T)).pole(5)) == 0
+
+    def test_memo_bounded(self, virasoro):
+        """测试重排记忆表有上限，清空后释放，结果与不限制时相同"""
+        from pyope import clear_normal_order_memo, resize_normal_order_memo
+        from pyope.normal_order import MEMO_MAXSIZE, normal_order_memo_size
+
+        T = virasoro
+        X = NO(NO(d(T), T), NO(T, d(T, 2)))
+        expected = canonicalize(X)
+        clear_normal_order_memo()
+        resize_normal_order_memo(3)
+        try:
+            assert canonicalize(X) == expected
+            assert 0 < normal_order_memo_size() <= 4 * 3
+        finally:
+            resize_normal_order_memo(MEMO_MAXSIZE)
+        clear_normal_order_memo()
+        assert normal_order_memo_size() == 0
+        with pytest.raises(ValueError):
+            resize_normal_order_memo(0)
+
+    def test_orderings_combine(self, virasoro):
+        """测试顺序不同的相同态合并"""
+        T = virasoro
+        J = BasisOperator("J", bosonic=True)
+        OPE[T, J] = MakeOPE([J, d(J)])
+        OPE[J, J] = MakeOPE([One, 0])
+
+        result = canonicalize(NO(J, NO(T, T)) - NO(T, NO(J, T)))
+        assert NO(T, NO(T, J)) not in result.free_symbols
+        assert canonicalize(result) == result
+
+    def test_fermions(self):
+        """测试费米子的规范形式"""
+        psi = BasisOperator("ψ", bosonic=False)
+        chi = BasisOperator("χ", bosonic=False)
+        OPE[psi, psi] = MakeOPE([One])
+        OPE[chi, chi] = MakeOPE([One])
+
+        assert canonicalize(NO(psi, psi)) == 0
+        assert canonicalize(NO(chi, psi)) == -NO(psi, chi)
+        assert canonicalize(NO(psi, NO(chi, psi))) == 0
+        assert canonicalize(NO(d(psi), psi)) == -NO(psi, d(psi))
+
+    def test_memo_follows_registry(self, virasoro):
+        """测试重新定义 OPE 后重排结果随之改变"""
+        T = virasoro
+        X = NO(NO(T, T), T)
+        first = canonicalize(X)
+        OPE[T, T] = MakeOPE([One, 0, 2 * T, d(T)])
+        assert canonicalize(X) != first
+
+    def test_classical(self, virasoro):
+        """测试经典 OPE 中重排没有修正项"""
+        from pyope import ClassicalOPEs, ope_method
+
+        T = virasoro
+        with ope_method(ClassicalOPEs):
+            assert canonicalize(NO(d(T), T)) == NO(T, d(T))
+            assert canonicalize(NO(NO(T, T), T)) == NO(T, NO(T, T))
+
+    def test_higher_derivatives_first(self, virasoro):
+        """测试 HigherDerivativesFirst 时高阶导数排在左边"""
+        from pyope import HigherDerivativesFirst, get_no_ordering, no_ordering
+
+        T = virasoro
+        with no_ordering(HigherDerivativesFirst):
+            assert canonicalize(NO(d(T), T)) == NO(d(T), T)
+            assert canonicalize(NO(T, d(T))) == NO(d(T), T) + d(T, 3) / 6
+            assert simplify(NO(T, d(T))) == NO(d(T), T) + d(T, 3) / 6
+            assert canonicalize(NO(T, NO(d(T), T))) == NO(d(T), NO(T, T)) + NO(d(T, 3), T) / 6
+        assert get_no_ordering() == 1
+        assert canonicalize(NO(d(T), T)) == NO(T, d(T)) - d(T, 3) / 6
+
+    def test_unknown_ordering(self):
+        """测试未知的排列方式"""
+        from pyope import set_no_ordering
+
+        with pytest.raises(ValueError):
+            set_no_ordering(0)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,84 @@
+"""
+Unit tests for the persistent OPE store.
+"""
+
+import sympy as sp
+from pyope.api import OPE, NO
+from pyope.constants import One
+from pyope.operators import BasisOperator, d
+from pyope.registry import HigherDerivativesFirst, LowerDerivativesFirst, ope_registry
+from pyope.store import attach_store, detach_store, registry_fingerprint, stable_key
+
+
+class TestStableKey:
+    """Tests for process-independent keys."""
+
+    def test_operator_keys(self):
+        """Test keys of operators."""
+        T = BasisOperator("T", bosonic=True)
+        psi = BasisOperator("ψ", bosonic=False)
+
+        assert stable_key(T) == "T:B"
+        assert stable_key(NO(d(T, 2), psi)) == "NO(d2(T:B),ψ:F)"
+
+    def test_linear_combination_key_order_independent(self):
+        """Test that the key does not depend on term order."""
+        T = BasisOperator("T", bosonic=True)
+        J = BasisOperator("J", bosonic=True)
+        c = sp.Symbol("c")
+
+        assert stable_key(c * (c + 1) * T + J) == stable_key(J + (c ** 2 + c) * T)
+
+
+class TestOPEStore:
+    """Tests for OPEStore."""
+
+    def test_fingerprint_changes_with_algebra(self, virasoro, ope_cache):
+        """Test that redefining an OPE changes the fingerprint."""
+        T = virasoro
+        before = registry_fingerprint(ope_registry)
+        OPE[T, T] = OPE.make([One, 0, 2 * T, d(T)])
+        assert registry_fingerprint(ope_registry) != before
+
+    def test_fingerprint_records_no_ordering(self, virasoro, ope_cache):
+        """Test that a non-default derivative ordering changes the fingerprint."""
+        before = registry_fingerprint(ope_registry)
+        ope_registry.set_no_ordering(HigherDerivativesFirst)
+        assert registry_fingerprint(ope_registry) != before
+        ope_registry.set_no_ordering(LowerDerivativesFirst)
+        assert registry_fingerprint(ope_registry) == before
+
+    def test_round_trip(self, virasoro, ope_cache, tmp_path):
+        """Test that composite results are reloaded from disk."""
+        T = virasoro
+        path = str(tmp_path / "opes.sqlite")
+
+        attach_store(path)
+        expected = OPE(NO(T, T), NO(T, d(T)))
+        store = detach_store()
+        assert store.saves > 0
+        store.close()
+
+        # 新的存储实例、空的内存缓存
+        cache = ope_cache
+        cache.clear()
+        store = attach_store(path)
+        result = OPE(NO(T, T), NO(T, d(T)))
+        assert result == expected
+        assert cache.stats()['store_hits'] >= 1
+        assert store.loads >= 1
+
+    def test_other_algebra_not_loaded(self, virasoro, ope_cache, tmp_path):
+        """Test that results are not shared between different algebras."""
+        T = virasoro
+        path = str(tmp_path / "opes.sqlite")
+
+        store = attach_store(path)
+        OPE(NO(T, T), T)
+        store.flush()
+
+        OPE[T, T] = OPE.make([One, 0, 2 * T, d(T)])
+        cache = ope_cache
+        cache.clear()
+        OPE(NO(T, T), T)
+        assert store.loads == 0